@@ -0,0 +1,123 @@
+"""
+Тривалість нічної розсилки дайджестів днів народження.
+
+Засіває тимчасову файлову базу SQLite синтетичними користувачами й контактами,
+виконує send_birthday_digests з відправником, що лише рахує листи, і звітує час
+вибірки, кількість частин запиту та швидкість. Оцінка для ``--target-users``
+екстраполює час вибірки лінійно, а час надсилання рахує за обмеженням швидкості
+пошти, тож звіт показує, чи вкладається прогін у нічне вікно.
+
+Приклад::
+
+    python -m benchmarks.birthday_digest --users 10000 --contacts 500000 --target-users 100000
+"""
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+from src.conf.config import settings
+from src.database.db import DatabaseSessionManager
+from src.database.seed import seed_database
+from src.services.birthdays import BirthdayDigest, send_birthday_digests
+
+
+async def run(
+    users: int = 1000,
+    contacts: int = 50000,
+    days: int = 7,
+    chunk_size: int = settings.BIRTHDAY_DIGEST_CHUNK_SIZE,
+    target_users: int = 100000,
+    window_seconds: float = 4 * 3600,
+    rate_per_second: float = settings.BIRTHDAY_DIGEST_RATE_PER_SECOND,
+    seed_value: int = 42,
+) -> dict:
+    """
+    Виконує прогін на тимчасовій базі.
+
+    Args:
+        users (int): Кількість користувачів для засіву.
+        contacts (int): Загальна кількість контактів.
+        days (int): Довжина періоду дайджесту, днів.
+        chunk_size (int): Кількість рядків в одній частині запиту.
+        target_users (int): Кількість користувачів для оцінки тривалості.
+        window_seconds (float): Тривалість нічного вікна, с.
+        rate_per_second (float): Обмеження швидкості надсилання листів.
+        seed_value (int): Зерно генератора випадкових чисел.
+
+    Returns:
+        dict: Звіт DigestReport та оцінка для ``target_users``.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite+aiosqlite:///{Path(directory) / 'bench.db'}"
+        await seed_database(url, users, contacts, seed_value)
+        manager = DatabaseSessionManager(url)
+        digests = 0
+
+        async def count(batch: list[BirthdayDigest]) -> tuple[int, int]:
+            nonlocal digests
+            digests += len(batch)
+            return len(batch), 0
+
+        try:
+            report = await send_birthday_digests(
+                date(2026, 12, 28), days, chunk_size, send=count, manager=manager
+            )
+        finally:
+            await manager.close()
+
+    scale = target_users / users if users else 0.0
+    projected_query = report.query_seconds * scale
+    projected_send = report.users * scale / rate_per_second if rate_per_second else 0.0
+    return {
+        "report": {**report.__dict__, "users_per_second": report.users_per_second},
+        "projection": {
+            "target_users": target_users,
+            "query_seconds": round(projected_query, 1),
+            "send_seconds": round(projected_send, 1),
+            "total_seconds": round(projected_query + projected_send, 1),
+            "window_seconds": window_seconds,
+            "fits_window": projected_query + projected_send <= window_seconds,
+        },
+        "config": {
+            "users": users,
+            "contacts": contacts,
+            "days": days,
+            "chunk_size": chunk_size,
+            "rate_per_second": rate_per_second,
+            "seed": seed_value,
+        },
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Nightly birthday digest runtime")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--contacts", type=int, default=50000)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--chunk-size", type=int, default=settings.BIRTHDAY_DIGEST_CHUNK_SIZE)
+    parser.add_argument("--target-users", type=int, default=100000)
+    parser.add_argument("--window-seconds", type=float, default=4 * 3600)
+    parser.add_argument("--rate", type=float, default=settings.BIRTHDAY_DIGEST_RATE_PER_SECOND)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(
+        run(
+            args.users, args.contacts, args.days, args.chunk_size,
+            args.target_users, args.window_seconds, args.rate, args.seed,
+        )
+    )
+    print(json.dumps(result, indent=2))
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    return 0 if result["projection"]["fits_window"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
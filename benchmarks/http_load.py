@@ -0,0 +1,333 @@
+"""
+Навантажувальний бенчмарк HTTP-маршрутів API.
+
+Запускає справжній ASGI-застосунок через httpx.AsyncClient проти локальної бази
+(SQLite або Postgres), заповненої заданою кількістю контактів, і виконує змішаний
+профіль навантаження. Звітує RPS та p50/p95/p99 для кожного маршруту, зберігає
+результат у JSON та порівнює з базовим результатом.
+
+Приклад::
+
+    python -m benchmarks.http_load --contacts 10000 --profile mixed \\
+        --duration 30 --output bench.json --baseline benchmarks/baseline.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+import httpx
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from main import app
+from src.database.db import LazySession, get_db
+from src.database.metrics import PoolMetrics
+from src.database.models import Base, Contact, User
+from src.database.seed import bulk_insert, generate_contacts
+from src.repository.users import recount_contacts
+from src.services.auth import Hash
+from src.services.limiter import limiter
+
+BENCH_USER = {"username": "bench", "email": "bench@example.com", "password": "bench-password"}
+
+# Ваги операцій для кожного профілю навантаження
+PROFILES = {
+    "read": {"list": 40, "birthdays": 20, "me": 20, "health": 15, "login": 5},
+    "mixed": {"list": 30, "birthdays": 10, "me": 15, "health": 10, "login": 5, "create": 20, "update": 10},
+    "write": {"list": 20, "create": 50, "update": 30},
+}
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """
+    Обчислює перцентиль методом найближчого рангу.
+
+    Args:
+        values (list[float]): Виміряні значення.
+        pct (float): Перцентиль від 0 до 100.
+
+    Returns:
+        float: Значення перцентиля або 0.0 для порожнього списку.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(latencies: dict[str, list[float]], errors: dict[str, int], elapsed: float) -> dict:
+    """
+    Формує звіт по маршрутах: кількість запитів, помилки, RPS і перцентилі затримки (мс).
+
+    Args:
+        latencies (dict[str, list[float]]): Затримки в секундах за назвою маршруту.
+        errors (dict[str, int]): Кількість помилкових відповідей за назвою маршруту.
+        elapsed (float): Тривалість прогону в секундах.
+
+    Returns:
+        dict: Звіт з ключами "routes" та "total".
+    """
+    routes = {}
+    for route, values in sorted(latencies.items()):
+        ms = [value * 1000 for value in values]
+        routes[route] = {
+            "requests": len(ms),
+            "errors": errors.get(route, 0),
+            "rps": round(len(ms) / elapsed, 2),
+            "p50_ms": round(percentile(ms, 50), 3),
+            "p95_ms": round(percentile(ms, 95), 3),
+            "p99_ms": round(percentile(ms, 99), 3),
+        }
+    all_ms = [value * 1000 for values in latencies.values() for value in values]
+    total = {
+        "requests": len(all_ms),
+        "errors": sum(errors.values()),
+        "rps": round(len(all_ms) / elapsed, 2),
+        "p50_ms": round(percentile(all_ms, 50), 3),
+        "p95_ms": round(percentile(all_ms, 95), 3),
+        "p99_ms": round(percentile(all_ms, 99), 3),
+    }
+    return {"routes": routes, "total": total}
+
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.1) -> list[str]:
+    """
+    Порівнює звіт з базовим і повертає список регресій.
+
+    Регресією вважається падіння RPS або зростання p95/p99 більше ніж на ``tolerance``.
+
+    Args:
+        current (dict): Поточний звіт.
+        baseline (dict): Базовий звіт.
+        tolerance (float): Допустиме відносне відхилення.
+
+    Returns:
+        list[str]: Опис кожної знайденої регресії.
+    """
+    regressions = []
+    for route, base in baseline["routes"].items():
+        now = current["routes"].get(route)
+        if now is None:
+            continue
+        if base["rps"] and now["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{route}: rps {now['rps']} < {base['rps']}")
+        for key in ("p95_ms", "p99_ms"):
+            if base[key] and now[key] > base[key] * (1 + tolerance):
+                regressions.append(f"{route}: {key} {now[key]} > {base[key]}")
+    return regressions
+
+
+async def seed(session_maker: async_sessionmaker, engine, contacts: int, seed_value: int) -> None:
+    """
+    Перестворює схему та заповнює базу користувачем бенчмарку і його контактами.
+
+    Args:
+        session_maker (async_sessionmaker): Фабрика сесій бази бенчмарку.
+        engine: AsyncEngine бази бенчмарку.
+        contacts (int): Кількість контактів.
+        seed_value (int): Зерно генератора випадкових чисел.
+    """
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    rng = random.Random(seed_value)
+    async with session_maker() as session:
+        user = User(
+            username=BENCH_USER["username"],
+            email=BENCH_USER["email"],
+            hashed_password=Hash().get_password_hash(BENCH_USER["password"]),
+            confirmed=True,
+        )
+        session.add(user)
+        await session.commit()
+        user_id = user.id
+
+    async with engine.begin() as conn:
+        await bulk_insert(conn, Contact.__table__, generate_contacts(rng, [user_id], [contacts]))
+        await conn.execute(recount_contacts([user_id]))
+
+
+class Workload:
+    """
+    Набір операцій, що виконуються проти застосунку з урахуванням ваг профілю.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, token: str, contacts: int, rng: random.Random):
+        self.client = client
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.contacts = contacts
+        self.rng = rng
+
+    def _body(self) -> dict:
+        row = next(generate_contacts(self.rng, [None], [1]))
+        for key in ("user_id", "created_at", "updated_at"):
+            row.pop(key)
+        row["birthday"] = row["birthday"].isoformat()
+        return row
+
+    async def list(self):
+        return await self.client.get("/api/contacts/", params={"limit": 100}, headers=self.headers)
+
+    async def birthdays(self):
+        return await self.client.get("/api/contacts/birthdays", params={"days": 30}, headers=self.headers)
+
+    async def me(self):
+        return await self.client.get("/api/users/me", headers=self.headers)
+
+    async def health(self):
+        return await self.client.get("/api/healthchecker")
+
+    async def login(self):
+        return await self.client.post(
+            "/api/auth/login",
+            data={"username": BENCH_USER["username"], "password": BENCH_USER["password"]},
+        )
+
+    async def create(self):
+        return await self.client.post("/api/contacts/", json=self._body(), headers=self.headers)
+
+    async def update(self):
+        contact_id = self.rng.randrange(1, self.contacts + 1)
+        return await self.client.put(f"/api/contacts/{contact_id}", json=self._body(), headers=self.headers)
+
+
+ROUTE_LABELS = {
+    "list": "GET /api/contacts/",
+    "birthdays": "GET /api/contacts/birthdays",
+    "me": "GET /api/users/me",
+    "health": "GET /api/healthchecker",
+    "login": "POST /api/auth/login",
+    "create": "POST /api/contacts/",
+    "update": "PUT /api/contacts/{contact_id}",
+}
+
+
+async def run(
+    db_url: str,
+    contacts: int = 1000,
+    profile: str = "mixed",
+    duration: float = 10.0,
+    concurrency: int = 16,
+    seed_value: int = 42,
+    lazy_sessions: bool = True,
+) -> dict:
+    """
+    Виконує прогін бенчмарку та повертає звіт.
+
+    Args:
+        db_url (str): URL бази даних бенчмарку (вміст буде перезаписано).
+        contacts (int): Кількість контактів для заповнення.
+        profile (str): Назва профілю навантаження з PROFILES.
+        duration (float): Тривалість прогону в секундах.
+        concurrency (int): Кількість одночасних клієнтів.
+        seed_value (int): Зерно генератора випадкових чисел.
+        lazy_sessions (bool): Видавати запитам LazySession (як get_db) чи звичайну сесію.
+
+    Returns:
+        dict: Звіт з параметрами прогону, показниками маршрутів, підсумком і метриками пулу.
+    """
+    engine = create_async_engine(db_url)
+    await seed(async_sessionmaker(bind=engine, expire_on_commit=False), engine, contacts, seed_value)
+    pool_metrics = PoolMetrics()
+    pool_metrics.attach(engine.sync_engine)
+    session_maker = async_sessionmaker(autoflush=False, autocommit=False, bind=engine)
+
+    async def override_get_db():
+        session = LazySession(session_maker) if lazy_sessions else session_maker()
+        try:
+            yield session
+        finally:
+            await session.close()
+
+    previous_override = app.dependency_overrides.get(get_db)
+    previous_limiter = limiter.enabled
+    app.dependency_overrides[get_db] = override_get_db
+    limiter.enabled = False
+
+    weights = PROFILES[profile]
+    latencies: dict[str, list[float]] = {ROUTE_LABELS[op]: [] for op in weights}
+    errors: dict[str, int] = {}
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await Workload(client, "", contacts, random.Random(seed_value)).login()
+            token = response.json()["access_token"]
+
+            async def worker(index: int, deadline: float):
+                rng = random.Random(seed_value + index)
+                workload = Workload(client, token, contacts, rng)
+                ops, op_weights = list(weights), list(weights.values())
+                while time.perf_counter() < deadline:
+                    op = rng.choices(ops, op_weights)[0]
+                    started = time.perf_counter()
+                    response = await getattr(workload, op)()
+                    label = ROUTE_LABELS[op]
+                    latencies[label].append(time.perf_counter() - started)
+                    if response.status_code >= 400:
+                        errors[label] = errors.get(label, 0) + 1
+
+            started = time.perf_counter()
+            deadline = started + duration
+            await asyncio.gather(*(worker(i, deadline) for i in range(concurrency)))
+            elapsed = time.perf_counter() - started
+    finally:
+        if previous_override is None:
+            app.dependency_overrides.pop(get_db, None)
+        else:
+            app.dependency_overrides[get_db] = previous_override
+        limiter.enabled = previous_limiter
+        await engine.dispose()
+
+    report = summarize(latencies, errors, elapsed)
+    report["pool"] = pool_metrics.snapshot()
+    report["config"] = {
+        "db": engine.dialect.name,
+        "contacts": contacts,
+        "profile": profile,
+        "duration": duration,
+        "concurrency": concurrency,
+        "seed": seed_value,
+        "lazy_sessions": lazy_sessions,
+    }
+    return report
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="HTTP load benchmark for the contacts API")
+    parser.add_argument("--db-url", default="sqlite+aiosqlite:///./bench.db")
+    parser.add_argument("--contacts", type=int, default=1000)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="mixed")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--eager-sessions", action="store_true", help="hold a plain session per request")
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(
+        run(
+            args.db_url, args.contacts, args.profile, args.duration, args.concurrency, args.seed,
+            lazy_sessions=not args.eager_sessions,
+        )
+    )
+    print(json.dumps(report, indent=2))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.baseline:
+        regressions = compare(report, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+Звіт про час імпорту застосунку (холодний старт воркера).
+
+Запускає ``python -X importtime -c "import main"`` в окремому процесі кілька разів,
+бере медіану для кожного модуля і звітує власний та сукупний час у мс, найважчі
+модулі та пакети верхнього рівня. Перевищення бюджету старту повертає код 1.
+
+Приклад::
+
+    python -m benchmarks.import_time --budget-ms 800 --output import_time.json
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Optional
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def parse_importtime(output: str) -> dict[str, dict]:
+    """
+    Розбирає вивід ``-X importtime``.
+
+    Args:
+        output (str): Вміст stderr процесу.
+
+    Returns:
+        dict[str, dict]: Модуль -> {"self_ms", "cumulative_ms", "depth"}.
+    """
+    modules = {}
+    for line in output.splitlines():
+        match = _LINE_RE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        modules[name] = {
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+            "depth": (len(indent) - 1) // 2,
+        }
+    return modules
+
+
+def measure_once(target: str, cwd: Path) -> dict[str, dict]:
+    """
+    Один раз імпортує ``target`` у новому процесі й повертає розібрані часи.
+
+    Args:
+        target (str): Модуль для імпорту.
+        cwd (Path): Робочий каталог процесу.
+
+    Returns:
+        dict[str, dict]: Результат parse_importtime.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=cwd,
+        env=os.environ.copy(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(completed.stderr)
+
+
+def build_report(runs: list[dict[str, dict]], target: str, top: int = 25) -> dict:
+    """
+    Об'єднує кілька прогонів у звіт з медіанними значеннями.
+
+    Args:
+        runs (list[dict[str, dict]]): Результати measure_once.
+        target (str): Імпортований модуль.
+        top (int): Скільки найважчих модулів включити до звіту.
+
+    Returns:
+        dict: Загальний час, час за пакетами верхнього рівня та найважчі модулі.
+    """
+    names = set().union(*runs)
+    modules = {}
+    for name in names:
+        samples = [run[name] for run in runs if name in run]
+        modules[name] = {
+            "self_ms": round(statistics.median(s["self_ms"] for s in samples), 3),
+            "cumulative_ms": round(statistics.median(s["cumulative_ms"] for s in samples), 3),
+        }
+
+    packages: dict[str, float] = {}
+    for name, timing in modules.items():
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0.0) + timing["self_ms"]
+
+    heaviest = sorted(modules.items(), key=lambda item: item[1]["cumulative_ms"], reverse=True)
+    return {
+        "target": target,
+        "runs": len(runs),
+        "total_ms": modules.get(target, {}).get("cumulative_ms", 0.0),
+        "packages_ms": dict(sorted(((k, round(v, 3)) for k, v in packages.items()), key=lambda kv: -kv[1])),
+        "modules": dict(heaviest[:top]),
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Import-time report for application cold start")
+    parser.add_argument("--target", default="main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+
+    root = Path(__file__).resolve().parent.parent
+    runs = [measure_once(args.target, root) for _ in range(args.runs)]
+    report = build_report(runs, args.target, args.top)
+
+    print(f"import {args.target}: {report['total_ms']:.1f} ms (median of {args.runs})")
+    for package, ms in list(report["packages_ms"].items())[:15]:
+        print(f"  {package:30} {ms:10.1f} ms")
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.budget_ms is not None and report["total_ms"] > args.budget_ms:
+        print(f"Startup budget exceeded: {report['total_ms']:.1f} ms > {args.budget_ms} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
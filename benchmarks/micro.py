@@ -0,0 +1,310 @@
+"""
+Мікробенчмарки гарячих внутрішніх функцій.
+
+Кожен бенчмарк калібрує кількість ітерацій так, щоб один повтор тривав щонайменше
+``--min-time`` секунд, виконує ``--repeat`` повторів і звітує min/median/mean/stdev
+часу однієї операції в мікросекундах. Звіт зберігається в JSON і може порівнюватися
+з базовим, щоб зміни в ``src/services/auth.py`` та ``src/services/contacts.py``
+супроводжувалися цифрами.
+
+Приклад::
+
+    python -m benchmarks.micro --output micro.json --baseline benchmarks/micro_baseline.json
+    python -m benchmarks.micro --filter bcrypt
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Optional, Union
+from unittest.mock import AsyncMock, MagicMock
+
+from jose import jwt
+from passlib.context import CryptContext
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.conf.config import settings
+from src.database.models import Base, Contact, User
+from src.database.seed import FIRST_NAMES, LAST_NAMES, generate_contacts
+from src.repository.contacts import CONTACTS_PAGE
+from src.repository.users import USER_BY_USERNAME
+from src.schemas.contacts import ContactBase, ContactResponse
+from src.services.auth import Hash, create_access_token, get_current_user
+from src.services.birthdays import BirthdayIndex
+from src.services.dedup import find_duplicates
+from src.services.contacts import ContactService
+from src.services.search import ContactPrefixIndex, ContactSearchIndex
+
+BenchFn = Callable[[], Union[None, Awaitable[None]]]
+
+
+def _time_loops(fn: BenchFn, loops: int, is_async: bool, loop: asyncio.AbstractEventLoop) -> float:
+    if is_async:
+        async def runner():
+            started = time.perf_counter()
+            for _ in range(loops):
+                await fn()
+            return time.perf_counter() - started
+
+        return loop.run_until_complete(runner())
+    started = time.perf_counter()
+    for _ in range(loops):
+        fn()
+    return time.perf_counter() - started
+
+
+def measure(fn: BenchFn, repeat: int = 5, min_time: float = 0.2, is_async: bool = False) -> dict:
+    """
+    Вимірює час однієї операції з калібруванням кількості ітерацій.
+
+    Args:
+        fn (BenchFn): Функція або корутинна функція без аргументів.
+        repeat (int): Кількість повторів вимірювання.
+        min_time (float): Мінімальна тривалість одного повтору, с.
+        is_async (bool): Чи є ``fn`` корутинною функцією.
+
+    Returns:
+        dict: Кількість ітерацій і повторів та статистика часу операції (мкс).
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        loops = 1
+        while True:
+            elapsed = _time_loops(fn, loops, is_async, loop)
+            if elapsed >= min_time:
+                break
+            loops *= 10 if elapsed < min_time / 10 else 2
+        timings = [_time_loops(fn, loops, is_async, loop) / loops * 1e6 for _ in range(repeat)]
+    finally:
+        loop.close()
+    return {
+        "loops": loops,
+        "repeat": repeat,
+        "min_us": round(min(timings), 3),
+        "median_us": round(statistics.median(timings), 3),
+        "mean_us": round(statistics.fmean(timings), 3),
+        "stdev_us": round(statistics.stdev(timings), 3) if repeat > 1 else 0.0,
+    }
+
+
+def _contacts(count: int) -> list[Contact]:
+    return [
+        Contact(
+            id=i,
+            first_name=f"First{i}",
+            last_name=f"Last{i}",
+            email=f"contact{i}@example.com",
+            phone_number="+380671234567",
+            birthday=date(1990, 1, 1 + i % 28),
+            created_at=datetime(2025, 1, 1),
+        )
+        for i in range(count)
+    ]
+
+
+def _mock_db(scalar=None, scalars=()) -> AsyncMock:
+    db = AsyncMock(spec=AsyncSession)
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = scalar
+    result.scalars.return_value.all.return_value = list(scalars)
+    db.execute.return_value = result
+    return db
+
+
+def _query_benchmarks(benchmarks: dict[str, tuple[BenchFn, bool]]) -> None:
+    # Вбудована SQLite у пам'яті: час запиту складається переважно з роботи
+    # SQLAlchemy (побудова запиту, ключ кешу, завантаження об'єктів)
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = Session(engine)
+    user = User(username="deadpool", email="deadpool@example.com", hashed_password="x", confirmed=True)
+    session.add(user)
+    session.flush()
+    session.add_all(Contact(**{**contact, "user_id": user.id}) for contact in generate_contacts(
+        random.Random(3), [user.id], [100]
+    ))
+    session.commit()
+    page = {"user_id": user.id, "skip": 0, "limit": 20}
+
+    benchmarks["query_cache_key_user_inline"] = (
+        lambda: select(User).filter_by(username="deadpool")._generate_cache_key(), False
+    )
+    benchmarks["query_cache_key_user_prebuilt"] = (lambda: USER_BY_USERNAME._generate_cache_key(), False)
+    benchmarks["query_user_by_username_inline"] = (
+        lambda: session.execute(select(User).filter_by(username="deadpool")).scalar_one_or_none(), False
+    )
+    benchmarks["query_user_by_username_prebuilt"] = (
+        lambda: session.execute(USER_BY_USERNAME, {"username": "deadpool"}).scalar_one_or_none(), False
+    )
+    benchmarks["query_contacts_page_inline"] = (
+        lambda: session.execute(
+            select(Contact).filter_by(user_id=user.id).offset(0).limit(20)
+        ).scalars().all(), False
+    )
+    benchmarks["query_contacts_page_prebuilt"] = (
+        lambda: session.execute(CONTACTS_PAGE, page).scalars().all(), False
+    )
+
+
+def build_benchmarks() -> dict[str, tuple[BenchFn, bool]]:
+    """
+    Створює набір бенчмарків.
+
+    Returns:
+        dict[str, tuple[BenchFn, bool]]: Назва бенчмарку -> (функція, чи асинхронна).
+    """
+    benchmarks: dict[str, tuple[BenchFn, bool]] = {}
+
+    for rounds in (4, 8, 10, 12):
+        hasher = Hash()
+        hasher.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+        hashed = hasher.get_password_hash("password123")
+        benchmarks[f"bcrypt_hash_rounds_{rounds}"] = (
+            lambda h=hasher: h.get_password_hash("password123"), False
+        )
+        benchmarks[f"bcrypt_verify_rounds_{rounds}"] = (
+            lambda h=hasher, hp=hashed: h.verify_password("password123", hp), False
+        )
+
+    async def token_roundtrip():
+        token = await create_access_token({"sub": "deadpool"})
+        jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+
+    benchmarks["access_token_create_decode"] = (token_roundtrip, True)
+
+    rows = _contacts(1000)
+    benchmarks["contact_response_from_orm_1k"] = (
+        lambda: [ContactResponse.from_orm(row) for row in rows], False
+    )
+    benchmarks["contact_response_model_validate_1k"] = (
+        lambda: [ContactResponse.model_validate(row) for row in rows], False
+    )
+
+    payloads = [
+        {
+            "first_name": f"First{i}",
+            "last_name": f"Last{i}",
+            "email": f"contact{i}@example.com",
+            "phone_number": "+380671234567",
+            "birthday": "1990-01-01",
+        }
+        for i in range(1000)
+    ]
+    benchmarks["contact_base_validate_1k"] = (
+        lambda: [ContactBase.model_validate(payload) for payload in payloads], False
+    )
+
+    search_service = ContactService(_mock_db())
+    benchmarks["search_contacts_query_build"] = (
+        lambda: search_service.search_contacts("John", "Doe", "example.com"), True
+    )
+
+    rng = random.Random(7)
+    names = [(i, rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)) for i in range(100_000)]
+    index = ContactSearchIndex.build(names)
+    benchmarks["fuzzy_search_100k"] = (lambda: index.search("Jonh Smiht", limit=100), False)
+    prefixes = ContactPrefixIndex.build(
+        (i, first, last, f"{first}.{last}{i}@example.com".lower()) for i, first, last in names
+    )
+    benchmarks["autocomplete_100k"] = (lambda: prefixes.complete("jo", limit=10), False)
+    birthdays = BirthdayIndex()
+    created_at = datetime(2024, 1, 1)
+    for i, first, last in names:
+        md = rng.randint(1, 12) * 100 + rng.randint(1, 28)
+        birthdays.add(i, md, ContactResponse(
+            id=i, first_name=first, last_name=last, email="", created_at=created_at, phone_number=None
+        ))
+    benchmarks["birthday_window_100k"] = (
+        lambda: birthdays.window(date(2026, 12, 28), 7, limit=100), False
+    )
+    book = [
+        (i, row["first_name"], row["last_name"], row["email"], row["phone_number"])
+        for i, row in enumerate(generate_contacts(rng, [1], [100_000]), start=1)
+    ]
+    benchmarks["dedup_full_100k"] = (lambda: find_duplicates(book), False)
+    benchmarks["dedup_incremental_100k"] = (lambda: find_duplicates(book, changed={50_000}), False)
+
+    user = User(id=1, username="deadpool", email="deadpool@example.com", confirmed=True)
+    user_db = _mock_db(scalar=user)
+    token = asyncio.run(create_access_token({"sub": "deadpool"}))
+    benchmarks["get_current_user_mocked_session"] = (
+        lambda: get_current_user(token, user_db), True
+    )
+    _query_benchmarks(benchmarks)
+    return benchmarks
+
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.1) -> list[str]:
+    """
+    Порівнює медіани зі звітом-базою та повертає список регресій.
+
+    Args:
+        current (dict): Поточний звіт.
+        baseline (dict): Базовий звіт.
+        tolerance (float): Допустиме відносне сповільнення.
+
+    Returns:
+        list[str]: Опис кожної знайденої регресії.
+    """
+    regressions = []
+    for name, base in baseline["results"].items():
+        now = current["results"].get(name)
+        if now is not None and now["median_us"] > base["median_us"] * (1 + tolerance):
+            regressions.append(f"{name}: median {now['median_us']}us > {base['median_us']}us")
+    return regressions
+
+
+def run(name_filter: str = "", repeat: int = 5, min_time: float = 0.2) -> dict:
+    """
+    Виконує бенчмарки, назви яких містять ``name_filter``.
+
+    Args:
+        name_filter (str): Підрядок для відбору бенчмарків.
+        repeat (int): Кількість повторів.
+        min_time (float): Мінімальна тривалість одного повтору, с.
+
+    Returns:
+        dict: Звіт з параметрами прогону та результатами.
+    """
+    results = {}
+    for name, (fn, is_async) in build_benchmarks().items():
+        if name_filter in name:
+            results[name] = measure(fn, repeat, min_time, is_async)
+    return {
+        "config": {"repeat": repeat, "min_time": min_time, "python": sys.version.split()[0]},
+        "results": results,
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for hot internal functions")
+    parser.add_argument("--filter", default="")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    report = run(args.filter, args.repeat, args.min_time)
+    for name, result in report["results"].items():
+        print(f"{name:40} {result['median_us']:>14.3f} us  (stdev {result['stdev_us']:.3f}, loops {result['loops']})")
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.baseline:
+        regressions = compare(report, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""
+Порівняння утримання з'єднань пулу: звичайна сесія на запит проти LazySession.
+
+Запускає benchmarks.http_load двічі з однаковими параметрами та виводить кількість
+видач з'єднань, сумарний і середній час їх утримання та RPS.
+
+Приклад::
+
+    python -m benchmarks.pool_checkout --profile read --duration 10 --concurrency 32
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import Optional
+
+from benchmarks.http_load import PROFILES, run
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Pool checkout time: eager vs lazy sessions")
+    parser.add_argument("--db-url", default="sqlite+aiosqlite:///./bench.db")
+    parser.add_argument("--contacts", type=int, default=1000)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="read")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+
+    results = {}
+    for mode, lazy in (("eager", False), ("lazy", True)):
+        report = asyncio.run(
+            run(args.db_url, args.contacts, args.profile, args.duration, args.concurrency, lazy_sessions=lazy)
+        )
+        results[mode] = {"pool": report["pool"], "total": report["total"]}
+        pool = report["pool"]
+        print(
+            f"{mode:6} checkouts {pool['checkouts']:>7}  total hold {pool['total_hold_ms']:>12.1f} ms  "
+            f"mean hold {pool['mean_hold_ms']:>8.3f} ms  rps {report['total']['rps']:>8}"
+        )
+    eager, lazy = results["eager"]["pool"], results["lazy"]["pool"]
+    if eager["mean_hold_ms"]:
+        saved = 1 - lazy["mean_hold_ms"] / eager["mean_hold_ms"]
+        print(f"mean checkout time saved: {saved:.1%}")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Порівняння конфігурацій сервера uvicorn.
+
+Для кожної конфігурації запускає uvicorn в окремому процесі, чекає готовності,
+навантажує вказані маршрути конкурентними клієнтами httpx і звітує RPS та
+p50/p95/p99. Конфігурації, що потребують невстановлених uvloop/httptools,
+пропускаються.
+
+Приклад::
+
+    python -m benchmarks.server_configs --duration 10 --concurrency 64 --output server.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+from benchmarks.http_load import summarize
+from src.conf.server import has_module, available_cpus
+
+CONFIGS = {
+    "dev_single_asyncio_h11": {"workers": 1, "loop": "asyncio", "http": "h11"},
+    "single_uvloop_httptools": {"workers": 1, "loop": "uvloop", "http": "httptools"},
+    "multi_asyncio_h11": {"workers": None, "loop": "asyncio", "http": "h11"},
+    "multi_uvloop_httptools": {"workers": None, "loop": "uvloop", "http": "httptools"},
+}
+
+
+def _command(config: dict, port: int) -> list[str]:
+    workers = config["workers"] or available_cpus()
+    return [
+        sys.executable, "-m", "uvicorn", "main:app",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers),
+        "--loop", config["loop"], "--http", config["http"],
+        "--no-access-log", "--log-level", "warning",
+    ]
+
+
+async def _wait_ready(client: httpx.AsyncClient, url: str, timeout: float = 30.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            await client.get(url)
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not start in {timeout}s")
+
+
+async def load(base_url: str, paths: list[str], duration: float, concurrency: int) -> dict:
+    """
+    Навантажує запущений сервер і повертає звіт summarize.
+
+    Args:
+        base_url (str): Адреса сервера.
+        paths (list[str]): Маршрути, що запитуються по колу.
+        duration (float): Тривалість, с.
+        concurrency (int): Кількість одночасних клієнтів.
+
+    Returns:
+        dict: Звіт з показниками маршрутів та підсумком.
+    """
+    latencies: dict[str, list[float]] = {path: [] for path in paths}
+    errors: dict[str, int] = {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+        await _wait_ready(client, paths[0])
+
+        async def worker(index: int, deadline: float):
+            step = index
+            while time.perf_counter() < deadline:
+                path = paths[step % len(paths)]
+                step += 1
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    failed = response.status_code >= 400
+                except httpx.TransportError:
+                    failed = True
+                latencies[path].append(time.perf_counter() - started)
+                if failed:
+                    errors[path] = errors.get(path, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i, started + duration) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return summarize(latencies, errors, elapsed)
+
+
+def run_config(name: str, port: int, paths: list[str], duration: float, concurrency: int) -> Optional[dict]:
+    """
+    Запускає сервер у конфігурації ``name`` та вимірює його.
+
+    Returns:
+        Optional[dict]: Звіт або None, якщо конфігурація недоступна в цьому середовищі.
+    """
+    config = CONFIGS[name]
+    optional = [config[key] for key in ("loop", "http") if config[key] not in ("asyncio", "h11")]
+    if not all(has_module(module) for module in optional):
+        return None
+    root = Path(__file__).resolve().parent.parent
+    process = subprocess.Popen(_command(config, port), cwd=root, env=os.environ.copy())
+    try:
+        report = asyncio.run(load(f"http://127.0.0.1:{port}", paths, duration, concurrency))
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    report["config"] = {**config, "workers": config["workers"] or available_cpus()}
+    return report
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare uvicorn server configurations")
+    parser.add_argument("--configs", nargs="*", choices=sorted(CONFIGS), default=list(CONFIGS))
+    parser.add_argument("--paths", nargs="*", default=["/", "/api/healthchecker"])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name in args.configs:
+        report = run_config(name, args.port, args.paths, args.duration, args.concurrency)
+        if report is None:
+            print(f"{name:28} skipped (uvloop/httptools not installed)")
+            continue
+        results[name] = report
+        total = report["total"]
+        print(f"{name:28} rps {total['rps']:>10} p50 {total['p50_ms']:>8} ms p99 {total['p99_ms']:>8} ms")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""
+Пропускна здатність SQLite: типова конфігурація проти профілю SQLite
+(WAL, PRAGMA, єдине з'єднання запису та пул читання).
+
+Для кожного режиму створює нову файлову базу, засіває її контактами та запускає
+конкурентних клієнтів, що через ContactService читають списки контактів і
+створюють/оновлюють контакти у заданій пропорції. Звітує кількість операцій за
+секунду, p50/p95/p99 та кількість помилок (зокрема "database is locked").
+
+Приклад::
+
+    python -m benchmarks.sqlite_profile --duration 10 --concurrency 32 --write-ratio 0.2
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from benchmarks.http_load import summarize
+from src.database.db import DatabaseSessionManager
+from src.database.models import Base, Contact, User
+from src.database.seed import bulk_insert, generate_contacts
+from src.schemas.contacts import ContactBase
+from src.services.contacts import ContactService
+
+MODES = {"default": False, "sqlite_profile": True}
+# Власник усіх контактів прогону (не прив'язаний до жодної сесії)
+OWNER = User(id=1, username="bench", email="bench@example.com")
+
+
+def _contact_body(rng: random.Random, index: int) -> ContactBase:
+    return ContactBase(
+        first_name=f"Bench{index}",
+        last_name=rng.choice(["Shevchenko", "Kovalenko", "Bondarenko"]),
+        email=f"bench{index}@example.com",
+        phone_number=f"+380{rng.randrange(10**9):09d}",
+        birthday=date(1990, rng.randint(1, 12), rng.randint(1, 28)),
+    )
+
+
+async def _prepare(url: str, contacts: int, seed_value: int) -> None:
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(User).values(
+            id=OWNER.id, username=OWNER.username, email=OWNER.email, hashed_password="x", confirmed=True
+        ))
+        rows = generate_contacts(random.Random(seed_value), [OWNER.id], [contacts])
+        await bulk_insert(conn, Contact.__table__, rows)
+    await engine.dispose()
+
+
+async def run(
+    mode: str,
+    contacts: int = 1000,
+    duration: float = 10.0,
+    concurrency: int = 16,
+    write_ratio: float = 0.2,
+    seed_value: int = 42,
+) -> dict:
+    """
+    Виконує прогін для одного режиму на тимчасовій файловій базі.
+
+    Args:
+        mode (str): Назва режиму з ``MODES``.
+        contacts (int): Кількість контактів для засіву.
+        duration (float): Тривалість навантаження, с.
+        concurrency (int): Кількість одночасних клієнтів.
+        write_ratio (float): Частка операцій запису (створення або оновлення).
+        seed_value (int): Зерно генератора випадкових чисел.
+
+    Returns:
+        dict: Звіт summarize з кількістю помилок блокування та параметрами прогону.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite+aiosqlite:///{Path(directory) / 'bench.db'}"
+        await _prepare(url, contacts, seed_value)
+        manager = DatabaseSessionManager(url, sqlite_profile=MODES[mode])
+        latencies: dict[str, list[float]] = {"read": [], "create": [], "update": []}
+        errors: dict[str, int] = {}
+        locked = 0
+        counter = 0
+
+        async def worker(index: int, deadline: float):
+            nonlocal locked, counter
+            rng = random.Random(seed_value + index)
+            while time.perf_counter() < deadline:
+                roll = rng.random()
+                op = "read" if roll >= write_ratio else ("create" if roll < write_ratio / 2 else "update")
+                counter += 1
+                started = time.perf_counter()
+                try:
+                    async with manager.session() as db:
+                        service = ContactService(db)
+                        if op == "read":
+                            await service.get_contacts(OWNER, skip=rng.randrange(contacts), limit=20)
+                        elif op == "create":
+                            await service.create_contact(_contact_body(rng, counter), OWNER)
+                        else:
+                            contact_id = rng.randint(1, contacts)
+                            await service.update_contact(contact_id, _contact_body(rng, contact_id), OWNER)
+                except OperationalError as e:
+                    errors[op] = errors.get(op, 0) + 1
+                    if "locked" in str(e):
+                        locked += 1
+                latencies[op].append(time.perf_counter() - started)
+
+        try:
+            started = time.perf_counter()
+            await asyncio.gather(*(worker(i, started + duration) for i in range(concurrency)))
+            elapsed = time.perf_counter() - started
+        finally:
+            await manager.close()
+
+    report = summarize(latencies, errors, elapsed)
+    report["locked_errors"] = locked
+    report["config"] = {
+        "mode": mode,
+        "contacts": contacts,
+        "duration": duration,
+        "concurrency": concurrency,
+        "write_ratio": write_ratio,
+        "seed": seed_value,
+    }
+    return report
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="SQLite throughput: default vs SQLite profile")
+    parser.add_argument("--modes", nargs="*", choices=sorted(MODES), default=list(MODES))
+    parser.add_argument("--contacts", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+
+    results = {}
+    for mode in args.modes:
+        report = asyncio.run(
+            run(mode, args.contacts, args.duration, args.concurrency, args.write_ratio, args.seed)
+        )
+        results[mode] = report
+        total = report["total"]
+        print(
+            f"{mode:16} ops/s {total['rps']:>9}  p99 {total['p99_ms']:>9} ms  "
+            f"errors {total['errors']:>5}  locked {report['locked_errors']:>5}"
+        )
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,23 +1,61 @@
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-import uvicorn
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 
 from slowapi import Limiter
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
 from starlette.responses import JSONResponse
+from starlette.staticfiles import StaticFiles
 
 from src.api import utils, contacts, auth, users
 from src.services.limiter import limiter
+from src.database.slow_query import RouteContextMiddleware
+from src.services.profiling import ProfilingMiddleware
+from src.conf.config import settings
+from src.database.db import sessionmanager
+from src.services.redis import close_redis_client
+from src.services.health import health_monitor
+from src.services.maintenance import birthday_digest_task, dedup_task, purge_task, tombstone_task
+from src.services.events import contact_events
+from src.services.avatars import shutdown_thumbnail_pool
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Важкі підсистеми (пошта, Gravatar, Redis, рушій БД) ініціалізуються ліниво
+    # при першому використанні, тут лише звільняємо те, що встигли створити
+    health_monitor.start()
+    # Каталог локального сховища аватарів роздається як статичні файли
+    settings.AVATAR_DIR.mkdir(parents=True, exist_ok=True)
+    if settings.PURGE_UNCONFIRMED_ENABLED:
+        purge_task.start()
+    if settings.TOMBSTONE_PRUNE_ENABLED:
+        tombstone_task.start()
+    if settings.BIRTHDAY_DIGEST_ENABLED:
+        birthday_digest_task.start()
+    if settings.DEDUP_ENABLED:
+        dedup_task.start()
+    yield
+    await dedup_task.stop()
+    await birthday_digest_task.stop()
+    await contact_events.close()
+    await tombstone_task.stop()
+    await purge_task.stop()
+    await health_monitor.stop()
+    shutdown_thumbnail_pool()
+    await sessionmanager.close()
+    await close_redis_client()
+
+
+app = FastAPI(lifespan=lifespan)
 
 origins = [
     "<http://localhost:3000>"
@@ -29,6 +67,7 @@ app.include_router(utils.router, prefix="/api")
 app.include_router(contacts.router, prefix="/api")
 app.include_router(auth.router, prefix="/api")
 app.include_router(users.router, prefix="/api")
+app.mount(settings.AVATAR_URL_PREFIX, StaticFiles(directory=settings.AVATAR_DIR, check_dir=False), name="avatars")
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -36,19 +75,32 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(RouteContextMiddleware)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(
+        ProfilingMiddleware,
+        output_dir=settings.PROFILING_DIR,
+        token=settings.PROFILING_TOKEN,
+        header_name=settings.PROFILING_HEADER,
+        sample_rate=settings.PROFILING_SAMPLE_RATE,
+        interval_ms=settings.PROFILING_INTERVAL_MS,
+        fmt=settings.PROFILING_FORMAT,
+    )
 
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to FastAPI"}
 
-if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True, workers=4)
-
-
 @app.exception_handler(RateLimitExceeded)
 async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
     return JSONResponse(
         status_code=429,
         content={"error": "Перевищено ліміт запитів. Спробуйте пізніше."},
-    )  
\ No newline at end of file
+    )
+
+
+if __name__ == "__main__":
+    from src.conf.server import run
+
+    run()
@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 from alembic import context
 
 from src.database.models import Base
+from src.database.online_migrations import CHECKPOINT_TABLE
 from src.conf.config import settings as app_config
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -24,7 +25,16 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
-config.set_main_option("sqlalchemy.url", app_config.DB_URL)
+# "alembic -x shard=N upgrade head" мігрує N-й шард з DB_SHARD_URLS замість основної бази
+shard = context.get_x_argument(as_dictionary=True).get("shard")
+config.set_main_option(
+    "sqlalchemy.url", app_config.DB_URL if shard is None else app_config.DB_SHARD_URLS[int(shard)]
+)
+
+
+def include_name(name, type_, parent_names):
+    # Службова таблиця контрольних точок онлайн-міграцій не входить до моделей
+    return not (type_ == "table" and name == CHECKPOINT_TABLE)
 
 
 # other values from the config, defined by the needs of env.py,
@@ -49,6 +59,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -58,7 +69,9 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection, target_metadata=target_metadata, include_name=include_name
+    )
 
     with context.begin_transaction():
         context.run_migrations()
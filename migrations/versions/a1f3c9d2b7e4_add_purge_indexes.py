@@ -0,0 +1,37 @@
+"""add indexes for purging unconfirmed users
+
+Revision ID: a1f3c9d2b7e4
+Revises: c5432c29381d
+Create Date: 2026-10-19 10:12:41.108311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.database.online_migrations import create_index_online, drop_index_online
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1f3c9d2b7e4'
+down_revision: Union[str, None] = 'c5432c29381d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    create_index_online(op, 'ix_contacts_user_id', 'contacts', ['user_id'])
+    create_index_online(
+        op,
+        'ix_users_unconfirmed_created_at',
+        'users',
+        ['created_at'],
+        postgresql_where=sa.text('NOT confirmed'),
+        sqlite_where=sa.text('NOT confirmed'),
+    )
+
+
+def downgrade() -> None:
+    drop_index_online(op, 'ix_users_unconfirmed_created_at', 'users')
+    drop_index_online(op, 'ix_contacts_user_id', 'contacts')
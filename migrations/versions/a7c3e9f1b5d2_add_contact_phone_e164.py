@@ -0,0 +1,51 @@
+"""add normalized E.164 phone column for reverse lookup
+
+Revision ID: a7c3e9f1b5d2
+Revises: f2b8d5a9c4e7
+Create Date: 2026-10-19 16:11:37.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.database.online_migrations import (
+    add_column_online,
+    backfill,
+    create_index_online,
+    drop_index_online,
+)
+from src.database.phones import to_e164
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e9f1b5d2'
+down_revision: Union[str, None] = 'f2b8d5a9c4e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _phone_e164(row):
+    e164 = to_e164(row.phone_number)
+    return {'phone_e164': e164} if e164 else None
+
+
+def upgrade() -> None:
+    add_column_online(op, 'contacts', sa.Column('phone_e164', sa.String(length=16), nullable=True))
+    with op.get_context().autocommit_block():
+        backfill(
+            op.get_bind(),
+            'contacts_phone_e164',
+            'contacts',
+            compute=_phone_e164,
+            columns=['phone_number'],
+            where=sa.column('phone_e164').is_(None),
+            batch_size=5000,
+        )
+    create_index_online(op, 'ix_contacts_user_id_phone_e164', 'contacts', ['user_id', 'phone_e164'])
+
+
+def downgrade() -> None:
+    drop_index_online(op, 'ix_contacts_user_id_phone_e164', 'contacts')
+    op.drop_column('contacts', 'phone_e164')
@@ -0,0 +1,40 @@
+"""add trigram index for fuzzy contact name search
+
+Revision ID: b7d2e4f1c9a3
+Revises: a1f3c9d2b7e4
+Create Date: 2026-10-19 11:02:17.530142
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.database.online_migrations import create_index_online, drop_index_online
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2e4f1c9a3'
+down_revision: Union[str, None] = 'a1f3c9d2b7e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Лише Postgres: в інших СУБД нечіткий пошук працює через індекс у пам'яті процесу
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    create_index_online(
+        op,
+        'ix_contacts_full_name_trgm',
+        'contacts',
+        [sa.text("(first_name || ' ' || last_name) gin_trgm_ops")],
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    drop_index_online(op, 'ix_contacts_full_name_trgm', 'contacts')
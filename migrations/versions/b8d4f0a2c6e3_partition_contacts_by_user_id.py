@@ -0,0 +1,60 @@
+"""hash-partition contacts by user_id (optional, Postgres only)
+
+Revision ID: b8d4f0a2c6e3
+Revises: a7c3e9f1b5d2
+Create Date: 2026-10-19 17:26:05.913342
+
+Виконується лише на Postgres з ``CONTACTS_PARTITIONS`` >= 2, інакше нічого не
+змінює. Рядки копіюються в секціоновану таблицю онлайн (тригер-дзеркало і
+пакетне копіювання з контрольними точками), рядки, що розійшлися з вихідною
+таблицею, видаляються звіркою, після чого таблиці підміняються короткою
+транзакцією. Стара таблиця залишається як ``contacts_unpartitioned``;
+видаліть її вручну після перевірки. Відкат копіює дані назад під блокуванням.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import text
+
+from src.conf.config import settings
+from src.database.online_migrations import copy_rows, reconcile_rows, reset_checkpoint
+from src.database.partitioning import (
+    cut_over,
+    is_partitioned,
+    prepare_partitioned_copy,
+    revert_partitioning,
+    validate_constraints,
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d4f0a2c6e3'
+down_revision: Union[str, None] = 'a7c3e9f1b5d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql' or settings.CONTACTS_PARTITIONS < 2:
+        return
+    if is_partitioned(bind, 'contacts'):
+        return
+    prepare_partitioned_copy(bind, 'contacts', settings.CONTACTS_PARTITIONS)
+    with op.get_context().autocommit_block():
+        copy_rows(bind, 'contacts_partitioned', 'contacts', 'contacts_partitioned', batch_size=5000)
+        reconcile_rows(bind, 'contacts', 'contacts_partitioned')
+        bind.execute(text('ANALYZE contacts_partitioned'))
+    constraints = cut_over(bind, 'contacts')
+    with op.get_context().autocommit_block():
+        validate_constraints(bind, constraints)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql' or not is_partitioned(bind, 'contacts'):
+        return
+    constraints = revert_partitioning(bind, 'contacts')
+    with op.get_context().autocommit_block():
+        validate_constraints(bind, constraints)
+        reset_checkpoint(bind, 'contacts_partitioned')
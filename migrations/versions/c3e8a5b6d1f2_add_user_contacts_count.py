@@ -0,0 +1,44 @@
+"""add contacts_count counter to users
+
+Revision ID: c3e8a5b6d1f2
+Revises: b7d2e4f1c9a3
+Create Date: 2026-10-19 12:20:45.801337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.database.online_migrations import backfill
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e8a5b6d1f2'
+down_revision: Union[str, None] = 'b7d2e4f1c9a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Константне значення за замовчуванням у Postgres 11+ не перезаписує таблицю
+    op.add_column(
+        'users',
+        sa.Column('contacts_count', sa.Integer(), nullable=False, server_default=sa.text('0')),
+    )
+    with op.get_context().autocommit_block():
+        backfill(
+            op.get_bind(),
+            'users_contacts_count',
+            'users',
+            values={
+                'contacts_count': sa.text(
+                    '(SELECT count(*) FROM contacts WHERE contacts.user_id = users.id)'
+                )
+            },
+            batch_size=5000,
+        )
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'contacts_count')
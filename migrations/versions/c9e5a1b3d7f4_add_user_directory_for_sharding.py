@@ -0,0 +1,37 @@
+"""add user directory for sharding users across databases
+
+Revision ID: c9e5a1b3d7f4
+Revises: b8d4f0a2c6e3
+Create Date: 2026-10-19 19:02:48.613027
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9e5a1b3d7f4'
+down_revision: Union[str, None] = 'b8d4f0a2c6e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Таблиця використовується лише в основній базі (DB_URL); на шардах лишається порожньою.
+    # Наявних користувачів переносить "python -m src.database.sharding sync-directory"
+    op.create_table(
+        'user_directory',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('shard', sa.SmallInteger(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('username'),
+        sa.UniqueConstraint('email'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_directory')
@@ -0,0 +1,80 @@
+"""add change sequence and tombstones for delta sync
+
+Revision ID: d4f9b2c7e8a1
+Revises: c3e8a5b6d1f2
+Create Date: 2026-10-19 13:05:17.402918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.database.online_migrations import (
+    add_column_online,
+    backfill,
+    create_index_online,
+    drop_index_online,
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f9b2c7e8a1'
+down_revision: Union[str, None] = 'c3e8a5b6d1f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    add_column_online(op, 'contacts', sa.Column('change_seq', sa.BigInteger(), nullable=True))
+    op.add_column(
+        'users',
+        sa.Column('change_seq', sa.BigInteger(), nullable=False, server_default=sa.text('0')),
+    )
+    op.create_table(
+        'contact_tombstones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('contact_id', sa.Integer(), nullable=False),
+        sa.Column('change_seq', sa.BigInteger(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_contact_tombstones_user_id_change_seq', 'contact_tombstones', ['user_id', 'change_seq']
+    )
+    op.create_index('ix_contact_tombstones_deleted_at', 'contact_tombstones', ['deleted_at'])
+    # Існуючі контакти отримують послідовність за id, лічильник користувача — максимум із них
+    with op.get_context().autocommit_block():
+        backfill(
+            op.get_bind(),
+            'contacts_change_seq',
+            'contacts',
+            values={'change_seq': sa.column('id')},
+            where=sa.column('change_seq').is_(None),
+            batch_size=5000,
+        )
+        backfill(
+            op.get_bind(),
+            'users_change_seq',
+            'users',
+            values={
+                'change_seq': sa.text(
+                    '(SELECT coalesce(max(contacts.id), 0) FROM contacts WHERE contacts.user_id = users.id)'
+                )
+            },
+            batch_size=5000,
+        )
+    create_index_online(op, 'ix_contacts_user_id_change_seq', 'contacts', ['user_id', 'change_seq'])
+    drop_index_online(op, 'ix_contacts_user_id', 'contacts')
+
+
+def downgrade() -> None:
+    create_index_online(op, 'ix_contacts_user_id', 'contacts', ['user_id'])
+    drop_index_online(op, 'ix_contacts_user_id_change_seq', 'contacts')
+    op.drop_index('ix_contact_tombstones_deleted_at', table_name='contact_tombstones')
+    op.drop_index('ix_contact_tombstones_user_id_change_seq', table_name='contact_tombstones')
+    op.drop_table('contact_tombstones')
+    op.drop_column('users', 'change_seq')
+    op.drop_column('contacts', 'change_seq')
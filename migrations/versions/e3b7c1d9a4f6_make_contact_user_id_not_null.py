@@ -0,0 +1,45 @@
+"""make contacts.user_id NOT NULL
+
+Revision ID: e3b7c1d9a4f6
+Revises: c9e5a1b3d7f4
+Create Date: 2026-10-19 21:14:52.380914
+
+Виконується лише на Postgres. Контакт без власника недоступний через API і
+не може бути в секціонованій таблиці з ключем (user_id, id). Якщо такі
+контакти є, міграція зупиняється: призначте їм власника або видаліть їх
+вручну. NOT NULL встановлює ``set_not_null_online``: CHECK ... NOT VALID
+фіксується окремо, перевіряється поза транзакцією без блокування запису, тож
+SET NOT NULL не сканує таблицю під ексклюзивним блокуванням. Секціонована таблиця
+(b8d4f0a2c6e3) вже має NOT NULL у первинному ключі й не змінюється.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.database.online_migrations import set_not_null_online
+from src.database.partitioning import is_partitioned
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b7c1d9a4f6'
+down_revision: Union[str, None] = 'c9e5a1b3d7f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql' or is_partitioned(bind, 'contacts'):
+        return
+    orphans = bind.execute(sa.text('SELECT count(*) FROM contacts WHERE user_id IS NULL')).scalar_one()
+    if orphans:
+        raise RuntimeError(f'{orphans} contacts have no user_id; assign an owner or delete them before upgrading')
+    set_not_null_online(op, 'contacts', 'user_id')
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql' or is_partitioned(bind, 'contacts'):
+        return
+    op.alter_column('contacts', 'user_id', existing_type=sa.Integer(), nullable=True)
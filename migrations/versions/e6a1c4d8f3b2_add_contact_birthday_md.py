@@ -0,0 +1,46 @@
+"""add month-day birthday column for digests
+
+Revision ID: e6a1c4d8f3b2
+Revises: d4f9b2c7e8a1
+Create Date: 2026-10-19 14:02:51.618304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.database.online_migrations import (
+    add_column_online,
+    backfill,
+    create_index_online,
+    drop_index_online,
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6a1c4d8f3b2'
+down_revision: Union[str, None] = 'd4f9b2c7e8a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    add_column_online(op, 'contacts', sa.Column('birthday_md', sa.SmallInteger(), nullable=True))
+    month = sa.extract('month', sa.column('birthday'))
+    day = sa.extract('day', sa.column('birthday'))
+    with op.get_context().autocommit_block():
+        backfill(
+            op.get_bind(),
+            'contacts_birthday_md',
+            'contacts',
+            values={'birthday_md': sa.cast(month * 100 + day, sa.SmallInteger())},
+            where=sa.column('birthday_md').is_(None),
+            batch_size=5000,
+        )
+    create_index_online(op, 'ix_contacts_birthday_md_user_id', 'contacts', ['birthday_md', 'user_id'])
+
+
+def downgrade() -> None:
+    drop_index_online(op, 'ix_contacts_birthday_md_user_id', 'contacts')
+    op.drop_column('contacts', 'birthday_md')
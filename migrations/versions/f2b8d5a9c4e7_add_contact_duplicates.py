@@ -0,0 +1,52 @@
+"""add contact duplicate suggestions
+
+Revision ID: f2b8d5a9c4e7
+Revises: e6a1c4d8f3b2
+Create Date: 2026-10-19 15:11:36.270419
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b8d5a9c4e7'
+down_revision: Union[str, None] = 'e6a1c4d8f3b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 0 означає "ще не перевірялось": перший прохід перевіряє всі пари користувача
+    op.add_column(
+        'users',
+        sa.Column('dedup_seq', sa.BigInteger(), nullable=False, server_default=sa.text('0')),
+    )
+    op.create_table(
+        'contact_duplicates',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('contact_id', sa.Integer(), nullable=False),
+        sa.Column('duplicate_id', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('reasons', sa.String(length=50), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['contact_id'], ['contacts.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['duplicate_id'], ['contacts.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('contact_id', 'duplicate_id', name='uq_contact_duplicates_pair'),
+    )
+    op.create_index(
+        'ix_contact_duplicates_user_id_score', 'contact_duplicates', ['user_id', 'score']
+    )
+    op.create_index('ix_contact_duplicates_duplicate_id', 'contact_duplicates', ['duplicate_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_contact_duplicates_duplicate_id', table_name='contact_duplicates')
+    op.drop_index('ix_contact_duplicates_user_id_score', table_name='contact_duplicates')
+    op.drop_table('contact_duplicates')
+    op.drop_column('users', 'dedup_seq')
@@ -1,10 +1,23 @@
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.db import get_db
-from src.schemas.contacts import ContactBase, ContactResponse
+from src.conf.config import settings
+from src.database.db import get_db, release_session
+from src.schemas.contacts import (
+    ContactBase,
+    ContactChanges,
+    ContactMerge,
+    ContactResponse,
+    ContactSuggestion,
+    DuplicateSuggestion,
+    PhoneLookup,
+    PhoneMatch,
+)
 from src.services.contacts import ContactService
+from src.services.dedup import DedupService
+from src.services.events import EventStreamResponse, TooManySubscribers, contact_events
+from src.services.sync import SyncTokenError, SyncTokenExpired, decode_sync_token
 from src.conf import messages
 from src.services.auth import get_current_user
 from src.database.models import User
@@ -13,23 +26,36 @@ router = APIRouter(prefix="/contacts", tags=['contacts'])
 
 @router.get("/", response_model=List[ContactResponse])
 async def read_contacts(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     first_name: Optional[str] = None,
     last_name: Optional[str] = None,
     email: Optional[str] = None,
+    q: Optional[str] = None,
+    fuzzy: bool = False,
+    include_total: bool = False,
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
     """
-    Отримання списку контактів із можливістю фільтрації за іменем, прізвищем або email.
+    Отримання списку контактів користувача із можливістю фільтрації за іменем, прізвищем або email.
+
+    З ``fuzzy=true`` параметр ``q`` шукається нечітко (допускаються одруківки), а
+    результати впорядковуються за схожістю. З ``include_total=true`` загальна
+    кількість збігів повертається в заголовку ``X-Total-Count``, а порожня сторінка —
+    порожнім списком замість 404.
 
     Args:
+        response (Response): Відповідь для встановлення заголовка.
         skip (int, optional): Кількість записів, які потрібно пропустити. Defaults to 0.
         limit (int, optional): Максимальна кількість записів у відповіді. Defaults to 100.
         first_name (Optional[str], optional): Фільтр за ім'ям. Defaults to None.
         last_name (Optional[str], optional): Фільтр за прізвищем. Defaults to None.
         email (Optional[str], optional): Фільтр за email. Defaults to None.
+        q (Optional[str], optional): Пошук за ім'ям або прізвищем. Defaults to None.
+        fuzzy (bool, optional): Нечіткий пошук за ``q`` з ранжуванням. Defaults to False.
+        include_total (bool, optional): Повернути загальну кількість у заголовку. Defaults to False.
         db (AsyncSession): Сесія бази даних.
         user (User): Поточний автентифікований користувач.
 
@@ -37,30 +63,234 @@ async def read_contacts(
         List[ContactResponse]: Список контактів.
     """
     contact_service = ContactService(db)
-    contacts = await contact_service.search_contacts(first_name, last_name, email, skip, limit)
+    if fuzzy and q:
+        contacts = await contact_service.fuzzy_search(user, q, skip, limit)
+    elif include_total:
+        contacts, total = await contact_service.search_contacts_page(
+            user, first_name, last_name, email, skip, limit, q
+        )
+        response.headers["X-Total-Count"] = str(total)
+        return contacts
+    else:
+        contacts = await contact_service.search_contacts(
+            first_name, last_name, email, skip, limit, q, user=user
+        )
     if not contacts:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=messages.CONTACT_NOT_FOUND
         )
     return contacts
 
+@router.get("/autocomplete", response_model=List[ContactSuggestion])
+async def autocomplete_contacts(
+    prefix: str = Query(min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """
+    Підказки для поля пошуку: контакти, ім'я, прізвище або email яких починається з префікса.
+
+    Args:
+        prefix (str): Введений префікс.
+        limit (int, optional): Максимальна кількість підказок. Defaults to 10.
+        db (AsyncSession): Сесія бази даних.
+        user (User): Поточний автентифікований користувач.
+
+    Returns:
+        List[ContactSuggestion]: Підказки (може бути порожнім списком).
+    """
+    contact_service = ContactService(db)
+    return await contact_service.autocomplete(user, prefix, limit)
+
+@router.get("/changes", response_model=ContactChanges)
+async def contact_changes(
+    since: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """
+    Дельта-синхронізація: контакти, створені або змінені після токена ``since``,
+    та ідентифікатори видалених контактів.
+
+    Без ``since`` повертається повний стан. Якщо ``has_more`` істинне, клієнт
+    одразу запитує наступну сторінку з ``next_token``.
+
+    Args:
+        since (Optional[str]): Токен з попередньої відповіді.
+        limit (int, optional): Максимальна кількість змін. Defaults to 500.
+        db (AsyncSession): Сесія бази даних.
+        user (User): Поточний автентифікований користувач.
+
+    Returns:
+        ContactChanges: Зміни та наступний токен.
+
+    Raises:
+        HTTPException: 410, якщо токен застарів і потрібна повна синхронізація;
+            400, якщо токен некоректний.
+    """
+    token = None
+    if since:
+        try:
+            token = decode_sync_token(since)
+        except SyncTokenExpired:
+            raise HTTPException(status_code=status.HTTP_410_GONE, detail=messages.SYNC_TOKEN_EXPIRED)
+        except SyncTokenError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=messages.SYNC_TOKEN_INVALID)
+    contact_service = ContactService(db)
+    return await contact_service.get_changes(user, token, limit)
+
+@router.get("/events")
+async def contact_event_stream(
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """
+    Потік подій змін контактів користувача (Server-Sent Events).
+
+    Кожна подія ``created``, ``updated`` або ``deleted`` має ``id`` — номер зміни.
+    Кадр ``resync`` означає, що клієнт відстав і має догнати стан через
+    ``/contacts/changes``. Коли подій немає, сервер надсилає heartbeat-коментарі.
+
+    Args:
+        db (AsyncSession): Сесія бази даних.
+        user (User): Поточний автентифікований користувач.
+
+    Returns:
+        EventStreamResponse: Відповідь ``text/event-stream``.
+
+    Raises:
+        HTTPException: 503, якщо досягнуто обмеження кількості з'єднань.
+    """
+    # Потік може тривати годинами, тож з'єднання з БД повертаємо до пулу одразу
+    await release_session(db)
+    try:
+        subscription = contact_events.subscribe(user.id)
+    except TooManySubscribers:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=messages.EVENTS_TOO_MANY)
+    return EventStreamResponse(contact_events, subscription, settings.EVENTS_HEARTBEAT_SECONDS)
+
+@router.get("/facets")
+async def contact_facets(
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """
+    Фасети контактів користувача: загальна кількість, розподіл за місяцем
+    народження та найчастіші домени email.
+
+    Args:
+        db (AsyncSession): Сесія бази даних.
+        user (User): Поточний автентифікований користувач.
+
+    Returns:
+        dict: Значення фасетів.
+    """
+    contact_service = ContactService(db)
+    return await contact_service.get_facets(user)
+
+@router.get("/duplicates", response_model=List[DuplicateSuggestion])
+async def contact_duplicates(
+    limit: int = Query(50, ge=1, le=500),
+    min_score: float = Query(0.0, ge=0.0, le=1.0),
+    refresh: bool = False,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """
+    Пари ймовірних дублікатів серед контактів користувача за спаданням оцінки.
+
+    Пари розраховує фонова задача; з ``refresh=true`` контакти, змінені після
+    останньої перевірки, перевіряються одразу.
+
+    Args:
+        limit (int, optional): Максимальна кількість пар. Defaults to 50.
+        min_score (float, optional): Мінімальна оцінка. Defaults to 0.
+        refresh (bool, optional): Перевірити змінені контакти перед відповіддю. Defaults to False.
+        db (AsyncSession): Сесія бази даних.
+        user (User): Поточний автентифікований користувач.
+
+    Returns:
+        List[DuplicateSuggestion]: Пари контактів з оцінкою та ознаками збігу.
+    """
+    dedup_service = DedupService(db)
+    if refresh:
+        await dedup_service.refresh(user.id)
+    suggestions = await dedup_service.suggestions(user.id, limit, min_score)
+    await release_session(db)
+    return suggestions
+
+@router.get("/lookup", response_model=List[ContactResponse])
+async def lookup_by_phone(
+    phone: str = Query(..., min_length=1, max_length=32),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """
+    Пошук контактів користувача за номером телефону (визначення абонента).
+
+    Args:
+        phone (str): Телефон у будь-якому форматі.
+        db (AsyncSession): Сесія бази даних.
+        user (User): Поточний автентифікований користувач.
+
+    Returns:
+        List[ContactResponse]: Контакти з цим номером (порожній список, якщо збігів немає).
+
+    Raises:
+        HTTPException: 400, якщо номер некоректний.
+    """
+    contact_service = ContactService(db)
+    contacts = await contact_service.lookup_by_phone(user, phone)
+    if contacts is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=messages.PHONE_INVALID
+        )
+    return contacts
+
+@router.post("/lookup", response_model=List[PhoneMatch])
+async def lookup_by_phones(
+    body: PhoneLookup,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """
+    Пакетний пошук контактів користувача за номерами телефонів.
+
+    Args:
+        body (PhoneLookup): Телефони для пошуку.
+        db (AsyncSession): Сесія бази даних.
+        user (User): Поточний автентифікований користувач.
+
+    Returns:
+        List[PhoneMatch]: Результат для кожного телефону в порядку запиту.
+    """
+    contact_service = ContactService(db)
+    return await contact_service.lookup_by_phones(user, body.phones)
+
 @router.get("/birthdays", response_model=List[ContactResponse])
 async def get_upcoming_birthdays(
-    days: int = 7,
+    days: int = Query(7, ge=0, le=366),
+    limit: int = Query(100, ge=1, le=1000),
     db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
 ):
     """
-    Отримання контактів, у яких день народження протягом найближчих `days` днів.
+    Отримання контактів користувача, у яких день народження протягом найближчих `days` днів,
+    у порядку настання.
 
     Args:
         days (int, optional): Кількість днів для перевірки найближчих днів народження. Defaults to 7.
+        limit (int, optional): Максимальна кількість контактів. Defaults to 100.
         db (AsyncSession): Сесія бази даних.
+        user (User): Поточний автентифікований користувач.
 
     Returns:
         List[ContactResponse]: Список контактів із майбутніми днями народження.
     """
     contact_service = ContactService(db)
-    contacts = await contact_service.get_upcoming_birthdays(days)
+    contacts = await contact_service.get_upcoming_birthdays(days, user=user, limit=limit)
     if not contacts:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=messages.CONTACT_NOT_FOUND
@@ -68,19 +298,24 @@ async def get_upcoming_birthdays(
     return contacts
 
 @router.get("/{contact_id}", response_model=ContactResponse)
-async def read_contact(contact_id: int, db: AsyncSession = Depends(get_db)):
+async def read_contact(
+    contact_id: int,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
     """
-    Отримання конкретного контакту за його ідентифікатором.
+    Отримання конкретного контакту користувача за його ідентифікатором.
 
     Args:
         contact_id (int): ID контакту.
         db (AsyncSession): Сесія бази даних.
+        user (User): Поточний автентифікований користувач.
 
     Returns:
         ContactResponse: Об'єкт контакту.
     """
     contact_service = ContactService(db)
-    contact = await contact_service.get_contact_by_id(contact_id)
+    contact = await contact_service.get_contact_by_id(contact_id, user)
     if contact is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=messages.CONTACT_NOT_FOUND
@@ -88,37 +323,76 @@ async def read_contact(contact_id: int, db: AsyncSession = Depends(get_db)):
     return contact
 
 @router.post("/", response_model=ContactResponse, status_code=status.HTTP_201_CREATED)
-async def create_contact(body: ContactBase, db: AsyncSession = Depends(get_db)):
+async def create_contact(
+    body: ContactBase,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
     """
-    Створення нового контакту.
+    Створення нового контакту поточного користувача.
 
     Args:
         body (ContactBase): Дані нового контакту.
         db (AsyncSession): Сесія бази даних.
+        user (User): Поточний автентифікований користувач, власник контакту.
 
     Returns:
         ContactResponse: Створений контакт.
     """
     contact_service = ContactService(db)
-    return await contact_service.create_contact(body)
+    return await contact_service.create_contact(body, user)
+
+@router.post("/{contact_id}/merge", response_model=ContactResponse)
+async def merge_contacts(
+    contact_id: int,
+    body: ContactMerge,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """
+    Злиття дублікатів в основний контакт.
+
+    Args:
+        contact_id (int): Основний контакт, що залишається.
+        body (ContactMerge): Ідентифікатори дублікатів.
+        db (AsyncSession): Сесія бази даних.
+        user (User): Поточний автентифікований користувач.
+
+    Returns:
+        ContactResponse: Оновлений основний контакт.
+
+    Raises:
+        HTTPException: 404, якщо якийсь із контактів не знайдено.
+    """
+    contact_service = ContactService(db)
+    contact = await contact_service.merge_contacts(user, contact_id, body.duplicate_ids)
+    if contact is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=messages.CONTACT_NOT_FOUND
+        )
+    return contact
 
 @router.put("/{contact_id}", response_model=ContactResponse)
 async def update_contact(
-    body: ContactBase, contact_id: int, db: AsyncSession = Depends(get_db)
+    body: ContactBase,
+    contact_id: int,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
 ):
     """
-    Оновлення існуючого контакту.
+    Оновлення існуючого контакту користувача.
 
     Args:
         body (ContactBase): Нові дані контакту.
         contact_id (int): ID контакту, який потрібно оновити.
         db (AsyncSession): Сесія бази даних.
+        user (User): Поточний автентифікований користувач.
 
     Returns:
         ContactResponse: Оновлений контакт.
     """
     contact_service = ContactService(db)
-    contact = await contact_service.update_contact(contact_id, body)
+    contact = await contact_service.update_contact(contact_id, body, user)
     if contact is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=messages.CONTACT_NOT_FOUND
@@ -126,19 +400,24 @@ async def update_contact(
     return contact
 
 @router.delete("/{contact_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def remove_contact(contact_id: int, db: AsyncSession = Depends(get_db)):
+async def remove_contact(
+    contact_id: int,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
     """
-    Видалення контакту за його ID.
+    Видалення контакту користувача за його ID.
 
     Args:
         contact_id (int): ID контакту, який потрібно видалити.
         db (AsyncSession): Сесія бази даних.
+        user (User): Поточний автентифікований користувач.
 
     Returns:
         None: Видалений контакт не повертається.
     """
     contact_service = ContactService(db)
-    contact = await contact_service.remove_contact(contact_id)
+    contact = await contact_service.remove_contact(contact_id, user)
     if contact is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=messages.CONTACT_NOT_FOUND
@@ -1,11 +1,71 @@
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.conf import messages
+from src.database.db import get_db
 from src.schemas.users import User
 from src.services.auth import get_current_user
+from src.services.avatars import (
+    AvatarMissing,
+    AvatarTooLarge,
+    AvatarTypeNotAllowed,
+    InvalidAvatar,
+    delete_avatar,
+    receive_upload,
+    store_avatar,
+)
 from src.services.limiter import limiter
+from src.services.users import UserService
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 @router.get("/me", response_model=User)
 @limiter.limit("5/minute")
 async def me(request: Request, user: User = Depends(get_current_user)):
-    return user
\ No newline at end of file
+    return user
+
+
+@router.patch("/avatar", response_model=User)
+@limiter.limit("10/minute")
+async def update_avatar(
+    request: Request,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Завантаження аватара поточного користувача.
+
+    Файл передається в полі ``file`` тіла multipart/form-data. Тіло читається
+    потоком без буферизації в пам'яті, мініатюри генеруються в пулі процесів.
+
+    Args:
+        request (Request): Запит із тілом multipart/form-data.
+        user (User): Поточний користувач.
+        db (AsyncSession): Сесія бази даних.
+
+    Returns:
+        User: Користувач з новим URL аватара.
+
+    Raises:
+        HTTPException: 404, якщо користувача не знайдено; файли аватара тоді видаляються.
+    """
+    try:
+        upload, extension = await receive_upload(request)
+        avatar_url = await store_avatar(user.id, upload, extension)
+    except AvatarTooLarge:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=messages.AVATAR_TOO_LARGE
+        )
+    except AvatarTypeNotAllowed:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=messages.AVATAR_TYPE_NOT_ALLOWED
+        )
+    except AvatarMissing:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=messages.AVATAR_MISSING)
+    except InvalidAvatar:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=messages.AVATAR_INVALID)
+    updated = await UserService(db).update_avatar(user.id, avatar_url)
+    if updated is None:
+        await delete_avatar(user.id)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=messages.USER_NOT_FOUND)
+    return updated
@@ -1,17 +1,31 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
-from src.database.db import get_db
+from src.database.db import get_db, release_session, sessionmanager
+from src.services.events import contact_events
+from src.services.health import health_monitor
 
 router = APIRouter(tags=["utils"])
 
 @router.get("/healthchecker")
 async def healthchecker(db: AsyncSession = Depends(get_db)):
+    # Якщо фонова перевірка БД свіжа, відповідаємо з кешу без звернення до пулу
+    cached = health_monitor.results["db"]
+    if cached.is_fresh(health_monitor.max_age):
+        if cached.healthy:
+            return {"message": "APP is healthy"}
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error connecting to the database",
+        )
+
     try:
         # Виконуємо асинхронний запит до бази даних
         result = await db.execute(text("SELECT 1"))
         result = result.scalar_one_or_none()
+        await release_session(db)
 
         # Перевіряємо результат запиту
         if result is None:
@@ -20,14 +34,55 @@ async def healthchecker(db: AsyncSession = Depends(get_db)):
                 detail="Database is not configured correctly",
             )
         return {"message": "APP is healthy"}
-    
+
     except Exception as e:
         # Виведення помилки у консоль
         print(f"Error: {e}")
-        
+
         # Обробка помилок та повернення відповіді з кодом 500
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error connecting to the database",
         )
 
+
+@router.get("/live")
+async def live():
+    """
+    Перевірка живучості процесу (liveness probe) без звернення до залежностей.
+
+    Returns:
+        dict: Статус процесу.
+    """
+    return {"status": "alive"}
+
+
+@router.get("/ready")
+async def ready():
+    """
+    Перевірка готовності (readiness probe) за кешованими результатами фонових перевірок.
+
+    Returns:
+        JSONResponse: 200, якщо обов'язкові залежності здорові, інакше 503.
+    """
+    if health_monitor.ready:
+        return {"status": "ready"}
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"status": "not ready"}
+    )
+
+
+@router.get("/health/status")
+async def health_status():
+    """
+    Детальний стан залежностей: затримка, вік результату та остання помилка,
+    а також лічильники пулу з'єднань БД і потоків подій.
+
+    Returns:
+        dict: Знімок стану HealthMonitor, метрики пулу та потоків подій.
+    """
+    return {
+        **health_monitor.snapshot(),
+        "pool": sessionmanager.pool_metrics.snapshot(),
+        "events": contact_events.snapshot(),
+    }
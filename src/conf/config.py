@@ -1,9 +1,15 @@
 from pydantic import ConfigDict
 from pydantic_settings import BaseSettings
 from pathlib import Path
+from typing import Optional
 
 class Settings(BaseSettings):
     DB_URL: str
+    DB_QUERY_CACHE_SIZE: int = 500
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_PGBOUNCER_MODE: bool = False
+    CONTACTS_PARTITIONS: int = 0
+    DB_SHARD_URLS: list[str] = []
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRATION_SECONDS: int = 3600
@@ -19,6 +25,92 @@ class Settings(BaseSettings):
     USE_CREDENTIALS: bool = True
     VALIDATE_CERTS: bool = True
 
+    SERVER_MODE: str = "dev"
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0
+    SERVER_KEEPALIVE_SECONDS: int = 5
+    SERVER_BACKLOG: int = 2048
+    SERVER_LIMIT_CONCURRENCY: Optional[int] = None
+    SERVER_LIMIT_MAX_REQUESTS: Optional[int] = 50000
+    SERVER_GRACEFUL_SHUTDOWN_SECONDS: int = 30
+    SERVER_ACCESS_LOG: bool = False
+
+    REDIS_HOST: str = "localhost"
+    REDIS_PORT: int = 6379
+
+    HEALTH_CHECK_INTERVAL_SECONDS: float = 10.0
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = 2.0
+    HEALTH_REQUIRED_PROBES: list[str] = ["db"]
+
+    SQLITE_PROFILE_ENABLED: bool = False
+    SQLITE_READ_POOL_SIZE: int = 4
+    SQLITE_WRITE_TIMEOUT_SECONDS: float = 30.0
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KB: int = 65536
+    SQLITE_MMAP_SIZE: int = 268435456
+
+    FUZZY_SEARCH_THRESHOLD: float = 0.3
+    FUZZY_INDEX_MAX_USERS: int = 1000
+    FUZZY_INDEX_TTL_SECONDS: float = 300.0
+
+    AUTOCOMPLETE_MAX_USERS: int = 1000
+    AUTOCOMPLETE_TTL_SECONDS: float = 300.0
+
+    SYNC_TOKEN_TTL_DAYS: float = 30.0
+    TOMBSTONE_PRUNE_ENABLED: bool = False
+    TOMBSTONE_PRUNE_INTERVAL_SECONDS: float = 86400.0
+
+    EVENTS_REDIS_ENABLED: bool = False
+    EVENTS_CHANNEL_PREFIX: str = "contacts:events:"
+    EVENTS_QUEUE_SIZE: int = 100
+    EVENTS_MAX_CONNECTIONS: int = 10000
+    EVENTS_HEARTBEAT_SECONDS: float = 15.0
+
+    DEDUP_ENABLED: bool = False
+    DEDUP_INTERVAL_SECONDS: float = 3600.0
+    DEDUP_THRESHOLD: float = 0.6
+    DEDUP_MAX_BLOCK_SIZE: int = 50
+    DEDUP_USERS_BATCH_SIZE: int = 100
+
+    PHONE_DEFAULT_COUNTRY_CODE: str = "380"
+
+    AVATAR_DIR: Path = Path("media/avatars")
+    AVATAR_URL_PREFIX: str = "/media/avatars"
+    AVATAR_MAX_BYTES: int = 5 * 1024 * 1024
+    AVATAR_THUMBNAIL_SIZES: list[int] = [256, 64]
+    AVATAR_WORKERS: int = 2
+
+    BIRTHDAY_CACHE_MAX_USERS: int = 1000
+    BIRTHDAY_CACHE_TTL_SECONDS: float = 300.0
+    BIRTHDAY_DIGEST_ENABLED: bool = False
+    BIRTHDAY_DIGEST_INTERVAL_SECONDS: float = 86400.0
+    BIRTHDAY_DIGEST_DAYS: int = 7
+    BIRTHDAY_DIGEST_CHUNK_SIZE: int = 5000
+    BIRTHDAY_DIGEST_BATCH_SIZE: int = 100
+    BIRTHDAY_DIGEST_CONCURRENCY: int = 5
+    BIRTHDAY_DIGEST_RATE_PER_SECOND: float = 20.0
+
+    PURGE_UNCONFIRMED_ENABLED: bool = False
+    PURGE_UNCONFIRMED_AFTER_DAYS: int = 7
+    PURGE_BATCH_SIZE: int = 500
+    PURGE_PAUSE_SECONDS: float = 0.1
+    PURGE_INTERVAL_SECONDS: float = 3600.0
+
+    SLOW_QUERY_ENABLED: bool = True
+    SLOW_QUERY_THRESHOLD_MS: float = 500.0
+    SLOW_QUERY_EXPLAIN: bool = False
+    SLOW_QUERY_LOG_INTERVAL_SECONDS: float = 60.0
+    SLOW_QUERY_MAX_FINGERPRINTS: int = 1000
+
+    PROFILING_ENABLED: bool = False
+    PROFILING_TOKEN: str = ""
+    PROFILING_HEADER: str = "X-Profile-Token"
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_INTERVAL_MS: float = 1.0
+    PROFILING_FORMAT: str = "speedscope"
+    PROFILING_DIR: Path = Path("profiles")
+
     TEMPLATE_FOLDER: Path = Path(__file__).parent / 'templates'
 
     model_config = ConfigDict(
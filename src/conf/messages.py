@@ -1 +1,10 @@
-CONTACT_NOT_FOUND="Contact not found"
\ No newline at end of file
+CONTACT_NOT_FOUND="Contact not found"
+SYNC_TOKEN_EXPIRED="Sync token expired, full resync required"
+SYNC_TOKEN_INVALID="Invalid sync token"
+EVENTS_TOO_MANY="Too many event stream connections"
+PHONE_INVALID="Invalid phone number"
+AVATAR_MISSING="Avatar file is required"
+AVATAR_TOO_LARGE="Avatar file is too large"
+AVATAR_TYPE_NOT_ALLOWED="Avatar must be a JPEG, PNG, GIF or WebP image"
+AVATAR_INVALID="Avatar image cannot be read"
+USER_NOT_FOUND="User not found"
\ No newline at end of file
@@ -0,0 +1,99 @@
+import importlib.util
+import logging
+import os
+
+import uvicorn
+
+from src.conf.config import Settings, settings
+
+logger = logging.getLogger("src.conf.server")
+
+
+def available_cpus() -> int:
+    """
+    Повертає кількість ядер, доступних процесу (з урахуванням affinity/cgroup, де можливо).
+
+    Returns:
+        int: Кількість доступних ядер, щонайменше 1.
+    """
+    if hasattr(os, "process_cpu_count"):
+        return os.process_cpu_count() or 1
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+def has_module(name: str) -> bool:
+    """
+    Перевіряє, чи встановлено модуль, не імпортуючи його.
+
+    Args:
+        name (str): Назва модуля.
+
+    Returns:
+        bool: True, якщо модуль доступний.
+    """
+    return importlib.util.find_spec(name) is not None
+
+
+def uvicorn_options(config: Settings = settings) -> dict:
+    """
+    Формує параметри uvicorn.run для режиму, заданого ``SERVER_MODE``.
+
+    У режимі "dev" — один процес з автоперезавантаженням. У режимі "prod" — по
+    воркеру на ядро (якщо ``SERVER_WORKERS`` = 0), uvloop та httptools, якщо вони
+    встановлені, налаштовані keep-alive, backlog і ліміт одночасних з'єднань, а
+    воркер перезапускається після ``SERVER_LIMIT_MAX_REQUESTS`` запитів. Воркери
+    перезапускає лише супервізор uvicorn, що працює при кількох воркерах; з одним
+    воркером ліміт не застосовується, бо сервер просто зупинився б.
+
+    Args:
+        config (Settings): Налаштування застосунку.
+
+    Returns:
+        dict: Іменовані аргументи для uvicorn.run.
+
+    Raises:
+        ValueError: Якщо ``SERVER_MODE`` має невідоме значення.
+    """
+    options = {
+        "app": "main:app",
+        "host": config.SERVER_HOST,
+        "port": config.SERVER_PORT,
+    }
+    if config.SERVER_MODE == "dev":
+        options.update(reload=True, workers=1)
+        return options
+    if config.SERVER_MODE != "prod":
+        raise ValueError(f"Unknown SERVER_MODE: {config.SERVER_MODE}")
+
+    workers = config.SERVER_WORKERS or available_cpus()
+    options.update(
+        reload=False,
+        workers=workers,
+        loop="uvloop" if has_module("uvloop") else "asyncio",
+        http="httptools" if has_module("httptools") else "h11",
+        timeout_keep_alive=config.SERVER_KEEPALIVE_SECONDS,
+        backlog=config.SERVER_BACKLOG,
+        limit_concurrency=config.SERVER_LIMIT_CONCURRENCY,
+        timeout_graceful_shutdown=config.SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+        access_log=config.SERVER_ACCESS_LOG,
+    )
+    if workers > 1:
+        options["limit_max_requests"] = config.SERVER_LIMIT_MAX_REQUESTS
+    elif config.SERVER_LIMIT_MAX_REQUESTS:
+        logger.warning(
+            "SERVER_LIMIT_MAX_REQUESTS is ignored with a single worker: "
+            "recycle the process with an external supervisor instead"
+        )
+    return options
+
+
+def run(config: Settings = settings) -> None:
+    """
+    Запускає uvicorn з параметрами поточного режиму.
+
+    Args:
+        config (Settings): Налаштування застосунку.
+    """
+    uvicorn.run(**uvicorn_options(config))
@@ -1,26 +1,321 @@
 import contextlib
+from uuid import uuid4
 
+from sqlalchemy import event, make_url
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
+    AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
 
-from src.conf.config import settings
+from src.conf.config import Settings, settings
+from src.database.metrics import PoolMetrics
+from src.database.query_timer import attach_db_timer
+from src.database.sharding import ShardDirectory
+from src.database.slow_query import SlowQueryLogger
+from src.database.sqlite_profile import RoutingSession, create_sqlite_engines, is_file_sqlite
+
+class LazySession:
+    """
+    Проксі AsyncSession, що створює сесію лише при першому зверненні до неї.
+
+    Запити, які відповідають з кешу або завершуються помилкою валідації чи
+    автентифікації, не створюють сесію й не займають з'єднання пулу.
+    """
+
+    def __init__(self, session_maker: async_sessionmaker, manager: "DatabaseSessionManager | None" = None):
+        """
+        Ініціалізація LazySession.
+
+        Args:
+            session_maker (async_sessionmaker): Фабрика сесій.
+            manager (DatabaseSessionManager | None): Менеджер, що створив сесію (для
+                маршрутизації на шард).
+        """
+        self._session_maker = session_maker
+        self.manager = manager
+        self._session: AsyncSession | None = None
+        self._flushed = False
+
+    @property
+    def started(self) -> bool:
+        return self._session is not None
+
+    def __getattr__(self, name):
+        if self._session is None:
+            self._session = self._session_maker()
+            # Записані, але не зафіксовані зміни не можна втратити при release()
+            sync_session = self._session.sync_session
+            event.listen(sync_session, "after_flush", self._on_flush)
+            event.listen(sync_session, "after_commit", self._on_end)
+            event.listen(sync_session, "after_rollback", self._on_end)
+        return getattr(self._session, name)
+
+    def _on_flush(self, session, flush_context):
+        self._flushed = True
+
+    def _on_end(self, session):
+        self._flushed = False
+
+    async def release(self) -> None:
+        """
+        Завершує поточну одиницю роботи й повертає з'єднання до пулу.
+
+        Завантажені об'єкти від'єднуються від сесії, але зберігають свої атрибути.
+        Якщо в сесії є незбережені або незафіксовані зміни, нічого не відбувається.
+        """
+        session = self._session
+        if session is None or self._flushed or session.new or session.dirty or session.deleted:
+            return
+        await session.close()
+
+    async def use(self, session_maker: async_sessionmaker) -> None:
+        """
+        Перемикає сесію на іншу базу (шард).
+
+        Уже розпочата сесія без незбережених змін закривається, наступне звернення
+        створить нову сесію в обраній базі.
+
+        Args:
+            session_maker (async_sessionmaker): Фабрика сесій шарда.
+
+        Raises:
+            RuntimeError: Якщо в поточній сесії є незбережені зміни.
+        """
+        if session_maker is self._session_maker:
+            return
+        session = self._session
+        if session is not None:
+            if self._flushed or session.new or session.dirty or session.deleted:
+                raise RuntimeError("Cannot switch shards with pending changes")
+            await session.close()
+            self._session = None
+        self._session_maker = session_maker
+
+    async def rollback(self) -> None:
+        if self._session is not None:
+            await self._session.rollback()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid4()}__"
+
+
+def engine_options(url: str, config: Settings = settings) -> dict:
+    """
+    Параметри ``create_async_engine`` для кешів скомпільованих і підготовлених запитів.
+
+    ``DB_QUERY_CACHE_SIZE`` задає розмір кешу компіляції SQLAlchemy. Для asyncpg
+    ``DB_STATEMENT_CACHE_SIZE`` задає розмір кешу підготовлених запитів на з'єднання.
+    У режимі ``DB_PGBOUNCER_MODE`` (PgBouncer у режимі transaction/statement)
+    підготовлені запити не кешуються, а їхні імена унікальні, бо наступна транзакція
+    може потрапити на інше серверне з'єднання.
+
+    Args:
+        url (str): URL бази даних.
+        config (Settings): Налаштування застосунку.
+
+    Returns:
+        dict: Іменовані параметри рушія.
+    """
+    options = {"query_cache_size": config.DB_QUERY_CACHE_SIZE}
+    if make_url(url).get_driver_name() != "asyncpg":
+        return options
+    if config.DB_PGBOUNCER_MODE:
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": _unique_statement_name,
+        }
+    else:
+        options["connect_args"] = {
+            "statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+        }
+    return options
+
+
+async def release_session(db) -> None:
+    """
+    Звільняє з'єднання сесії запиту після завершеної одиниці роботи.
+
+    Для звичайних сесій (наприклад, у тестах) нічого не робить.
+
+    Args:
+        db: Сесія, отримана з get_db.
+    """
+    if isinstance(db, LazySession):
+        await db.release()
+
+
+async def route_session(
+    db, *, user_id: int | None = None, username: str | None = None, email: str | None = None
+) -> bool:
+    """
+    Направляє сесію запиту на шард користувача за довідником.
+
+    Без шардування, а також для звичайних сесій (наприклад, у тестах) нічого не робить.
+
+    Args:
+        db: Сесія, отримана з get_db.
+        user_id (int | None): Ідентифікатор користувача.
+        username (str | None): Ім'я користувача.
+        email (str | None): Email користувача.
+
+    Returns:
+        bool: False, якщо користувача немає в довіднику, інакше True.
+    """
+    if not isinstance(db, LazySession) or db.manager is None or not db.manager.sharded:
+        return True
+    shard = await db.manager.directory.lookup(user_id=user_id, username=username, email=email)
+    if shard is None:
+        return False
+    await db.use(db.manager.shard(shard).session_maker)
+    return True
+
+
+async def allocate_user(db, username: str, email: str) -> int | None:
+    """
+    Реєструє нового користувача в довіднику й направляє сесію на обраний для нього шард.
+
+    Args:
+        db: Сесія, отримана з get_db.
+        username (str): Ім'я користувача.
+        email (str): Email користувача.
+
+    Returns:
+        int | None: Глобальний ідентифікатор користувача або None без шардування.
+    """
+    if not isinstance(db, LazySession) or db.manager is None or not db.manager.sharded:
+        return None
+    manager = db.manager
+    user_id, shard = await manager.directory.register(username, email, len(manager.shards))
+    await db.use(manager.shard(shard).session_maker)
+    return user_id
+
 
 class DatabaseSessionManager:
-    def __init__(self, url: str):
-        self._engine: AsyncEngine | None = create_async_engine(url)
-        self._session_maker: async_sessionmaker = async_sessionmaker(
-            autoflush=False, autocommit=False, bind=self._engine
-        )
+    def __init__(self, url: str, sqlite_profile: bool | None = None, shard_urls: list[str] | None = None):
+        """
+        Ініціалізація DatabaseSessionManager.
+
+        Args:
+            url (str): URL бази даних.
+            sqlite_profile (bool | None): Увімкнути профіль SQLite (WAL, PRAGMA, окремий
+                рушій запису). За замовчуванням береться з ``SQLITE_PROFILE_ENABLED``.
+            shard_urls (list[str] | None): URL баз-шардів; тоді ``url`` — основна база з
+                довідником користувачів. За замовчуванням береться з ``DB_SHARD_URLS``.
+        """
+        # Рушій створюється при першому зверненні, а не під час імпорту модуля
+        self._url = url
+        if sqlite_profile is None:
+            sqlite_profile = settings.SQLITE_PROFILE_ENABLED
+        self.sqlite_profile = sqlite_profile and is_file_sqlite(url)
+        self._shard_urls = list(settings.DB_SHARD_URLS if shard_urls is None else shard_urls)
+        self._shards: list[DatabaseSessionManager] | None = None
+        # Довідник є в основній базі шардованого менеджера та в менеджерах його шардів
+        self.directory: ShardDirectory | None = ShardDirectory(self) if self._shard_urls else None
+        self._engine: AsyncEngine | None = None
+        self._read_engine: AsyncEngine | None = None
+        self._session_maker: async_sessionmaker | None = None
+        self.pool_metrics = PoolMetrics()
+
+    @property
+    def sharded(self) -> bool:
+        return bool(self._shard_urls)
+
+    @property
+    def shards(self) -> list["DatabaseSessionManager"]:
+        """
+        Менеджери шардів; без шардування — лише цей менеджер.
+        """
+        if not self.sharded:
+            return [self]
+        if self._shards is None:
+            # Шард з тим самим URL, що й основна база, використовує її рушій і пул
+            self._shards = [
+                self if url == self._url else DatabaseSessionManager(url, self.sqlite_profile, shard_urls=[])
+                for url in self._shard_urls
+            ]
+            for shard in self._shards:
+                shard.directory = self.directory
+        return self._shards
+
+    def shard(self, index: int) -> "DatabaseSessionManager":
+        return self.shards[index]
+
+    @property
+    def session_maker(self) -> async_sessionmaker:
+        if self._session_maker is None:
+            self._init_engine()
+        return self._session_maker
+
+    @property
+    def engine(self) -> AsyncEngine:
+        if self._engine is None:
+            self._init_engine()
+        return self._engine
+
+    @property
+    def read_engine(self) -> AsyncEngine:
+        # Без профілю SQLite читання й запис ідуть через один рушій
+        if self._engine is None:
+            self._init_engine()
+        return self._read_engine or self._engine
+
+    @property
+    def engines(self) -> list[AsyncEngine]:
+        if self._engine is None:
+            self._init_engine()
+        return [engine for engine in (self._engine, self._read_engine) if engine is not None]
+
+    def _init_engine(self) -> None:
+        if self.sqlite_profile:
+            self._engine, self._read_engine = create_sqlite_engines(self._url)
+            self._session_maker = async_sessionmaker(
+                autoflush=False,
+                autocommit=False,
+                sync_session_class=RoutingSession,
+                writer=self._engine.sync_engine,
+                reader=self._read_engine.sync_engine,
+            )
+        else:
+            self._engine = create_async_engine(self._url, **engine_options(self._url))
+            self._session_maker = async_sessionmaker(
+                autoflush=False, autocommit=False, bind=self._engine
+            )
+        for engine in self.engines:
+            self.pool_metrics.attach(engine.sync_engine)
+            if settings.SLOW_QUERY_ENABLED:
+                SlowQueryLogger(
+                    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+                    explain=settings.SLOW_QUERY_EXPLAIN,
+                    log_interval=settings.SLOW_QUERY_LOG_INTERVAL_SECONDS,
+                    max_fingerprints=settings.SLOW_QUERY_MAX_FINGERPRINTS,
+                ).attach(engine.sync_engine)
+            if settings.PROFILING_ENABLED:
+                attach_db_timer(engine.sync_engine)
+
+    async def close(self) -> None:
+        for shard in self._shards or ():
+            if shard is not self:
+                await shard.close()
+        for engine in (self._engine, self._read_engine):
+            if engine is not None:
+                await engine.dispose()
+        self._engine = None
+        self._read_engine = None
+        self._session_maker = None
 
     @contextlib.asynccontextmanager
     async def session(self):
-        if self._session_maker is None:
-            raise Exception("Database session is not initialized")
-        session = self._session_maker()
+        session = LazySession(self.session_maker, self)
         try:
             yield session
         except SQLAlchemyError as e:
@@ -0,0 +1,60 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class PoolMetrics:
+    """
+    Лічильники пулу з'єднань: кількість видач та час, протягом якого з'єднання утримуються.
+    """
+
+    def __init__(self):
+        self.checkouts = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.total_hold_seconds = 0.0
+        self.max_hold_seconds = 0.0
+
+    def attach(self, engine: Engine) -> None:
+        """
+        Підключає лічильники до подій checkout/checkin пулу рушія.
+
+        Args:
+            engine (Engine): Рушій (для AsyncEngine — ``engine.sync_engine``).
+        """
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checkout_at"] = time.perf_counter()
+        self.checkouts += 1
+        self.checked_out += 1
+        self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        started = connection_record.info.pop("checkout_at", None)
+        if started is None:
+            return
+        held = time.perf_counter() - started
+        self.checked_out -= 1
+        self.total_hold_seconds += held
+        self.max_hold_seconds = max(self.max_hold_seconds, held)
+
+    def snapshot(self) -> dict:
+        """
+        Повертає поточні значення лічильників.
+
+        Returns:
+            dict: Кількість видач, поточна/максимальна кількість виданих з'єднань,
+            сумарний, середній і максимальний час утримання (мс).
+        """
+        completed = self.checkouts - self.checked_out
+        return {
+            "checkouts": self.checkouts,
+            "checked_out": self.checked_out,
+            "max_checked_out": self.max_checked_out,
+            "total_hold_ms": round(self.total_hold_seconds * 1000, 3),
+            "mean_hold_ms": round(self.total_hold_seconds * 1000 / completed, 3) if completed else 0.0,
+            "max_hold_ms": round(self.max_hold_seconds * 1000, 3),
+        }
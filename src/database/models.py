@@ -1,9 +1,25 @@
 from datetime import  date
-from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey, func, Boolean
-from sqlalchemy.orm import relationship, declarative_base
+from sqlalchemy import BigInteger, Column, Float, Integer, SmallInteger, String, DateTime, Date, ForeignKey, func, Boolean, Index, UniqueConstraint, text
+from sqlalchemy.orm import relationship, declarative_base, validates
+
+from src.database.phones import to_e164
 
 Base = declarative_base()
 
+
+def month_day(value: date) -> int:
+    """
+    Місяць і день дати у вигляді числа MMDD (наприклад, 31 січня — 131).
+
+    Args:
+        value (date): Дата.
+
+    Returns:
+        int: Значення MMDD.
+    """
+    return value.month * 100 + value.day
+
+
 class Contact(Base):
     __tablename__ = "contacts"
     
@@ -12,16 +28,77 @@ class Contact(Base):
     last_name = Column(String(50), nullable=False)
     email = Column(String(100), nullable=False)
     phone_number = Column(String(20), nullable=False)
+    # Телефон у форматі E.164 для пошуку власника номера за індексом
+    phone_e164 = Column(String(16), nullable=True)
     birthday = Column(Date, nullable=False)
+    # День народження без року у вигляді MMDD для пошуку найближчих днів народження за індексом
+    birthday_md = Column(SmallInteger, nullable=True)
     additional_info = Column(String(50), nullable=True)
     
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     
+    # Частина ключа секціонування (user_id, id), тож контакт завжди має власника
     user_id = Column(
-        ForeignKey("users.id", ondelete="CASCADE"), nullable=True
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
     user = relationship("User", backref="contacts")
+    # Номер останньої зміни в послідовності змін власника (для дельта-синхронізації)
+    change_seq = Column(BigInteger, nullable=True)
+
+    __table_args__ = (
+        Index("ix_contacts_user_id_change_seq", "user_id", "change_seq"),
+        Index("ix_contacts_birthday_md_user_id", "birthday_md", "user_id"),
+        Index("ix_contacts_user_id_phone_e164", "user_id", "phone_e164"),
+    )
+    # Ключ секціонування входить до ідентичності об'єкта, тож UPDATE та DELETE з
+    # ORM фільтрують за user_id і зачіпають лише одну секцію
+    __mapper_args__ = {"primary_key": [user_id, id]}
+
+    @validates("birthday")
+    def _set_birthday_md(self, key, value):
+        self.birthday_md = month_day(value) if value is not None else None
+        return value
+
+    @validates("phone_number")
+    def _set_phone_e164(self, key, value):
+        self.phone_e164 = to_e164(value)
+        return value
+
+
+class ContactTombstone(Base):
+    __tablename__ = "contact_tombstones"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    contact_id = Column(Integer, nullable=False)
+    change_seq = Column(BigInteger, nullable=False)
+    deleted_at = Column(DateTime, default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_contact_tombstones_user_id_change_seq", "user_id", "change_seq"),
+        Index("ix_contact_tombstones_deleted_at", "deleted_at"),
+    )
+
+
+class ContactDuplicate(Base):
+    __tablename__ = "contact_duplicates"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # Пара впорядкована: contact_id < duplicate_id
+    contact_id = Column(ForeignKey("contacts.id", ondelete="CASCADE"), nullable=False)
+    duplicate_id = Column(ForeignKey("contacts.id", ondelete="CASCADE"), nullable=False)
+    score = Column(Float, nullable=False)
+    # Ознаки збігу через кому: email, phone, name
+    reasons = Column(String(50), nullable=False)
+    created_at = Column(DateTime, default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("contact_id", "duplicate_id", name="uq_contact_duplicates_pair"),
+        Index("ix_contact_duplicates_user_id_score", "user_id", "score"),
+        Index("ix_contact_duplicates_duplicate_id", "duplicate_id"),
+    )
 
 
 class User(Base):
@@ -32,4 +109,30 @@ class User(Base):
     hashed_password = Column(String)
     created_at = Column(DateTime, default=func.now())
     avatar = Column(String(255), nullable=True)
-    confirmed = Column(Boolean, default=False)
\ No newline at end of file
+    confirmed = Column(Boolean, default=False)
+    # Лічильник контактів, що оновлюється разом зі створенням і видаленням контакту
+    contacts_count = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    # Остання видана позиція в послідовності змін контактів користувача
+    change_seq = Column(BigInteger, nullable=False, default=0, server_default=text("0"))
+    # Позиція change_seq, до якої контакти вже перевірені на дублікати
+    dedup_seq = Column(BigInteger, nullable=False, default=0, server_default=text("0"))
+
+    __table_args__ = (
+        # Частковий індекс для пошуку застарілих непідтверджених акаунтів
+        Index(
+            "ix_users_unconfirmed_created_at",
+            "created_at",
+            postgresql_where=text("NOT confirmed"),
+            sqlite_where=text("NOT confirmed"),
+        ),
+    )
+
+
+# Довідник шардування в основній базі (DB_URL): видає глобальні ідентифікатори
+# користувачів і зберігає шард кожного з них для входу за іменем або email
+class UserDirectory(Base):
+    __tablename__ = "user_directory"
+    id = Column(Integer, primary_key=True)
+    username = Column(String, unique=True, nullable=False)
+    email = Column(String, unique=True, nullable=False)
+    shard = Column(SmallInteger, nullable=True)
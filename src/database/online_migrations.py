@@ -0,0 +1,471 @@
+"""
+Допоміжні функції для онлайн-міграцій Alembic на великих таблицях.
+
+Додавання nullable-колонки в Postgres змінює лише метадані, а індекс будується
+через ``CREATE INDEX CONCURRENTLY`` без блокування запису. Заповнення даних
+виконується пакетами за діапазонами первинного ключа: кожен пакет — окрема коротка
+транзакція, між пакетами можлива пауза, а позиція зберігається в таблиці
+``migration_checkpoints``, тож перерване заповнення продовжується з місця зупинки.
+
+Приклад міграції::
+
+    from src.database.online_migrations import add_column_online, backfill, create_index_online
+
+    def upgrade() -> None:
+        add_column_online(op, "contacts", sa.Column("phone_e164", sa.String(20)))
+        with op.get_context().autocommit_block():
+            backfill(
+                op.get_bind(),
+                "contacts_phone_e164",
+                "contacts",
+                columns=["phone_number"],
+                compute=lambda row: {"phone_e164": normalize(row.phone_number)},
+                where=sa.column("phone_e164").is_(None),
+            )
+        create_index_online(op, "ix_contacts_phone_e164", "contacts", ["phone_e164"])
+
+Функції ``backfill`` потрібне з'єднання поза транзакцією міграції (``autocommit_block``
+в Alembic або звичайне з'єднання SQLAlchemy), бо після кожного пакета вона фіксує зміни.
+"""
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Sequence
+
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    DateTime,
+    MetaData,
+    String,
+    Table,
+    and_,
+    bindparam,
+    delete,
+    exists,
+    func,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql.elements import ColumnElement
+
+logger = logging.getLogger("src.database.online_migrations")
+
+CHECKPOINT_TABLE = "migration_checkpoints"
+
+checkpoint_metadata = MetaData()
+checkpoints = Table(
+    CHECKPOINT_TABLE,
+    checkpoint_metadata,
+    Column("name", String(128), primary_key=True),
+    Column("last_key", BigInteger, nullable=False),
+    Column("processed", BigInteger, nullable=False, default=0),
+    Column("done", Boolean, nullable=False, default=False),
+    Column("updated_at", DateTime, nullable=False, server_default=func.now(), onupdate=func.now()),
+)
+
+
+@dataclass
+class BackfillProgress:
+    """
+    Стан заповнення після чергового пакета.
+    """
+
+    name: str
+    processed: int
+    last_key: int
+    max_key: int
+    elapsed: float
+    done: bool = False
+
+    @property
+    def percent(self) -> float:
+        return 100.0 if not self.max_key else round(min(self.last_key / self.max_key, 1.0) * 100, 2)
+
+    @property
+    def rows_per_second(self) -> float:
+        return round(self.processed / self.elapsed, 1) if self.elapsed else 0.0
+
+
+def log_progress(progress: BackfillProgress) -> None:
+    logger.info(
+        "Backfill %s: %s rows, key %s/%s (%.2f%%), %.1f rows/s",
+        progress.name,
+        progress.processed,
+        progress.last_key,
+        progress.max_key,
+        progress.percent,
+        progress.rows_per_second,
+    )
+
+
+def add_column_online(operations, table: str, column: Column) -> None:
+    """
+    Додає колонку без перезапису таблиці.
+
+    Колонка має бути nullable і без серверного значення за замовчуванням: лише тоді
+    Postgres змінює метадані й не тримає ACCESS EXCLUSIVE блокування довго.
+
+    Args:
+        operations: Об'єкт ``alembic.op`` або ``alembic.operations.Operations``.
+        table (str): Назва таблиці.
+        column (Column): Нова колонка.
+
+    Raises:
+        ValueError: Якщо колонка не nullable або має server_default.
+    """
+    if not column.nullable or column.server_default is not None:
+        raise ValueError(
+            f"Column {column.name} must be nullable without server_default; backfill it instead"
+        )
+    operations.add_column(table, column)
+
+
+def create_index_online(
+    operations,
+    name: str,
+    table: str,
+    columns: Sequence[str],
+    unique: bool = False,
+    **kw: Any,
+) -> None:
+    """
+    Створює індекс без блокування запису в таблицю.
+
+    У Postgres використовується ``CREATE INDEX CONCURRENTLY`` поза транзакцією
+    міграції. Невалідний індекс, що залишився після перерваної побудови, спершу
+    видаляється. В інших СУБД створюється звичайний індекс, якщо його ще немає.
+
+    Args:
+        operations: Об'єкт ``alembic.op`` або ``alembic.operations.Operations``.
+        name (str): Назва індексу.
+        table (str): Назва таблиці.
+        columns (Sequence[str]): Колонки або вирази індексу.
+        unique (bool): Унікальний індекс.
+        **kw: Додаткові аргументи ``create_index`` (наприклад, ``postgresql_where``).
+    """
+    connection = operations.get_bind()
+    if connection.dialect.name != "postgresql":
+        operations.create_index(name, table, list(columns), unique=unique, if_not_exists=True, **kw)
+        return
+
+    with operations.get_context().autocommit_block():
+        valid = connection.scalar(
+            text(
+                "SELECT i.indisvalid FROM pg_index i "
+                "JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name"
+            ),
+            {"name": name},
+        )
+        if valid is False:
+            operations.drop_index(name, table_name=table, postgresql_concurrently=True)
+        if valid is not True:
+            operations.create_index(
+                name, table, list(columns), unique=unique, postgresql_concurrently=True, **kw
+            )
+
+
+def drop_index_online(operations, name: str, table: str) -> None:
+    """
+    Видаляє індекс без блокування запису (``DROP INDEX CONCURRENTLY`` у Postgres).
+
+    Args:
+        operations: Об'єкт ``alembic.op`` або ``alembic.operations.Operations``.
+        name (str): Назва індексу.
+        table (str): Назва таблиці.
+    """
+    if operations.get_bind().dialect.name != "postgresql":
+        operations.drop_index(name, table_name=table, if_exists=True)
+        return
+    with operations.get_context().autocommit_block():
+        operations.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def set_not_null_online(operations, table: str, column: str) -> None:
+    """
+    Робить колонку NOT NULL без довгого блокування таблиці.
+
+    У Postgres спершу окремою транзакцією додається ``CHECK (column IS NOT NULL)
+    NOT VALID`` (ACCESS EXCLUSIVE лише на зміну метаданих), далі поза транзакцією
+    міграції виконується ``VALIDATE CONSTRAINT`` під SHARE UPDATE EXCLUSIVE, що не
+    блокує запис. Після цього ``SET NOT NULL`` використовує перевірене обмеження й
+    не сканує таблицю, а допоміжне обмеження видаляється. Перервану міграцію можна
+    повторити: наявне обмеження не створюється вдруге. В інших СУБД колонка
+    змінюється звичайним ALTER (у SQLite — batch-режимом Alembic).
+
+    Args:
+        operations: Об'єкт ``alembic.op`` або ``alembic.operations.Operations``.
+        table (str): Назва таблиці.
+        column (str): Назва колонки.
+    """
+    connection = operations.get_bind()
+    if connection.dialect.name != "postgresql":
+        with operations.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(column, nullable=False)
+        return
+
+    name = f"{table}_{column}_not_null"
+    with operations.get_context().autocommit_block():
+        validated = connection.scalar(
+            text("SELECT convalidated FROM pg_constraint WHERE conname = :name"), {"name": name}
+        )
+        if validated is None:
+            connection.execute(
+                text(f'ALTER TABLE {table} ADD CONSTRAINT "{name}" CHECK ({column} IS NOT NULL) NOT VALID')
+            )
+        if not validated:
+            connection.execute(text(f'ALTER TABLE {table} VALIDATE CONSTRAINT "{name}"'))
+    operations.alter_column(table, column, nullable=False)
+    operations.drop_constraint(name, table, type_="check")
+
+
+def _load_checkpoint(connection: Connection, name: str) -> Optional[Any]:
+    checkpoint_metadata.create_all(connection, checkfirst=True)
+    row = connection.execute(select(checkpoints).where(checkpoints.c.name == name)).first()
+    connection.commit()
+    return row
+
+
+def _save_checkpoint(connection: Connection, name: str, last_key: int, processed: int, done: bool) -> None:
+    values = {"last_key": last_key, "processed": processed, "done": done}
+    result = connection.execute(update(checkpoints).where(checkpoints.c.name == name).values(**values))
+    if result.rowcount == 0:
+        connection.execute(checkpoints.insert().values(name=name, **values))
+
+
+def reset_checkpoint(connection: Connection, name: str) -> None:
+    """
+    Видаляє збережену позицію, щоб наступне заповнення почалося спочатку.
+
+    Args:
+        connection (Connection): З'єднання з базою даних.
+        name (str): Назва заповнення.
+    """
+    checkpoint_metadata.create_all(connection, checkfirst=True)
+    connection.execute(checkpoints.delete().where(checkpoints.c.name == name))
+    connection.commit()
+
+
+def backfill(
+    connection: Connection,
+    name: str,
+    table: str,
+    values: Optional[dict[str, ColumnElement]] = None,
+    compute: Optional[Callable[[Any], Optional[dict]]] = None,
+    columns: Sequence[str] = (),
+    where: Optional[ColumnElement] = None,
+    key: str = "id",
+    batch_size: int = 1000,
+    pause_seconds: float = 0.0,
+    progress: Optional[Callable[[BackfillProgress], None]] = log_progress,
+) -> BackfillProgress:
+    """
+    Заповнює дані пакетами за діапазонами первинного ключа з контрольними точками.
+
+    Межі пакета визначаються за фактичними значеннями ключа (keyset), тож прогалини
+    в послідовності не створюють порожніх пакетів. Кожен пакет і його контрольна
+    точка фіксуються однією транзакцією; повторний запуск з тією ж назвою
+    продовжує з останньої збереженої позиції, а завершене заповнення пропускається.
+
+    Args:
+        connection (Connection): З'єднання поза транзакцією міграції.
+        name (str): Унікальна назва заповнення (ключ контрольної точки).
+        table (str): Назва таблиці.
+        values (Optional[dict[str, ColumnElement]]): SQL-вирази для ``UPDATE ... SET``.
+        compute (Optional[Callable]): Функція рядка -> словник нових значень (або None,
+            щоб пропустити рядок) для перетворень, які неможливо виразити в SQL.
+        columns (Sequence[str]): Колонки, які читаються для ``compute``.
+        where (Optional[ColumnElement]): Додаткова умова відбору рядків.
+        key (str): Цілочисельний первинний ключ.
+        batch_size (int): Кількість ключів у пакеті.
+        pause_seconds (float): Пауза між пакетами для зниження навантаження.
+        progress (Optional[Callable]): Функція, що отримує стан після кожного пакета.
+
+    Returns:
+        BackfillProgress: Підсумковий стан заповнення.
+
+    Raises:
+        ValueError: Якщо не задано рівно один з параметрів ``values`` або ``compute``.
+    """
+    if (values is None) == (compute is None):
+        raise ValueError("Pass exactly one of values or compute")
+
+    target = Table(table, MetaData(), autoload_with=connection)
+    connection.commit()
+    pk = target.c[key]
+    checkpoint = _load_checkpoint(connection, name)
+    last_key = checkpoint.last_key if checkpoint else 0
+    processed = checkpoint.processed if checkpoint else 0
+    max_key = connection.scalar(select(func.max(pk))) or 0
+    connection.commit()
+    started = time.perf_counter()
+    if checkpoint and checkpoint.done:
+        return BackfillProgress(name, processed, last_key, max_key, 0.0, done=True)
+
+    while True:
+        keys = select(pk).where(pk > last_key).order_by(pk).limit(batch_size).subquery()
+        upper = connection.scalar(select(func.max(keys.c[key])))
+        if upper is None:
+            _save_checkpoint(connection, name, last_key, processed, done=True)
+            connection.commit()
+            break
+
+        in_range = [pk > last_key, pk <= upper]
+        if where is not None:
+            in_range.append(where)
+        if values is not None:
+            result = connection.execute(update(target).where(*in_range).values(**values))
+            processed += max(result.rowcount, 0)
+        else:
+            rows = connection.execute(
+                select(pk, *(target.c[column] for column in columns)).where(*in_range)
+            ).all()
+            changes = []
+            for row in rows:
+                changed = compute(row)
+                if changed:
+                    changes.append({"_key": row[0], **changed})
+            if changes:
+                # Усі словники compute мають однаковий набір ключів (executemany)
+                fields = {field: bindparam(field) for field in changes[0] if field != "_key"}
+                connection.execute(
+                    update(target).where(pk == bindparam("_key")).values(**fields), changes
+                )
+            processed += len(changes)
+
+        last_key = upper
+        _save_checkpoint(connection, name, last_key, processed, done=False)
+        connection.commit()
+        if progress is not None:
+            progress(BackfillProgress(name, processed, last_key, max_key, time.perf_counter() - started))
+        if pause_seconds:
+            time.sleep(pause_seconds)
+
+    state = BackfillProgress(name, processed, last_key, max_key, time.perf_counter() - started, done=True)
+    if progress is not None:
+        progress(state)
+    return state
+
+
+def copy_rows(
+    connection: Connection,
+    name: str,
+    source: str,
+    target: str,
+    key: str = "id",
+    batch_size: int = 1000,
+    pause_seconds: float = 0.0,
+    progress: Optional[Callable[[BackfillProgress], None]] = log_progress,
+) -> BackfillProgress:
+    """
+    Копіює рядки з таблиці в таблицю з тими самими колонками пакетами з контрольними точками.
+
+    Пакети визначаються так само, як у ``backfill``. Рядки, які вже є в цільовій
+    таблиці (наприклад, записані тригером-дзеркалом під час копіювання), пропускаються
+    через ``ON CONFLICT DO NOTHING``. У Postgres вихідні рядки пакета читаються з
+    ``FOR SHARE``: рядок, видалений чи змінений паралельною транзакцією, не буде
+    скопійований у застарілій версії. Перед підміною таблиць викличте
+    ``reconcile_rows``, щоб прибрати рядки, які все ж розійшлися з вихідною таблицею.
+
+    Args:
+        connection (Connection): З'єднання поза транзакцією міграції.
+        name (str): Унікальна назва копіювання (ключ контрольної точки).
+        source (str): Вихідна таблиця.
+        target (str): Цільова таблиця.
+        key (str): Цілочисельний ключ, унікальний у вихідній таблиці.
+        batch_size (int): Кількість ключів у пакеті.
+        pause_seconds (float): Пауза між пакетами для зниження навантаження.
+        progress (Optional[Callable]): Функція, що отримує стан після кожного пакета.
+
+    Returns:
+        BackfillProgress: Підсумковий стан копіювання.
+
+    Raises:
+        ValueError: Якщо СУБД не підтримує ``INSERT ... ON CONFLICT``.
+    """
+    dialect_insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(connection.dialect.name)
+    if dialect_insert is None:
+        raise ValueError(f"copy_rows is not supported for {connection.dialect.name}")
+
+    metadata = MetaData()
+    source_table = Table(source, metadata, autoload_with=connection)
+    target_table = Table(target, metadata, autoload_with=connection)
+    connection.commit()
+    pk = source_table.c[key]
+    columns = [column.name for column in source_table.c]
+    checkpoint = _load_checkpoint(connection, name)
+    last_key = checkpoint.last_key if checkpoint else 0
+    processed = checkpoint.processed if checkpoint else 0
+    max_key = connection.scalar(select(func.max(pk))) or 0
+    connection.commit()
+    started = time.perf_counter()
+    if checkpoint and checkpoint.done:
+        return BackfillProgress(name, processed, last_key, max_key, 0.0, done=True)
+
+    while True:
+        keys = select(pk).where(pk > last_key).order_by(pk).limit(batch_size).subquery()
+        upper = connection.scalar(select(func.max(keys.c[key])))
+        if upper is None:
+            _save_checkpoint(connection, name, last_key, processed, done=True)
+            connection.commit()
+            break
+
+        rows = select(*source_table.c).where(pk > last_key, pk <= upper).with_for_update(read=True)
+        result = connection.execute(
+            dialect_insert(target_table).from_select(columns, rows).on_conflict_do_nothing()
+        )
+        processed += max(result.rowcount, 0)
+        last_key = upper
+        _save_checkpoint(connection, name, last_key, processed, done=False)
+        connection.commit()
+        if progress is not None:
+            progress(BackfillProgress(name, processed, last_key, max_key, time.perf_counter() - started))
+        if pause_seconds:
+            time.sleep(pause_seconds)
+
+    state = BackfillProgress(name, processed, last_key, max_key, time.perf_counter() - started, done=True)
+    if progress is not None:
+        progress(state)
+    return state
+
+
+def reconcile_rows(connection: Connection, source: str, target: str, key: str = "id") -> int:
+    """
+    Видаляє з цільової таблиці рядки, яких немає у вихідній у тій самій версії.
+
+    Прохід звірки після ``copy_rows``: анти-з'єднання за ключем і всіма спільними
+    колонками видаляє рядки, повторно вставлені пакетом після видалення тригером,
+    і застарілі версії змінених рядків. Запускайте, поки тригер-дзеркало ще
+    працює: рядки, записані після знімка запиту, не видаляються, а нові зміни
+    тригер переносить сам.
+
+    Args:
+        connection (Connection): З'єднання поза транзакцією міграції.
+        source (str): Вихідна таблиця.
+        target (str): Цільова таблиця.
+        key (str): Ключ, унікальний у вихідній таблиці.
+
+    Returns:
+        int: Кількість видалених рядків.
+    """
+    metadata = MetaData()
+    source_table = Table(source, metadata, autoload_with=connection)
+    target_table = Table(target, metadata, autoload_with=connection)
+    connection.commit()
+    same_row = and_(
+        source_table.c[key] == target_table.c[key],
+        *(
+            source_table.c[column.name].is_not_distinct_from(target_table.c[column.name])
+            for column in source_table.c
+            if column.name != key
+        ),
+    )
+    result = connection.execute(delete(target_table).where(~exists().where(same_row)))
+    connection.commit()
+    removed = max(result.rowcount, 0)
+    logger.info("Reconciled %s with %s: %s stale rows removed", target, source, removed)
+    return removed
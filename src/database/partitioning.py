@@ -0,0 +1,299 @@
+"""
+Перехід таблиці на hash-секціонування за ``user_id`` у Postgres без зупинки запису.
+
+Порядок переходу (див. міграцію ``b8d4f0a2c6e3``):
+
+1. ``prepare_partitioned_copy`` створює тіньову таблицю ``<table>_partitioned``
+   з тими самими колонками, ``PARTITION BY HASH (user_id)``, первинним ключем
+   ``(user_id, id)``, зовнішніми ключами й індексами вихідної таблиці, а також
+   тригер, що дзеркалює в неї кожен INSERT/UPDATE/DELETE вихідної таблиці.
+2. ``copy_rows`` з ``src.database.online_migrations`` копіює наявні рядки
+   пакетами з контрольними точками.
+3. ``cut_over`` однією короткою транзакцією під ACCESS EXCLUSIVE блокуванням
+   перейменовує таблиці та індекси, переносить послідовність ``id`` і
+   перепідключає зовнішні ключі інших таблиць до складеного ключа ``(user_id, id)``.
+   Стара таблиця залишається як ``<table>_unpartitioned`` для відкату і
+   видаляється вручну після перевірки.
+
+Запити застосунку завжди містять ``user_id``, тож planner звертається лише до
+однієї секції.
+"""
+import logging
+import re
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger("src.database.partitioning")
+
+SHADOW_SUFFIX = "_partitioned"
+OLD_SUFFIX = "_unpartitioned"
+NEW_INDEX_SUFFIX = "_new"
+OLD_INDEX_SUFFIX = "_old"
+
+_ON_DELETE = {"a": "NO ACTION", "r": "RESTRICT", "c": "CASCADE", "n": "SET NULL", "d": "SET DEFAULT"}
+_INDEX_HEAD = re.compile(r"^(CREATE (?:UNIQUE )?INDEX )(\S+)( ON (?:ONLY )?)((?:\S+\.)?)(\S+) ")
+
+
+def is_partitioned(connection: Connection, table: str) -> bool:
+    """
+    Перевіряє, чи таблиця вже секціонована.
+
+    Args:
+        connection (Connection): З'єднання з Postgres.
+        table (str): Назва таблиці.
+
+    Returns:
+        bool: True для секціонованої таблиці.
+    """
+    return bool(connection.scalar(
+        text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table p "
+            "JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = :table)"
+        ),
+        {"table": table},
+    ))
+
+
+def partition_ddl(table: str, partitions: int, key: str = "user_id") -> list[str]:
+    """
+    DDL тіньової секціонованої таблиці та її секцій.
+
+    Args:
+        table (str): Вихідна таблиця.
+        partitions (int): Кількість hash-секцій.
+        key (str): Ключ секціонування.
+
+    Returns:
+        list[str]: SQL-інструкції.
+
+    Raises:
+        ValueError: Якщо кількість секцій менша за 2.
+    """
+    if partitions < 2:
+        raise ValueError("At least 2 partitions are required")
+    shadow = f"{table}{SHADOW_SUFFIX}"
+    return [
+        f"CREATE TABLE {shadow} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        f"PARTITION BY HASH ({key})",
+        f"ALTER TABLE {shadow} ALTER COLUMN {key} SET NOT NULL",
+        f"ALTER TABLE {shadow} ADD CONSTRAINT {table}_pkey{NEW_INDEX_SUFFIX} PRIMARY KEY ({key}, id)",
+        *(
+            f"CREATE TABLE {table}_p{remainder} PARTITION OF {shadow} "
+            f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+            for remainder in range(partitions)
+        ),
+    ]
+
+
+def mirror_trigger_ddl(table: str, key: str = "user_id") -> list[str]:
+    """
+    DDL тригера, що дзеркалює зміни вихідної таблиці в тіньову.
+
+    Args:
+        table (str): Вихідна таблиця.
+        key (str): Ключ секціонування.
+
+    Returns:
+        list[str]: SQL-інструкції.
+    """
+    shadow = f"{table}{SHADOW_SUFFIX}"
+    return [
+        f"""CREATE OR REPLACE FUNCTION {shadow}_mirror() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM {shadow} WHERE {key} = OLD.{key} AND id = OLD.id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO {shadow} SELECT NEW.*;
+    END IF;
+    RETURN NULL;
+END
+$$""",
+        f"CREATE TRIGGER {shadow}_mirror AFTER INSERT OR UPDATE OR DELETE ON {table} "
+        f"FOR EACH ROW EXECUTE FUNCTION {shadow}_mirror()",
+    ]
+
+
+def _indexes(connection: Connection, table: str) -> list[tuple[str, str]]:
+    return connection.execute(
+        text(
+            "SELECT i.relname, pg_get_indexdef(i.oid) FROM pg_index x "
+            "JOIN pg_class i ON i.oid = x.indexrelid "
+            "WHERE x.indrelid = CAST(:table AS regclass) AND NOT x.indisprimary"
+        ),
+        {"table": table},
+    ).all()
+
+
+def _rename_indexes(connection: Connection, table: str, old_suffix: str, new_suffix: str) -> None:
+    names = connection.scalars(
+        text(
+            "SELECT i.relname FROM pg_index x JOIN pg_class i ON i.oid = x.indexrelid "
+            "WHERE x.indrelid = CAST(:table AS regclass)"
+        ),
+        {"table": table},
+    ).all()
+    for name in names:
+        if old_suffix and not name.endswith(old_suffix):
+            continue
+        base = name[: len(name) - len(old_suffix)] if old_suffix else name
+        connection.execute(text(f'ALTER INDEX "{name}" RENAME TO "{base}{new_suffix}"'))
+
+
+def _repoint_foreign_keys(connection: Connection, source: str, target: str, key: str, composite: bool) -> list[tuple[str, str]]:
+    # Інші таблиці посилаються на id; на секціонованій таблиці унікальний лише (key, id)
+    rows = connection.execute(
+        text(
+            "SELECT c.conname, c.conrelid::regclass::text, "
+            "ARRAY(SELECT a.attname FROM unnest(c.conkey) k "
+            "JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = k), c.confdeltype "
+            "FROM pg_constraint c WHERE c.contype = 'f' AND c.confrelid = CAST(:source AS regclass)"
+        ),
+        {"source": source},
+    ).all()
+    repointed = []
+    for name, referencing, columns, on_delete in rows:
+        column = columns[-1]
+        if composite and key not in columns:
+            has_key = connection.scalar(
+                text(
+                    "SELECT EXISTS (SELECT 1 FROM pg_attribute WHERE attrelid = CAST(:table AS regclass) "
+                    "AND attname = :key AND NOT attisdropped)"
+                ),
+                {"table": referencing, "key": key},
+            )
+            if not has_key:
+                logger.warning("Dropping foreign key %s on %s: no %s column", name, referencing, key)
+                connection.execute(text(f'ALTER TABLE {referencing} DROP CONSTRAINT "{name}"'))
+                continue
+        local = f"{key}, {column}" if composite else column
+        remote = f"{key}, id" if composite else "id"
+        connection.execute(text(f'ALTER TABLE {referencing} DROP CONSTRAINT "{name}"'))
+        connection.execute(text(
+            f'ALTER TABLE {referencing} ADD CONSTRAINT "{name}" FOREIGN KEY ({local}) '
+            f"REFERENCES {target} ({remote}) ON DELETE {_ON_DELETE[on_delete]} NOT VALID"
+        ))
+        repointed.append((referencing, name))
+    return repointed
+
+
+def prepare_partitioned_copy(connection: Connection, table: str, partitions: int, key: str = "user_id") -> None:
+    """
+    Створює тіньову секціоновану таблицю з індексами й тригером-дзеркалом.
+
+    Виконується в транзакції викликача, тож перерваний запуск не залишає напівготової
+    таблиці. Таблиця ще порожня, тож індекси будуються миттєво. Повторний виклик
+    нічого не робить, якщо тіньова таблиця вже існує.
+
+    Args:
+        connection (Connection): З'єднання в транзакції.
+        table (str): Вихідна таблиця.
+        partitions (int): Кількість hash-секцій.
+        key (str): Ключ секціонування.
+
+    Raises:
+        RuntimeError: Якщо у вихідній таблиці є рядки без ключа секціонування.
+    """
+    shadow = f"{table}{SHADOW_SUFFIX}"
+    if connection.scalar(text("SELECT to_regclass(:shadow)"), {"shadow": shadow}) is not None:
+        return
+    orphans = connection.scalar(text(f"SELECT count(*) FROM {table} WHERE {key} IS NULL"))
+    if orphans:
+        raise RuntimeError(f"{orphans} rows of {table} have no {key}; assign or delete them first")
+
+    foreign_keys = connection.execute(
+        text(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE contype = 'f' AND conrelid = CAST(:table AS regclass)"
+        ),
+        {"table": table},
+    ).all()
+    indexes = _indexes(connection, table)
+    for statement in partition_ddl(table, partitions, key):
+        connection.execute(text(statement))
+    for name, definition in foreign_keys:
+        connection.execute(text(f'ALTER TABLE {shadow} ADD CONSTRAINT "{name}" {definition}'))
+    for name, definition in indexes:
+        connection.execute(text(_INDEX_HEAD.sub(
+            lambda m: f"{m[1]}{name}{NEW_INDEX_SUFFIX}{m[3]}{m[4]}{shadow} ", definition
+        )))
+    for statement in mirror_trigger_ddl(table, key):
+        connection.execute(text(statement))
+    logger.info("Created %s with %s hash partitions", shadow, partitions)
+
+
+def cut_over(connection: Connection, table: str, key: str = "user_id") -> list[tuple[str, str]]:
+    """
+    Підміняє вихідну таблицю секціонованою в поточній транзакції.
+
+    Транзакцію фіксує викликач; блокування ACCESS EXCLUSIVE тримається лише на
+    час перейменувань. Перепідключені зовнішні ключі створюються ``NOT VALID`` і
+    перевіряються окремо через ``validate_constraints``.
+
+    Args:
+        connection (Connection): З'єднання в транзакції.
+        table (str): Вихідна таблиця.
+        key (str): Ключ секціонування.
+
+    Returns:
+        list[tuple[str, str]]: Таблиці та назви перепідключених зовнішніх ключів.
+    """
+    shadow, old = f"{table}{SHADOW_SUFFIX}", f"{table}{OLD_SUFFIX}"
+    sequence = connection.scalar(text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": table})
+    connection.execute(text(f"LOCK TABLE {table}, {shadow} IN ACCESS EXCLUSIVE MODE"))
+    connection.execute(text(f"DROP TRIGGER {shadow}_mirror ON {table}"))
+    connection.execute(text(f"DROP FUNCTION {shadow}_mirror()"))
+    repointed = _repoint_foreign_keys(connection, table, shadow, key, composite=True)
+    connection.execute(text(f"ALTER TABLE {table} RENAME TO {old}"))
+    _rename_indexes(connection, old, "", OLD_INDEX_SUFFIX)
+    connection.execute(text(f"ALTER TABLE {shadow} RENAME TO {table}"))
+    _rename_indexes(connection, table, NEW_INDEX_SUFFIX, "")
+    if sequence is not None:
+        connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id"))
+    logger.info("Switched %s to the partitioned table, old table kept as %s", table, old)
+    return repointed
+
+
+def revert_partitioning(connection: Connection, table: str, key: str = "user_id") -> list[tuple[str, str]]:
+    """
+    Повертає несекціоновану таблицю в поточній транзакції.
+
+    Дані з секціонованої таблиці копіюються назад у ``<table>_unpartitioned`` під
+    блокуванням, тож відкат зупиняє запис на час копіювання.
+
+    Args:
+        connection (Connection): З'єднання в транзакції.
+        table (str): Секціонована таблиця.
+        key (str): Ключ секціонування.
+
+    Returns:
+        list[tuple[str, str]]: Таблиці та назви перепідключених зовнішніх ключів.
+    """
+    shadow, old = f"{table}{SHADOW_SUFFIX}", f"{table}{OLD_SUFFIX}"
+    sequence = connection.scalar(text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": table})
+    connection.execute(text(f"LOCK TABLE {table}, {old} IN ACCESS EXCLUSIVE MODE"))
+    connection.execute(text(f"TRUNCATE {old}"))
+    connection.execute(text(f"INSERT INTO {old} SELECT * FROM {table}"))
+    repointed = _repoint_foreign_keys(connection, table, old, key, composite=False)
+    connection.execute(text(f"ALTER TABLE {table} RENAME TO {shadow}"))
+    _rename_indexes(connection, shadow, "", NEW_INDEX_SUFFIX)
+    connection.execute(text(f"ALTER TABLE {old} RENAME TO {table}"))
+    _rename_indexes(connection, table, OLD_INDEX_SUFFIX, "")
+    if sequence is not None:
+        connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id"))
+    connection.execute(text(f"DROP TABLE {shadow}"))
+    return repointed
+
+
+def validate_constraints(connection: Connection, constraints: list[tuple[str, str]]) -> None:
+    """
+    Перевіряє зовнішні ключі, створені як ``NOT VALID``, без блокування запису.
+
+    Args:
+        connection (Connection): З'єднання поза транзакцією міграції.
+        constraints (list[tuple[str, str]]): Таблиці та назви обмежень.
+    """
+    for referencing, name in constraints:
+        connection.execute(text(f'ALTER TABLE {referencing} VALIDATE CONSTRAINT "{name}"'))
+        connection.commit()
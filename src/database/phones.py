@@ -0,0 +1,44 @@
+"""
+Нормалізація телефонних номерів до формату E.164.
+
+Контакт зберігає телефон у довільному вигляді (``phone_number``) і поруч —
+нормалізований ``phone_e164``, за яким працює пошук власника номера за індексом
+``(user_id, phone_e164)``. Національні номери доповнюються кодом країни
+``PHONE_DEFAULT_COUNTRY_CODE``.
+"""
+import re
+from typing import Optional
+
+from src.conf.config import settings
+
+_NON_DIGITS = re.compile(r"\D")
+
+# E.164 дозволяє не більше 15 цифр; коротші за 8 цифр номери не можуть бути повними
+MIN_DIGITS = 8
+MAX_DIGITS = 15
+
+
+def to_e164(phone: Optional[str], country_code: str = settings.PHONE_DEFAULT_COUNTRY_CODE) -> Optional[str]:
+    """
+    Нормалізує телефон до формату E.164 ("+380501234567").
+
+    Міжнародний префікс "00" відкидається; національні номери ("0501234567") та
+    номери без коду країни й нуля ("501234567") доповнюються кодом країни.
+
+    Args:
+        phone (Optional[str]): Телефон у довільному форматі.
+        country_code (str): Код країни для національних номерів.
+
+    Returns:
+        Optional[str]: Номер у форматі E.164 або None, якщо номер неповний чи задовгий.
+    """
+    digits = _NON_DIGITS.sub("", phone or "")
+    if digits.startswith("00"):
+        digits = digits[2:]
+    elif len(digits) == 10 and digits.startswith("0"):
+        digits = country_code + digits[1:]
+    elif len(digits) == 9:
+        digits = country_code + digits
+    if not MIN_DIGITS <= len(digits) <= MAX_DIGITS:
+        return None
+    return f"+{digits}"
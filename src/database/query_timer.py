@@ -0,0 +1,52 @@
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryTimings:
+    """
+    Сумарний час і кількість запитів до бази даних у межах одного контексту (запиту).
+    """
+
+    def __init__(self):
+        self.db_ms = 0.0
+        self.db_queries = 0
+
+
+current_timings: ContextVar[Optional[QueryTimings]] = ContextVar("current_timings", default=None)
+
+
+def attach_db_timer(engine: Engine) -> None:
+    """
+    Підключає до рушія облік часу запитів для контексту, де встановлено ``current_timings``.
+
+    Поза таким контекстом обробники лише читають ContextVar.
+
+    Args:
+        engine (Engine): Рушій (для AsyncEngine — ``engine.sync_engine``).
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if current_timings.get() is not None:
+            conn.info.setdefault("query_timer_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        timings = current_timings.get()
+        starts = conn.info.get("query_timer_start")
+        if timings is not None and starts:
+            timings.db_ms += (time.perf_counter() - starts.pop()) * 1000
+            timings.db_queries += 1
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        # Для запиту з помилкою after_cursor_execute не викликається
+        conn = exception_context.connection
+        if conn is not None and exception_context.execution_context is not None:
+            starts = conn.info.get("query_timer_start")
+            if starts:
+                starts.pop()
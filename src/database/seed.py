@@ -0,0 +1,303 @@
+"""
+Генератор синтетичних даних та CLI для заповнення бази користувачами і контактами.
+
+Розподіли наближені до реальних: розміри адресних книг мають "довгий хвіст"
+(закон Ціпфа), дні народження рівномірно розподілені по року, імена беруться з
+обмежених пулів (збіги для пошуку), а частина контактів має дубльовані email або
+телефон у варіантах регістру й формату. Результат детермінований за ``--seed``.
+
+Запис іде пакетами через executemany, а на Postgres (asyncpg) — через COPY.
+
+Приклад::
+
+    python -m src.database.seed --users 10000 --contacts 10000000 --seed 42 --recreate
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import date, datetime, timedelta
+from itertools import islice
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from src.conf.config import settings
+from src.database.models import Base, Contact, User, month_day
+from src.database.phones import to_e164
+from src.repository.users import recount_contacts
+from src.services.auth import Hash
+
+FIRST_NAMES = [
+    "Olena", "Andrii", "Iryna", "Oleksandr", "Nataliia", "Dmytro", "Tetiana", "Serhii", "Yuliia", "Maksym",
+    "Kateryna", "Volodymyr", "Anna", "Ivan", "Mariia", "Mykola", "Oksana", "Taras", "Sofiia", "Bohdan",
+    "John", "Mary", "James", "Patricia", "Robert", "Jennifer", "Michael", "Linda", "William", "Elizabeth",
+    "David", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Charles", "Karen",
+    "Daniel", "Nancy", "Matthew", "Lisa", "Anthony", "Betty", "Mark", "Margaret", "Paul", "Sandra",
+]
+LAST_NAMES = [
+    "Melnyk", "Shevchenko", "Boiko", "Kovalenko", "Bondarenko", "Tkachenko", "Kovalchuk", "Kravchenko",
+    "Oliinyk", "Shevchuk", "Koval", "Polishchuk", "Bondar", "Tkachuk", "Moroz", "Marchenko", "Lysenko",
+    "Rudenko", "Savchenko", "Petrenko", "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia",
+    "Miller", "Davis", "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson",
+    "Thomas", "Taylor", "Moore", "Jackson", "Martin", "Lee", "Perez", "Thompson", "White", "Harris",
+]
+EMAIL_DOMAINS = ["gmail.com", "ukr.net", "i.ua", "outlook.com", "yahoo.com", "meta.ua", "proton.me"]
+
+
+def zipf_weights(count: int, exponent: float) -> list[float]:
+    """
+    Повертає ваги за законом Ціпфа для ``count`` елементів.
+
+    Args:
+        count (int): Кількість елементів.
+        exponent (float): Показник степеня (більший — сильніший перекіс).
+
+    Returns:
+        list[float]: Ненормовані ваги, від найбільшої до найменшої.
+    """
+    return [1 / (rank ** exponent) for rank in range(1, count + 1)]
+
+
+def address_book_sizes(rng: random.Random, users: int, contacts: int, exponent: float = 1.1) -> list[int]:
+    """
+    Розподіляє загальну кількість контактів між користувачами з перекосом.
+
+    Args:
+        rng (random.Random): Генератор випадкових чисел.
+        users (int): Кількість користувачів.
+        contacts (int): Загальна кількість контактів.
+        exponent (float): Показник перекосу розподілу.
+
+    Returns:
+        list[int]: Кількість контактів для кожного користувача; сума дорівнює ``contacts``.
+    """
+    weights = zipf_weights(users, exponent)
+    rng.shuffle(weights)
+    total = sum(weights)
+    sizes = [int(contacts * weight / total) for weight in weights]
+    for index in rng.choices(range(users), weights, k=contacts - sum(sizes)):
+        sizes[index] += 1
+    return sizes
+
+
+def generate_users(
+    rng: random.Random, count: int, hashed_password: str, prefix: str = "seed_user",
+    unconfirmed_rate: float = 0.1,
+) -> Iterator[dict]:
+    """
+    Генерує рядки користувачів.
+
+    Частина користувачів не підтверджує email і створена давніше — для тестування
+    обслуговування облікових записів.
+
+    Args:
+        rng (random.Random): Генератор випадкових чисел.
+        count (int): Кількість користувачів.
+        hashed_password (str): Спільний хеш пароля (хешування кожного — надто повільне).
+        prefix (str): Префікс імен користувачів.
+        unconfirmed_rate (float): Частка непідтверджених облікових записів.
+
+    Yields:
+        dict: Значення колонок таблиці users.
+    """
+    now = datetime.now()
+    for index in range(count):
+        confirmed = rng.random() >= unconfirmed_rate
+        yield {
+            "username": f"{prefix}{index:07d}",
+            "email": f"{prefix}{index:07d}@example.com",
+            "hashed_password": hashed_password,
+            "confirmed": confirmed,
+            "created_at": now - timedelta(days=rng.randrange(1, 730 if confirmed else 90)),
+        }
+
+
+def _email_variant(rng: random.Random, email: str) -> str:
+    return rng.choice([email, email.upper(), email.capitalize(), f" {email} "])
+
+
+def _phone_variant(rng: random.Random, phone: str) -> str:
+    digits = phone.lstrip("+")
+    return rng.choice([
+        f"+{digits[:3]} {digits[3:5]} {digits[5:8]} {digits[8:]}",
+        f"0{digits[3:]}",
+        f"({digits[3:6]}) {digits[6:9]}-{digits[9:]}",
+    ])
+
+
+def generate_contacts(
+    rng: random.Random, user_ids: Iterable[int], sizes: Iterable[int], duplicate_rate: float = 0.02,
+) -> Iterator[dict]:
+    """
+    Генерує рядки контактів для кожного користувача.
+
+    Args:
+        rng (random.Random): Генератор випадкових чисел.
+        user_ids (Iterable[int]): Ідентифікатори власників.
+        sizes (Iterable[int]): Кількість контактів для кожного власника.
+        duplicate_rate (float): Частка контактів, що дублюють email/телефон іншого контакту.
+
+    Yields:
+        dict: Значення колонок таблиці contacts.
+    """
+    now = datetime.now()
+    first_weights = zipf_weights(len(FIRST_NAMES), 0.8)
+    last_weights = zipf_weights(len(LAST_NAMES), 0.8)
+    serial = 0
+    for user_id, size in zip(user_ids, sizes):
+        previous: Optional[dict] = None
+        for seq in range(1, size + 1):
+            serial += 1
+            first_name = rng.choices(FIRST_NAMES, first_weights)[0]
+            last_name = rng.choices(LAST_NAMES, last_weights)[0]
+            email = f"{first_name}.{last_name}{serial}@{rng.choice(EMAIL_DOMAINS)}".lower()
+            phone = f"+380{rng.choice((50, 63, 66, 67, 68, 73, 93, 95, 96, 97, 98, 99))}{rng.randrange(10**7):07d}"
+            if previous is not None and rng.random() < duplicate_rate:
+                email = _email_variant(rng, previous["email"].lower())
+                phone = _phone_variant(rng, previous["phone_number"]) if rng.random() < 0.5 else phone
+            birthday = date(1950 + rng.randrange(60), 1, 1) + timedelta(days=rng.randrange(365))
+            row = {
+                "first_name": first_name,
+                "last_name": last_name,
+                "email": email,
+                "phone_number": phone,
+                "phone_e164": to_e164(phone),
+                "birthday": birthday,
+                "birthday_md": month_day(birthday),
+                "user_id": user_id,
+                "change_seq": seq,
+                "created_at": now,
+                "updated_at": now,
+            }
+            if previous is None or rng.random() < 0.2:
+                previous = row
+            yield row
+
+
+def _batches(rows: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+async def bulk_insert(conn: AsyncConnection, table, rows: Iterable[dict], batch_size: int = 5000) -> int:
+    """
+    Записує рядки пакетами найшвидшим доступним способом.
+
+    На Postgres через asyncpg використовується COPY, інакше — executemany.
+
+    Args:
+        conn (AsyncConnection): Асинхронне з'єднання.
+        table: Таблиця SQLAlchemy.
+        rows (Iterable[dict]): Рядки для запису (усі з однаковими ключами).
+        batch_size (int): Розмір пакета.
+
+    Returns:
+        int: Кількість записаних рядків.
+    """
+    written = 0
+    use_copy = conn.dialect.name == "postgresql" and conn.dialect.driver == "asyncpg"
+    for batch in _batches(rows, batch_size):
+        if use_copy:
+            columns = list(batch[0])
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                table.name, records=[tuple(row[c] for c in columns) for row in batch], columns=columns,
+            )
+        else:
+            await conn.execute(insert(table), batch)
+        written += len(batch)
+    return written
+
+
+async def seed_database(
+    db_url: str,
+    users: int,
+    contacts: int,
+    seed_value: int = 42,
+    batch_size: int = 5000,
+    recreate: bool = False,
+    password: str = "password",
+    prefix: str = "seed_user",
+) -> dict:
+    """
+    Заповнює базу користувачами та контактами.
+
+    Args:
+        db_url (str): URL бази даних.
+        users (int): Кількість користувачів.
+        contacts (int): Загальна кількість контактів.
+        seed_value (int): Зерно генератора випадкових чисел.
+        batch_size (int): Розмір пакета запису.
+        recreate (bool): Чи перестворювати схему перед заповненням.
+        password (str): Пароль усіх згенерованих користувачів.
+        prefix (str): Префікс імен користувачів.
+
+    Returns:
+        dict: Кількість записаних користувачів і контактів та тривалість, с.
+    """
+    rng = random.Random(seed_value)
+    engine = create_async_engine(db_url)
+    started = time.perf_counter()
+    try:
+        async with engine.begin() as conn:
+            if recreate:
+                await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+
+        hashed = Hash().get_password_hash(password)
+        async with engine.begin() as conn:
+            written_users = await bulk_insert(
+                conn, User.__table__, generate_users(rng, users, hashed, prefix), batch_size
+            )
+            result = await conn.execute(
+                select(User.id).where(User.username.like(f"{prefix}%")).order_by(User.username)
+            )
+            user_ids = result.scalars().all()
+
+        sizes = address_book_sizes(rng, len(user_ids), contacts)
+        async with engine.begin() as conn:
+            written_contacts = await bulk_insert(
+                conn, Contact.__table__, generate_contacts(rng, user_ids, sizes), batch_size
+            )
+            await conn.execute(recount_contacts())
+    finally:
+        await engine.dispose()
+    return {
+        "users": written_users,
+        "contacts": written_contacts,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Seed the database with synthetic users and contacts")
+    parser.add_argument("--db-url", default=None, help="defaults to DB_URL from settings")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--contacts", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--recreate", action="store_true", help="drop and recreate all tables first")
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--prefix", default="seed_user")
+    args = parser.parse_args(argv)
+
+    stats = asyncio.run(
+        seed_database(
+            args.db_url or settings.DB_URL,
+            args.users,
+            args.contacts,
+            args.seed,
+            args.batch_size,
+            args.recreate,
+            args.password,
+            args.prefix,
+        )
+    )
+    print(f"Seeded {stats['users']} users and {stats['contacts']} contacts in {stats['seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
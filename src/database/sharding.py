@@ -0,0 +1,382 @@
+"""
+Шардування користувачів і їхніх контактів між кількома базами за user_id.
+
+Бази-шарди перелічені в ``DB_SHARD_URLS``; усі дані користувача (рядок users,
+контакти, tombstone-записи, пари дублікатів) живуть на одному шарді. Основна база
+(``DB_URL``) зберігає довідник ``user_directory``: він видає глобальні
+ідентифікатори користувачів і відповідає, на якому шарді користувач, за id,
+іменем або email (вхід, підтвердження пошти). Новий користувач потрапляє на шард
+``shard_for_user_id``; після переносу між шардами довідник має пріоритет. Для
+SQLite довідник і шарди мають бути окремими файлами: перенесення тримає запис у
+вихідний шард до оновлення довідника.
+
+Схема шарда створюється тими самими міграціями::
+
+    alembic -x shard=1 upgrade head
+
+Перенесення користувача, статистика та заповнення довідника для наявної бази::
+
+    python -m src.database.sharding move --user-id 42 --shard 1
+    python -m src.database.sharding stats
+    python -m src.database.sharding sync-directory
+"""
+import argparse
+import asyncio
+import json
+import sys
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Iterable, Optional
+
+from sqlalchemy import Table, bindparam, delete, func, insert, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from src.database.models import Contact, ContactDuplicate, ContactTombstone, User, UserDirectory
+
+if TYPE_CHECKING:
+    from src.database.db import DatabaseSessionManager
+
+SHARD_BY_ID = select(UserDirectory.shard).where(UserDirectory.id == bindparam("user_id"))
+SHARD_BY_USERNAME = select(UserDirectory.shard).where(UserDirectory.username == bindparam("username"))
+SHARD_BY_EMAIL = select(UserDirectory.shard).where(UserDirectory.email == bindparam("email"))
+
+# Обмеження кількості параметрів у одному IN (...) для SQLite
+_CHUNK = 500
+
+USERS: Table = User.__table__
+CONTACTS: Table = Contact.__table__
+TOMBSTONES: Table = ContactTombstone.__table__
+DUPLICATES: Table = ContactDuplicate.__table__
+
+
+def shard_for_user_id(user_id: int, shards: int) -> int:
+    """
+    Шард, на який потрапляє новий користувач.
+
+    Args:
+        user_id (int): Глобальний ідентифікатор користувача з довідника.
+        shards (int): Кількість шардів.
+
+    Returns:
+        int: Номер шарда.
+    """
+    return user_id % shards
+
+
+def _chunks(values: list, size: int = _CHUNK) -> Iterable[list]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class ShardDirectory:
+    """
+    Довідник користувачів в основній базі менеджера сесій.
+    """
+
+    def __init__(self, manager: "DatabaseSessionManager"):
+        """
+        Ініціалізація ShardDirectory.
+
+        Args:
+            manager (DatabaseSessionManager): Менеджер основної бази з довідником.
+        """
+        self._manager = manager
+
+    async def lookup(
+        self, *, user_id: Optional[int] = None, username: Optional[str] = None, email: Optional[str] = None
+    ) -> Optional[int]:
+        """
+        Шард користувача за ідентифікатором, іменем або email.
+
+        Args:
+            user_id (Optional[int]): Ідентифікатор користувача.
+            username (Optional[str]): Ім'я користувача.
+            email (Optional[str]): Email користувача.
+
+        Returns:
+            Optional[int]: Номер шарда або None, якщо користувача немає в довіднику.
+        """
+        if user_id is not None:
+            stmt, params = SHARD_BY_ID, {"user_id": user_id}
+        elif username is not None:
+            stmt, params = SHARD_BY_USERNAME, {"username": username}
+        else:
+            stmt, params = SHARD_BY_EMAIL, {"email": email}
+        async with self._manager.engine.connect() as conn:
+            return (await conn.execute(stmt, params)).scalar_one_or_none()
+
+    async def register(self, username: str, email: str, shards: int) -> tuple[int, int]:
+        """
+        Реєструє нового користувача: видає ідентифікатор і обирає шард.
+
+        Args:
+            username (str): Ім'я користувача.
+            email (str): Email користувача.
+            shards (int): Кількість шардів.
+
+        Returns:
+            tuple[int, int]: Ідентифікатор користувача та номер шарда.
+
+        Raises:
+            IntegrityError: Якщо ім'я або email уже зайняті.
+        """
+        async with self._manager.engine.begin() as conn:
+            result = await conn.execute(insert(UserDirectory).values(username=username, email=email))
+            user_id = result.inserted_primary_key[0]
+            shard = shard_for_user_id(user_id, shards)
+            await conn.execute(update(UserDirectory).where(UserDirectory.id == user_id).values(shard=shard))
+        return user_id, shard
+
+    async def assign(self, user_id: int, shard: int) -> None:
+        """
+        Записує новий шард користувача.
+
+        Args:
+            user_id (int): Ідентифікатор користувача.
+            shard (int): Номер шарда.
+        """
+        async with self._manager.engine.begin() as conn:
+            await conn.execute(update(UserDirectory).where(UserDirectory.id == user_id).values(shard=shard))
+
+    async def unregister(self, user_ids: list[int]) -> None:
+        """
+        Видаляє користувачів з довідника, звільняючи їхні імена та email.
+
+        Args:
+            user_ids (list[int]): Ідентифікатори користувачів.
+        """
+        async with self._manager.engine.begin() as conn:
+            for chunk in _chunks(user_ids):
+                await conn.execute(delete(UserDirectory).where(UserDirectory.id.in_(chunk)))
+
+    async def counts(self) -> dict[int, int]:
+        """
+        Кількість користувачів на кожному шарді.
+
+        Returns:
+            dict[int, int]: Номер шарда -> кількість користувачів.
+        """
+        async with self._manager.engine.connect() as conn:
+            rows = await conn.execute(
+                select(UserDirectory.shard, func.count()).group_by(UserDirectory.shard).order_by(UserDirectory.shard)
+            )
+            return {shard: count for shard, count in rows}
+
+
+async def _rows(conn: AsyncConnection, table: Table, column, user_id: int) -> list[dict]:
+    result = await conn.execute(select(table).where(column == user_id).order_by(table.c.id))
+    return [dict(row._mapping) for row in result]
+
+
+async def _existing_ids(conn: AsyncConnection, table: Table, ids: list[int]) -> set[int]:
+    existing = set()
+    for chunk in _chunks(ids):
+        existing.update((await conn.execute(select(table.c.id).where(table.c.id.in_(chunk)))).scalars())
+    return existing
+
+
+async def _advance_sequence(conn: AsyncConnection, table: Table) -> None:
+    # Явно вставлені id не зсувають послідовність Postgres; SQLite бере max(id) + 1 сам
+    if conn.dialect.name != "postgresql":
+        return
+    await conn.execute(text(
+        f"SELECT setval(seq, max_id) FROM (SELECT pg_get_serial_sequence('{table.name}', 'id')::regclass AS seq, "
+        f"max(id) AS max_id FROM {table.name}) q WHERE max_id > coalesce(pg_sequence_last_value(seq), 0)"
+    ))
+
+
+async def _copy_user(conn: AsyncConnection, rows: dict[Table, list[dict]]) -> int:
+    """
+    Вставляє дані користувача на цільовий шард.
+
+    Контакти зберігають свої id, якщо ті вільні на цільовому шарді. Контакт із
+    зайнятим id отримує новий, а для старого записується tombstone з новими
+    позиціями в послідовності змін, тож клієнти дельта-синхронізації побачать
+    видалення старого id і появу нового.
+
+    Returns:
+        int: Кількість контактів, що отримали нові id.
+    """
+    user = rows[USERS][0]
+    contacts = rows[CONTACTS]
+    taken = await _existing_ids(conn, CONTACTS, [contact["id"] for contact in contacts])
+    moved = [contact for contact in contacts if contact["id"] not in taken]
+    renumbered = [contact for contact in contacts if contact["id"] in taken]
+    tombstones = [{key: value for key, value in row.items() if key != "id"} for row in rows[TOMBSTONES]]
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    for contact in renumbered:
+        user["change_seq"] += 1
+        tombstones.append(
+            {"user_id": user["id"], "contact_id": contact["id"], "change_seq": user["change_seq"], "deleted_at": now}
+        )
+        user["change_seq"] += 1
+        contact["change_seq"] = user["change_seq"]
+
+    await conn.execute(insert(USERS), [user])
+    if moved:
+        await conn.execute(insert(CONTACTS), moved)
+        await _advance_sequence(conn, CONTACTS)
+    new_ids = {contact["id"]: contact["id"] for contact in moved}
+    for contact in renumbered:
+        values = {key: value for key, value in contact.items() if key != "id"}
+        new_ids[contact["id"]] = (await conn.execute(insert(CONTACTS).values(values))).inserted_primary_key[0]
+    if tombstones:
+        await conn.execute(insert(TOMBSTONES), tombstones)
+    duplicates = [
+        {
+            **{key: value for key, value in row.items() if key != "id"},
+            "contact_id": new_ids[row["contact_id"]],
+            "duplicate_id": new_ids[row["duplicate_id"]],
+        }
+        for row in rows[DUPLICATES]
+    ]
+    # Пара має лишатися впорядкованою після перенумерації
+    for row in duplicates:
+        if row["contact_id"] > row["duplicate_id"]:
+            row["contact_id"], row["duplicate_id"] = row["duplicate_id"], row["contact_id"]
+    if duplicates:
+        await conn.execute(insert(DUPLICATES), duplicates)
+    return len(renumbered)
+
+
+async def _delete_user(conn: AsyncConnection, user_id: int) -> None:
+    for table in (DUPLICATES, TOMBSTONES, CONTACTS):
+        await conn.execute(delete(table).where(table.c.user_id == user_id))
+    await conn.execute(delete(USERS).where(USERS.c.id == user_id))
+
+
+async def move_user(manager: "DatabaseSessionManager", user_id: int, target: int) -> dict:
+    """
+    Переносить користувача з усіма його даними на інший шард.
+
+    Рядок користувача на вихідному шарді блокується, а дані видаляються в тій самій
+    транзакції ще до копіювання, тож зміни контактів користувача чекають до кінця
+    переносу. Вихідна транзакція фіксується лише після запису на цільовий шард і
+    оновлення довідника; за помилки дані лишаються на вихідному шарді. Запити, що
+    дочекалися блокування, після переносу отримають помилку замість втрати змін.
+    Кеші пошуку й днів народження інших процесів оновляться після свого TTL.
+
+    Args:
+        manager (DatabaseSessionManager): Менеджер основної бази з шардами.
+        user_id (int): Ідентифікатор користувача.
+        target (int): Номер цільового шарда.
+
+    Returns:
+        dict: Вихідний і цільовий шард, кількість перенесених і перенумерованих контактів.
+
+    Raises:
+        ValueError: Якщо шардування вимкнене або такого шарда немає.
+        LookupError: Якщо користувача немає в довіднику чи на його шарді.
+    """
+    if not manager.sharded or not 0 <= target < len(manager.shards):
+        raise ValueError(f"Unknown shard {target}")
+    source = await manager.directory.lookup(user_id=user_id)
+    if source is None:
+        raise LookupError(f"User {user_id} is not in the directory")
+    report = {"user_id": user_id, "source": source, "target": target, "contacts": 0, "renumbered": 0}
+    if source == target:
+        return report
+
+    async with manager.shard(source).engine.connect() as src, manager.shard(target).engine.connect() as dst:
+        async with src.begin():
+            locked = await src.execute(select(USERS.c.id).where(USERS.c.id == user_id).with_for_update())
+            if locked.scalar_one_or_none() is None:
+                raise LookupError(f"User {user_id} is not on shard {source}")
+            rows = {
+                USERS: await _rows(src, USERS, USERS.c.id, user_id),
+                CONTACTS: await _rows(src, CONTACTS, CONTACTS.c.user_id, user_id),
+                TOMBSTONES: await _rows(src, TOMBSTONES, TOMBSTONES.c.user_id, user_id),
+                DUPLICATES: await _rows(src, DUPLICATES, DUPLICATES.c.user_id, user_id),
+            }
+            await _delete_user(src, user_id)
+            async with dst.begin():
+                report["renumbered"] = await _copy_user(dst, rows)
+            try:
+                await manager.directory.assign(user_id, target)
+            except Exception:
+                async with dst.begin():
+                    await _delete_user(dst, user_id)
+                raise
+    report["contacts"] = len(rows[CONTACTS])
+    return report
+
+
+def _insert_missing(dialect: str):
+    module = postgresql if dialect == "postgresql" else sqlite
+    return module.insert(UserDirectory)
+
+
+async def sync_directory(manager: "DatabaseSessionManager") -> dict[int, int]:
+    """
+    Додає до довідника користувачів шардів, яких у ньому ще немає.
+
+    Потрібно один раз при переході з однієї бази на шарди: наявна база стає
+    шардом, а її користувачі зберігають свої ідентифікатори.
+
+    Args:
+        manager (DatabaseSessionManager): Менеджер основної бази з шардами.
+
+    Returns:
+        dict[int, int]: Номер шарда -> кількість доданих записів.
+    """
+    added = {}
+    async with manager.engine.begin() as directory:
+        for index, shard in enumerate(manager.shards):
+            async with shard.engine.connect() as conn:
+                users = (await conn.execute(select(USERS.c.id, USERS.c.username, USERS.c.email))).all()
+            rows = [{"id": id_, "username": username, "email": email, "shard": index} for id_, username, email in users]
+            added[index] = 0
+            for chunk in _chunks(rows):
+                stmt = _insert_missing(directory.dialect.name).values(chunk).on_conflict_do_nothing()
+                added[index] += (await directory.execute(stmt)).rowcount
+        await _advance_sequence(directory, UserDirectory.__table__)
+    return added
+
+
+async def shard_stats(manager: "DatabaseSessionManager") -> dict:
+    """
+    Кількість користувачів і контактів на кожному шарді.
+
+    Args:
+        manager (DatabaseSessionManager): Менеджер основної бази з шардами.
+
+    Returns:
+        dict: Дані довідника та фактичні кількості рядків на шардах.
+    """
+    shards = []
+    for index, shard in enumerate(manager.shards):
+        async with shard.engine.connect() as conn:
+            users = (await conn.execute(select(func.count()).select_from(USERS))).scalar_one()
+            contacts = (await conn.execute(select(func.count()).select_from(CONTACTS))).scalar_one()
+        shards.append({"shard": index, "users": users, "contacts": contacts})
+    return {"directory": await manager.directory.counts() if manager.sharded else {}, "shards": shards}
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    from src.database.db import sessionmanager
+
+    parser = argparse.ArgumentParser(description="Shard management")
+    commands = parser.add_subparsers(dest="command", required=True)
+    move = commands.add_parser("move", help="move a user with all contacts to another shard")
+    move.add_argument("--user-id", type=int, required=True)
+    move.add_argument("--shard", type=int, required=True)
+    commands.add_parser("stats", help="users and contacts per shard")
+    commands.add_parser("sync-directory", help="register users of all shards in the directory")
+    args = parser.parse_args(argv)
+
+    async def run():
+        try:
+            if args.command == "move":
+                return await move_user(sessionmanager, args.user_id, args.shard)
+            if args.command == "sync-directory":
+                return await sync_directory(sessionmanager)
+            return await shard_stats(sessionmanager)
+        finally:
+            await sessionmanager.close()
+
+    print(json.dumps(asyncio.run(run())))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
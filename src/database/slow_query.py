@@ -0,0 +1,265 @@
+import hashlib
+import json
+import logging
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Optional
+
+import greenlet
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("src.database.slow_query")
+
+# ASGI scope поточного запиту; встановлюється RouteContextMiddleware
+current_scope: ContextVar[Optional[dict]] = ContextVar("current_scope", default=None)
+
+_CALLER_PREFIXES = ("src.repository.", "src.services.")
+_EXPLAINABLE = ("select", "with")
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER_RE = re.compile(r"\$\d+|%s|%\(\w+\)s|(?<!:):\w+")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+def fingerprint(statement: str) -> tuple[str, str]:
+    """
+    Нормалізує SQL-запит до "відбитка", однакового для запитів, що відрізняються лише значеннями.
+
+    Args:
+        statement (str): Текст SQL-запиту.
+
+    Returns:
+        tuple[str, str]: Нормалізований текст запиту та його короткий хеш.
+    """
+    normalized = _WHITESPACE_RE.sub(" ", statement).strip()
+    normalized = _STRING_RE.sub("?", normalized)
+    normalized = _PLACEHOLDER_RE.sub("?", normalized)
+    normalized = _NUMBER_RE.sub("?", normalized)
+    normalized = _IN_LIST_RE.sub("(?+)", normalized)
+    digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+    return normalized, digest
+
+
+def _value_shape(value: Any) -> str:
+    if isinstance(value, (str, bytes)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def parameter_shapes(parameters: Any, executemany: bool = False) -> Any:
+    """
+    Описує форму параметрів запиту (типи та довжини) без самих значень.
+
+    Args:
+        parameters (Any): Параметри, передані драйверу бази даних.
+        executemany (bool): Чи виконувався запит як executemany.
+
+    Returns:
+        Any: Структура з назвами типів замість значень.
+    """
+    if executemany and isinstance(parameters, (list, tuple)):
+        first = parameter_shapes(parameters[0]) if parameters else None
+        return {"executemany": len(parameters), "shape": first}
+    if isinstance(parameters, dict):
+        return {key: _value_shape(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_value_shape(value) for value in parameters]
+    return _value_shape(parameters)
+
+
+def _iter_frames():
+    # Запити асинхронного рушія виконуються в окремому greenlet, тому
+    # після його стеку продовжуємо стеком батьківського greenlet
+    frame = sys._getframe(2)
+    current = greenlet.getcurrent()
+    while True:
+        while frame is not None:
+            yield frame
+            frame = frame.f_back
+        current = current.parent
+        if current is None:
+            return
+        frame = current.gr_frame
+
+
+def find_caller() -> Optional[str]:
+    """
+    Шукає в стеку викликів найближчий метод репозиторію або сервісу.
+
+    Returns:
+        Optional[str]: Рядок виду ``module:Class.method`` або None.
+    """
+    for frame in _iter_frames():
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith(_CALLER_PREFIXES):
+            return f"{module}:{frame.f_code.co_qualname}"
+    return None
+
+
+def current_route() -> Optional[str]:
+    """
+    Повертає маршрут поточного запиту у вигляді ``METHOD /path/{param}``.
+
+    Returns:
+        Optional[str]: Маршрут або None поза HTTP-запитом.
+    """
+    scope = current_scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path")
+    return f"{scope.get('method')} {path}"
+
+
+class RouteContextMiddleware:
+    """
+    ASGI middleware, що робить scope поточного запиту доступним для журналу повільних запитів.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_scope.reset(token)
+
+
+class SlowQueryLogger:
+    """
+    Журнал повільних SQL-запитів на основі подій before/after_cursor_execute.
+
+    Для кожного запиту, довшого за поріг, пише структурований запис (JSON) з відбитком
+    запиту, формою параметрів, методом репозиторію/сервісу та маршрутом. Для кожного
+    відбитка записується не більше одного повідомлення за ``log_interval`` секунд;
+    стан обмеження зберігається лише для ``max_fingerprints`` останніх відбитків, тож
+    довільний SQL без параметрів не збільшує пам'ять воркера без меж.
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float,
+        explain: bool = False,
+        log_interval: float = 60.0,
+        max_fingerprints: int = 1000,
+    ):
+        """
+        Ініціалізація SlowQueryLogger.
+
+        Args:
+            threshold_ms (float): Поріг тривалості запиту в мілісекундах.
+            explain (bool): Чи додавати план виконання (EXPLAIN) до запису.
+            log_interval (float): Мінімальний інтервал між записами для одного відбитка, с.
+            max_fingerprints (int): Скільки відбитків пам'ятати для обмеження частоти (LRU).
+        """
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.log_interval = log_interval
+        self.max_fingerprints = max_fingerprints
+        self._last_logged: OrderedDict[str, float] = OrderedDict()
+        self._suppressed: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def attach(self, engine: Engine) -> None:
+        """
+        Підключає обробники подій до синхронного рушія SQLAlchemy.
+
+        Args:
+            engine (Engine): Рушій (для AsyncEngine — ``engine.sync_engine``).
+        """
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine, "handle_error", self._handle_error)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+    def _handle_error(self, exception_context):
+        # after_cursor_execute не викликається для запиту з помилкою; прибираємо його час старту
+        conn = exception_context.connection
+        if conn is not None and exception_context.execution_context is not None:
+            starts = conn.info.get("slow_query_start")
+            if starts:
+                starts.pop()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["slow_query_start"].pop()
+        duration_ms = (time.perf_counter() - started) * 1000
+        if duration_ms < self.threshold_ms:
+            return
+
+        normalized, digest = fingerprint(statement)
+        suppressed = self._acquire(digest)
+        if suppressed is None:
+            return
+
+        record = {
+            "event": "slow_query",
+            "duration_ms": round(duration_ms, 3),
+            "threshold_ms": self.threshold_ms,
+            "fingerprint": digest,
+            "statement": normalized,
+            "parameters": parameter_shapes(parameters, executemany),
+            "caller": find_caller(),
+            "route": current_route(),
+            "suppressed": suppressed,
+        }
+        if self.explain and not executemany:
+            record.update(self._explain(conn, statement, parameters))
+        logger.warning(json.dumps(record, ensure_ascii=False, default=str), extra={"slow_query": record})
+
+    def _acquire(self, digest: str) -> Optional[int]:
+        # Повертає кількість пропущених записів або None, якщо запис треба пропустити
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_logged.get(digest)
+            if last is not None and now - last < self.log_interval:
+                self._suppressed[digest] = self._suppressed.get(digest, 0) + 1
+                return None
+            self._last_logged[digest] = now
+            self._last_logged.move_to_end(digest)
+            while len(self._last_logged) > self.max_fingerprints:
+                evicted, _ = self._last_logged.popitem(last=False)
+                self._suppressed.pop(evicted, None)
+            return self._suppressed.pop(digest, 0)
+
+    def _explain(self, conn, statement: str, parameters: Any) -> dict:
+        if not statement.lstrip().lower().startswith(_EXPLAINABLE):
+            return {}
+        dialect = conn.dialect.name
+        if dialect == "sqlite":
+            prefix = "EXPLAIN QUERY PLAN "
+        elif dialect == "postgresql":
+            prefix = "EXPLAIN (ANALYZE off) "
+        else:
+            prefix = "EXPLAIN "
+
+        cursor = conn.connection.cursor()
+        try:
+            # На Postgres помилка EXPLAIN не повинна зламати транзакцію запиту
+            if dialect == "postgresql":
+                cursor.execute("SAVEPOINT slow_query_explain")
+            try:
+                cursor.execute(prefix + statement, parameters)
+                plan = [list(row) for row in cursor.fetchall()]
+            except Exception as e:
+                if dialect == "postgresql":
+                    cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+                return {"explain_error": str(e)}
+            if dialect == "postgresql":
+                cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+            return {"plan": plan}
+        finally:
+            cursor.close()
@@ -0,0 +1,164 @@
+import re
+
+from sqlalchemy import Delete, Insert, Update, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.sql.elements import TextClause
+
+from src.conf.config import Settings, settings
+
+WRITE_STATEMENTS = (Insert, Update, Delete)
+# Текстові запити, що лише читають; решта (зокрема PRAGMA і WITH ... DELETE) йде до рушія запису
+_READ_ONLY_TEXT = re.compile(r"\s*\(*\s*(SELECT|EXPLAIN|VALUES)\b", re.IGNORECASE)
+
+
+def is_file_sqlite(url: str) -> bool:
+    """
+    Перевіряє, чи URL вказує на файлову базу SQLite (не ``:memory:``).
+
+    Args:
+        url (str): URL бази даних.
+
+    Returns:
+        bool: True для файлової бази SQLite.
+    """
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+
+def is_write(clause) -> bool:
+    """
+    Визначає, чи запит має виконуватися через рушій запису.
+
+    Окрім INSERT/UPDATE/DELETE, до запису належать текстові запити, що не
+    починаються з SELECT, EXPLAIN чи VALUES, та SELECT ... FOR UPDATE: ним сесія
+    читає рядки, які збирається змінити, тож читання й запис мають іти через одне
+    з'єднання.
+
+    Args:
+        clause: Запит, переданий у ``Session.get_bind``.
+
+    Returns:
+        bool: True для запитів, що пишуть або готують запис.
+    """
+    if isinstance(clause, WRITE_STATEMENTS):
+        return True
+    if isinstance(clause, TextClause):
+        return _READ_ONLY_TEXT.match(clause.text) is None
+    return getattr(clause, "_for_update_arg", None) is not None
+
+
+def pragmas(config: Settings = settings, read_only: bool = False) -> list[str]:
+    """
+    Формує список PRAGMA, що виконуються для кожного нового з'єднання.
+
+    Args:
+        config (Settings): Налаштування застосунку.
+        read_only (bool): Заборонити запис через з'єднання (пул читання).
+
+    Returns:
+        list[str]: Інструкції PRAGMA.
+    """
+    statements = [
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA busy_timeout={int(config.SQLITE_BUSY_TIMEOUT_MS)}",
+        # Від'ємне значення cache_size задає розмір у КіБ, а не в сторінках
+        f"PRAGMA cache_size=-{int(config.SQLITE_CACHE_SIZE_KB)}",
+        f"PRAGMA mmap_size={int(config.SQLITE_MMAP_SIZE)}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+    if read_only:
+        statements.append("PRAGMA query_only=ON")
+    return statements
+
+
+def apply_pragmas(engine: Engine, statements: list[str]) -> None:
+    """
+    Виконує PRAGMA для кожного нового з'єднання рушія.
+
+    Args:
+        engine (Engine): Рушій (для AsyncEngine — ``engine.sync_engine``).
+        statements (list[str]): Інструкції PRAGMA.
+    """
+
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    event.listen(engine, "connect", on_connect)
+
+
+def create_sqlite_engines(url: str, config: Settings = settings) -> tuple[AsyncEngine, AsyncEngine]:
+    """
+    Створює рушій запису з єдиним з'єднанням та пул з'єднань для читання.
+
+    Пул запису має розмір 1 без переповнення, тож сесії, що пишуть, чекають своєї
+    черги на з'єднання замість конкуренції за блокування файлу й помилок
+    "database is locked". У режимі WAL читання не блокуються записом. На відміну від
+    типового NullPool для aiosqlite, з'єднання (разом із застосованими PRAGMA та
+    кешем сторінок) перевикористовуються.
+
+    Args:
+        url (str): URL файлової бази SQLite.
+        config (Settings): Налаштування застосунку.
+
+    Returns:
+        tuple[AsyncEngine, AsyncEngine]: Рушій запису та рушій читання.
+    """
+    writer = create_async_engine(
+        url,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=config.SQLITE_WRITE_TIMEOUT_SECONDS,
+        query_cache_size=config.DB_QUERY_CACHE_SIZE,
+    )
+    reader = create_async_engine(
+        url,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=config.SQLITE_READ_POOL_SIZE,
+        max_overflow=config.SQLITE_READ_POOL_SIZE,
+        query_cache_size=config.DB_QUERY_CACHE_SIZE,
+    )
+    apply_pragmas(writer.sync_engine, pragmas(config))
+    apply_pragmas(reader.sync_engine, pragmas(config, read_only=True))
+    return writer, reader
+
+
+class RoutingSession(Session):
+    """
+    Сесія, що спрямовує читання до пулу читання, а запис — до рушія запису.
+
+    Після першої операції запису в транзакції всі наступні запити цієї транзакції
+    теж виконуються через рушій запису, щоб бачити власні незафіксовані зміни.
+    Читання, за яким у тій самій транзакції йде запис, має бути ``with_for_update()``:
+    тоді воно вже виконується на з'єднанні запису, і між читанням та записом
+    ніхто інший не пише.
+    """
+
+    def __init__(self, writer: Engine = None, reader: Engine = None, **kw):
+        super().__init__(**kw)
+        self.writer = writer
+        self.reader = reader
+        self._writing = False
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.writer is None:
+            return super().get_bind(mapper=mapper, clause=clause, **kw)
+        if self._writing or self._flushing or is_write(clause):
+            self._writing = True
+            return self.writer
+        return self.reader
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _reset_writer(session: RoutingSession, transaction) -> None:
+    if transaction.parent is None:
+        session._writing = False
@@ -1,12 +1,28 @@
 from typing import List, Optional
 
-from sqlalchemy import select
+from sqlalchemy import Integer, bindparam, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.models import Contact
 from src.schemas.contacts import ContactBase
 from src.database.models import User
 
+# Запити гарячих шляхів будуються один раз: конструкція запиту та ключ кешу
+# компіляції SQLAlchemy не обчислюються заново на кожен виклик. Кожен запит
+# містить ключ секціонування user_id, щоб на секціонованій таблиці planner
+# звертався лише до однієї секції
+CONTACT_BY_ID = select(Contact).where(
+    Contact.user_id == bindparam("user_id"), Contact.id == bindparam("contact_id")
+)
+# Для зміни контакту: рядок блокується до кінця транзакції (у SQLite читання йде через рушій запису)
+CONTACT_FOR_UPDATE = CONTACT_BY_ID.with_for_update()
+CONTACTS_PAGE = (
+    select(Contact)
+    .where(Contact.user_id == bindparam("user_id"))
+    .offset(bindparam("skip", type_=Integer))
+    .limit(bindparam("limit", type_=Integer))
+)
+
 
 class ContactRepository:
     """
@@ -34,68 +50,73 @@ class ContactRepository:
         Returns:
             List[Contact]: Список контактів.
         """
-        stmt = select(Contact).filter_by(user=user).offset(skip).limit(limit)
-        contacts = await self.db.execute(stmt)
+        params = {"user_id": user.id, "skip": skip, "limit": limit}
+        contacts = await self.db.execute(CONTACTS_PAGE, params)
         return contacts.scalars().all()
 
-    async def get_contact_by_id(self, contact_id: int) -> Optional[Contact]:
+    async def get_contact_by_id(self, contact_id: int, user: User) -> Optional[Contact]:
         """
-        Отримання контакту за його ідентифікатором.
+        Отримання контакту користувача за його ідентифікатором.
 
         Args:
             contact_id (int): ID контакту.
+            user (User): Власник контакту.
 
         Returns:
             Optional[Contact]: Об'єкт контакту або None, якщо контакт не знайдено.
         """
-        stmt = select(Contact).filter_by(id=contact_id)
-        contact = await self.db.execute(stmt)
+        contact = await self.db.execute(CONTACT_BY_ID, {"user_id": user.id, "contact_id": contact_id})
         return contact.scalar_one_or_none()
 
-    async def create_contact(self, body: ContactBase) -> Contact:
+    async def create_contact(self, body: ContactBase, user: User) -> Contact:
         """
         Створення нового контакту.
 
         Args:
             body (ContactBase): Дані нового контакту.
+            user (User): Власник контакту.
 
         Returns:
             Contact: Створений об'єкт контакту.
         """
-        contact = Contact(**body.model_dump(exclude_unset=True))
+        contact = Contact(**body.model_dump(exclude_unset=True), user_id=user.id)
         self.db.add(contact)
         await self.db.commit()
         await self.db.refresh(contact)
         return contact
 
-    async def remove_contact(self, contact_id: int) -> Optional[Contact]:
+    async def remove_contact(self, contact_id: int, user: User) -> Optional[Contact]:
         """
         Видалення контакту за його ID.
 
         Args:
             contact_id (int): ID контакту.
+            user (User): Власник контакту.
 
         Returns:
             Optional[Contact]: Видалений контакт або None, якщо контакт не знайдено.
         """
-        contact = await self.get_contact_by_id(contact_id)
+        result = await self.db.execute(CONTACT_FOR_UPDATE, {"user_id": user.id, "contact_id": contact_id})
+        contact = result.scalar_one_or_none()
         if contact:
             await self.db.delete(contact)
             await self.db.commit()
         return contact
 
-    async def update_contact(self, contact_id: int, body: ContactBase) -> Optional[Contact]:
+    async def update_contact(self, contact_id: int, body: ContactBase, user: User) -> Optional[Contact]:
         """
         Оновлення даних контакту.
 
         Args:
             contact_id (int): ID контакту, який потрібно оновити.
             body (ContactBase): Нові дані для оновлення.
+            user (User): Власник контакту.
 
         Returns:
             Optional[Contact]: Оновлений контакт або None, якщо контакт не знайдено.
         """
-        contact = await self.get_contact_by_id(contact_id)
+        result = await self.db.execute(CONTACT_FOR_UPDATE, {"user_id": user.id, "contact_id": contact_id})
+        contact = result.scalar_one_or_none()
         if contact:
             for key, value in body.dict(exclude_unset=True).items():
                 setattr(contact, key, value)
@@ -1,9 +1,16 @@
-from sqlalchemy import select
+from datetime import datetime
+
+from sqlalchemy import Update, bindparam, delete, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.models import User
+from src.database.models import Contact, ContactDuplicate, ContactTombstone, User
 from src.schemas.users import UserCreate
-from typing import Optional
+from typing import List, Optional
+
+# Запити гарячих шляхів (автентифікація на кожен запит) будуються один раз
+USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+USER_BY_USERNAME = select(User).where(User.username == bindparam("username"))
+USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
 
 
 class UserRepository:
@@ -30,8 +37,7 @@ class UserRepository:
         Returns:
             Optional[User]: Об'єкт користувача або None, якщо користувача не знайдено.
         """
-        stmt = select(User).filter_by(id=user_id)
-        user = await self.db.execute(stmt)
+        user = await self.db.execute(USER_BY_ID, {"user_id": user_id})
         return user.scalar_one_or_none()
 
     async def get_user_by_username(self, username: str) -> Optional[User]:
@@ -44,8 +50,7 @@ class UserRepository:
         Returns:
             Optional[User]: Об'єкт користувача або None, якщо користувача не знайдено.
         """
-        stmt = select(User).filter_by(username=username)
-        user = await self.db.execute(stmt)
+        user = await self.db.execute(USER_BY_USERNAME, {"username": username})
         return user.scalar_one_or_none()
 
     async def get_user_by_email(self, email: str) -> Optional[User]:
@@ -58,22 +63,23 @@ class UserRepository:
         Returns:
             Optional[User]: Об'єкт користувача або None, якщо користувача не знайдено.
         """
-        stmt = select(User).filter_by(email=email)
-        user = await self.db.execute(stmt)
+        user = await self.db.execute(USER_BY_EMAIL, {"email": email})
         return user.scalar_one_or_none()
 
-    async def create_user(self, body: UserCreate, avatar: Optional[str] = None) -> User:
+    async def create_user(self, body: UserCreate, avatar: Optional[str] = None, user_id: Optional[int] = None) -> User:
         """
         Створення нового користувача.
 
         Args:
             body (UserCreate): Дані нового користувача.
             avatar (Optional[str]): URL аватару користувача (необов'язковий параметр).
+            user_id (Optional[int]): Ідентифікатор, виданий довідником шардування; None — автоінкремент.
 
         Returns:
             User: Створений об'єкт користувача.
         """
         user = User(
+            id=user_id,
             **body.model_dump(exclude_unset=True, exclude={"password"}),
             hashed_password=body.password,
             avatar=avatar
@@ -111,3 +117,83 @@ class UserRepository:
         self.db.add(user)
         await self.db.commit()
         await self.db.refresh(user)
+
+    async def get_stale_unconfirmed_ids(self, created_before: datetime, limit: int) -> List[int]:
+        """
+        Отримання ідентифікаторів непідтверджених користувачів, створених до вказаного часу.
+
+        У Postgres рядки, заблоковані іншим процесом очищення, пропускаються.
+
+        Args:
+            created_before (datetime): Межа часу створення.
+            limit (int): Максимальна кількість ідентифікаторів.
+
+        Returns:
+            List[int]: Ідентифікатори користувачів у порядку зростання.
+        """
+        stmt = (
+            select(User.id)
+            .where(User.confirmed.is_(False), User.created_at < created_before)
+            .order_by(User.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.db.execute(stmt)
+        return list(result.scalars().all())
+
+    async def delete_unconfirmed_users(self, user_ids: List[int]) -> tuple[int, int]:
+        """
+        Видалення непідтверджених користувачів разом з їхніми контактами.
+
+        Контакти видаляються одним запитом за індексом ``(user_id, change_seq)`` без завантаження
+        об'єктів у сесію. Користувачі, що встигли підтвердити email, не видаляються.
+        Зміни не фіксуються — це робить викликаюча сторона.
+
+        Args:
+            user_ids (List[int]): Ідентифікатори користувачів.
+
+        Returns:
+            tuple[int, int]: Кількість видалених користувачів і контактів.
+        """
+        stale = select(User.id).where(User.id.in_(user_ids), User.confirmed.is_(False))
+        await self.db.execute(
+            delete(ContactDuplicate).where(ContactDuplicate.user_id.in_(stale))
+            .execution_options(synchronize_session=False)
+        )
+        contacts = await self.db.execute(
+            delete(Contact).where(Contact.user_id.in_(stale)).execution_options(synchronize_session=False)
+        )
+        await self.db.execute(
+            delete(ContactTombstone).where(ContactTombstone.user_id.in_(stale))
+            .execution_options(synchronize_session=False)
+        )
+        users = await self.db.execute(
+            delete(User).where(User.id.in_(user_ids), User.confirmed.is_(False))
+            .execution_options(synchronize_session=False)
+        )
+        return users.rowcount, contacts.rowcount
+
+
+def recount_contacts(user_ids: Optional[List[int]] = None) -> Update:
+    """
+    Запит, що перераховує лічильники контактів і номер останньої зміни користувачів
+    з таблиці contacts.
+
+    Потрібен після масового завантаження контактів в обхід сервісу.
+
+    Args:
+        user_ids (Optional[List[int]]): Користувачі для перерахунку; None — усі.
+
+    Returns:
+        Update: Запит UPDATE для виконання.
+    """
+    count = select(func.count(Contact.id)).where(Contact.user_id == User.id).scalar_subquery()
+    last_seq = (
+        select(func.coalesce(func.max(Contact.change_seq), 0))
+        .where(Contact.user_id == User.id)
+        .scalar_subquery()
+    )
+    stmt = update(User).values(contacts_count=count, change_seq=last_seq)
+    if user_ids is not None:
+        stmt = stmt.where(User.id.in_(user_ids))
+    return stmt
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import date, datetime
-from typing import Optional
+from typing import List, Optional
 
 class ContactBase(BaseModel):
     """
@@ -48,3 +48,90 @@ class ContactResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class ContactSuggestion(BaseModel):
+    """
+    Схема підказки автодоповнення.
+
+    Атрибути:
+        id (int): Унікальний ідентифікатор контакту.
+        name (str): Ім'я та прізвище контакту.
+        email (str): Email-адреса контакту.
+    """
+
+    id: int
+    name: str
+    email: str
+
+
+class ContactChanges(BaseModel):
+    """
+    Схема відповіді дельта-синхронізації.
+
+    Атрибути:
+        changes (List[ContactResponse]): Створені або змінені контакти в порядку змін.
+        deleted (List[int]): Ідентифікатори видалених контактів.
+        next_token (str): Токен для наступного запиту змін.
+        has_more (bool): Чи є ще зміни після цієї сторінки.
+    """
+
+    changes: List[ContactResponse]
+    deleted: List[int]
+    next_token: str
+    has_more: bool
+
+
+class DuplicateSuggestion(BaseModel):
+    """
+    Схема пари ймовірних дублікатів.
+
+    Атрибути:
+        contact (ContactResponse): Контакт з меншим ідентифікатором.
+        duplicate (ContactResponse): Ймовірний дублікат.
+        score (float): Оцінка схожості від 0 до 1.
+        reasons (List[str]): Ознаки збігу: email, phone, name.
+    """
+
+    contact: ContactResponse
+    duplicate: ContactResponse
+    score: float
+    reasons: List[str]
+
+
+class ContactMerge(BaseModel):
+    """
+    Схема запиту на злиття контактів.
+
+    Атрибути:
+        duplicate_ids (List[int]): Контакти, що зливаються в основний і видаляються.
+    """
+
+    duplicate_ids: List[int] = Field(min_length=1, max_length=100)
+
+
+
+class PhoneLookup(BaseModel):
+    """
+    Схема запиту пакетного пошуку контактів за телефонами.
+
+    Атрибути:
+        phones (List[str]): Телефони у довільному форматі.
+    """
+
+    phones: List[str] = Field(min_length=1, max_length=1000)
+
+
+class PhoneMatch(BaseModel):
+    """
+    Схема результату пошуку за одним телефоном.
+
+    Атрибути:
+        phone (str): Телефон із запиту.
+        e164 (Optional[str]): Нормалізований номер або None, якщо номер некоректний.
+        contacts (List[ContactResponse]): Контакти користувача з цим номером.
+    """
+
+    phone: str
+    e164: Optional[str]
+    contacts: List[ContactResponse]
@@ -2,10 +2,8 @@ from datetime import datetime, timedelta, UTC
 from typing import Optional
 
 from fastapi import Depends, HTTPException, status
-from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from jose import JWTError, jwt
 
 from src.database.db import get_db
 from src.conf.config import settings
@@ -13,7 +11,18 @@ from src.services.users import UserService
 import json
 
 
+class _LazyCryptContext:
+    """
+    Дескриптор, що створює CryptContext (та імпортує passlib) лише при першому зверненні.
+    """
 
+    def __get__(self, instance, owner):
+        from passlib.context import CryptContext
+
+        context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        # Замінюємо дескриптор на готовий контекст, наступні звернення — звичайний атрибут
+        owner.pwd_context = context
+        return context
 
 
 class Hash:
@@ -22,7 +31,7 @@ class Hash:
     Використовує bcrypt для безпечного збереження паролів.
     """
 
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    pwd_context = _LazyCryptContext()
 
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """
@@ -64,6 +73,8 @@ async def create_access_token(data: dict, expires_delta: Optional[int] = None) -
     Returns:
         str: Згенерований JWT токен.
     """
+    from jose import jwt
+
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.now(UTC) + timedelta(seconds=expires_delta)
@@ -92,6 +103,8 @@ async def get_current_user(
     Raises:
         HTTPException: Якщо токен недійсний або користувача не знайдено.
     """
+    from jose import JWTError, jwt
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -126,6 +139,8 @@ def create_email_token(data: dict) -> str:
     Returns:
         str: JWT токен для підтвердження email.
     """
+    from jose import jwt
+
     to_encode = data.copy()
     expire = datetime.now(UTC) + timedelta(days=7)
     to_encode.update({"iat": datetime.now(UTC), "exp": expire})
@@ -146,6 +161,8 @@ async def get_email_from_token(token: str) -> str:
     Raises:
         HTTPException: Якщо токен недійсний або прострочений.
     """
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(
             token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]
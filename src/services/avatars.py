@@ -0,0 +1,374 @@
+"""
+Завантаження аватарів користувачів.
+
+Тіло multipart-запиту читається потоком і пишеться у тимчасовий файл без
+буферизації в пам'яті; розмір обмежує ``AVATAR_MAX_BYTES``, тип визначається за
+сигнатурою вмісту (JPEG, PNG, GIF, WebP), а не за заголовком клієнта. Мініатюри
+``AVATAR_THUMBNAIL_SIZES`` генеруються в пулі процесів (``AVATAR_WORKERS``), тож
+event loop не виконує роботи із зображеннями. Без встановленого Pillow
+зберігається сам файл. Файли зберігає ``AvatarStorage``; типова реалізація —
+локальний каталог ``AVATAR_DIR``, що роздається за ``AVATAR_URL_PREFIX``.
+"""
+import asyncio
+import multiprocessing
+import os
+import shutil
+import tempfile
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Optional
+
+from python_multipart.multipart import MultipartParseError, MultipartParser, parse_options_header
+
+from src.conf.config import settings
+from src.services.thumbnails import make_thumbnails
+
+_SIGNATURES = (
+    (b"\xff\xd8\xff", "jpg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+)
+# Скільки перших байтів файлу потрібно для визначення типу (RIFF....WEBP)
+_HEAD_BYTES = 12
+# Заголовки частин і межі multipart понад сам файл
+MULTIPART_OVERHEAD = 16 * 1024
+
+
+class AvatarError(ValueError):
+    """
+    Завантажений аватар не може бути прийнятий.
+    """
+
+
+class AvatarMissing(AvatarError):
+    """
+    У запиті немає файлу аватара або тіло не є коректним multipart.
+    """
+
+
+class AvatarTooLarge(AvatarError):
+    """
+    Файл більший за ``AVATAR_MAX_BYTES``.
+    """
+
+
+class AvatarTypeNotAllowed(AvatarError):
+    """
+    Вміст файлу не є зображенням дозволеного типу.
+    """
+
+
+class InvalidAvatar(AvatarError):
+    """
+    Файл має сигнатуру зображення, але не читається.
+    """
+
+
+def detect_image_type(head: bytes) -> Optional[str]:
+    """
+    Визначає тип зображення за першими байтами файлу.
+
+    Args:
+        head (bytes): Щонайменше 12 перших байтів файлу.
+
+    Returns:
+        Optional[str]: Розширення ("jpg", "png", "gif", "webp") або None.
+    """
+    for signature, extension in _SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+class _UploadParser:
+    """
+    Потоковий розбір multipart, що віддає лише дані першого файлу в заданому полі.
+    """
+
+    def __init__(self, boundary: bytes, field: str):
+        self.field = field.encode()
+        self.found = False
+        self._in_field = False
+        self._headers: dict[bytes, bytes] = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._pending: list[bytes] = []
+        self.parser = MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition"))
+        self._in_field = not self.found and options.get(b"name") == self.field and b"filename" in options
+        self.found = self.found or self._in_field
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_field:
+            self._pending.append(data[start:end])
+
+    def _on_part_end(self) -> None:
+        self._in_field = False
+
+    def feed(self, chunk: bytes) -> bytes:
+        """
+        Розбирає наступний шматок тіла.
+
+        Returns:
+            bytes: Дані файлу з цього шматка (можливо, порожні).
+        """
+        self.parser.write(chunk)
+        data = b"".join(self._pending)
+        self._pending.clear()
+        return data
+
+
+async def receive_upload(
+    request,
+    field: str = "file",
+    max_bytes: int = settings.AVATAR_MAX_BYTES,
+    directory: Optional[Path] = None,
+) -> tuple[Path, str]:
+    """
+    Потоком записує файл із multipart-тіла запиту у тимчасовий файл.
+
+    Запит із завеликим ``Content-Length`` відхиляється до читання тіла, інакше
+    читання зупиняється, щойно файл перевищить ліміт або його перші байти не
+    відповідають дозволеному типу. Запис на диск виконується в потоці.
+
+    Args:
+        request (Request): Вхідний запит; використовуються ``headers`` і ``stream()``.
+        field (str): Назва поля форми з файлом.
+        max_bytes (int): Максимальний розмір файлу, байтів.
+        directory (Optional[Path]): Каталог для тимчасового файлу; None — системний.
+
+    Returns:
+        tuple[Path, str]: Шлях до тимчасового файлу та розширення за типом вмісту.
+
+    Raises:
+        AvatarMissing: Якщо тіло не multipart або в ньому немає файлу в полі ``field``.
+        AvatarTooLarge: Якщо файл або тіло запиту завеликі.
+        AvatarTypeNotAllowed: Якщо вміст не є зображенням дозволеного типу.
+    """
+    content_type, options = parse_options_header(request.headers.get("content-type"))
+    boundary = options.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise AvatarMissing("Expected a multipart/form-data body")
+    limit = max_bytes + MULTIPART_OVERHEAD
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > limit:
+        raise AvatarTooLarge("Request body is too large")
+
+    upload = _UploadParser(boundary, field)
+    fd, name = tempfile.mkstemp(prefix="avatar-", dir=directory)
+    path = Path(name)
+    received = size = 0
+    head = b""
+    try:
+        with os.fdopen(fd, "wb") as file:
+            async for chunk in request.stream():
+                received += len(chunk)
+                if received > limit:
+                    raise AvatarTooLarge("Request body is too large")
+                data = upload.feed(chunk)
+                if not data:
+                    continue
+                size += len(data)
+                if size > max_bytes:
+                    raise AvatarTooLarge("Avatar file is too large")
+                if len(head) < _HEAD_BYTES:
+                    head += data[:_HEAD_BYTES - len(head)]
+                    if len(head) == _HEAD_BYTES and detect_image_type(head) is None:
+                        raise AvatarTypeNotAllowed("Unsupported image type")
+                await asyncio.to_thread(file.write, data)
+            upload.parser.finalize()
+        if not upload.found:
+            raise AvatarMissing(f"No file in field {field!r}")
+        extension = detect_image_type(head)
+        if extension is None:
+            raise AvatarTypeNotAllowed("Unsupported image type")
+    except MultipartParseError as e:
+        path.unlink(missing_ok=True)
+        raise AvatarMissing("Malformed multipart body") from e
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return path, extension
+
+
+class AvatarStorage(ABC):
+    """
+    Сховище файлів аватарів.
+
+    Для іншого сховища (S3, CDN) достатньо реалізувати ``save`` і ``delete``.
+    """
+
+    @abstractmethod
+    async def save(self, name: str, source: Path) -> str:
+        """
+        Переносить файл у сховище.
+
+        Args:
+            name (str): Відносна назва файлу в сховищі ("<user_id>/256.jpg").
+            source (Path): Локальний файл; після збереження його може не бути.
+
+        Returns:
+            str: Публічний URL файлу.
+        """
+
+    @abstractmethod
+    async def delete(self, prefix: str) -> None:
+        """
+        Видаляє всі файли в сховищі з назвами ``<prefix>/...``.
+
+        Args:
+            prefix (str): Каталог файлів у сховищі ("<user_id>").
+        """
+
+
+class LocalAvatarStorage(AvatarStorage):
+    """
+    Сховище аватарів у локальному каталозі, що роздається застосунком як статичні файли.
+    """
+
+    def __init__(self, root: Path, url_prefix: str):
+        """
+        Ініціалізація LocalAvatarStorage.
+
+        Args:
+            root (Path): Каталог файлів.
+            url_prefix (str): Префікс URL, за яким роздається каталог.
+        """
+        self.root = Path(root)
+        self.url_prefix = url_prefix.rstrip("/")
+
+    @staticmethod
+    def _move(source: Path, target: Path) -> None:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # У межах файлової системи — атомарне перейменування поверх старого файлу
+        shutil.move(source, target)
+
+    async def save(self, name: str, source: Path) -> str:
+        await asyncio.to_thread(self._move, source, self.root / name)
+        return f"{self.url_prefix}/{name}"
+
+    async def delete(self, prefix: str) -> None:
+        await asyncio.to_thread(shutil.rmtree, self.root / prefix, True)
+
+
+avatar_storage = LocalAvatarStorage(settings.AVATAR_DIR, settings.AVATAR_URL_PREFIX)
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def thumbnail_pool() -> ProcessPoolExecutor:
+    """
+    Пул процесів для мініатюр, що створюється при першому завантаженні аватара.
+
+    Returns:
+        ProcessPoolExecutor: Пул із ``AVATAR_WORKERS`` процесів.
+    """
+    global _pool
+    if _pool is None:
+        # spawn: процеси пулу не успадковують потоки, з'єднання й пули застосунку
+        _pool = ProcessPoolExecutor(settings.AVATAR_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def shutdown_thumbnail_pool() -> None:
+    """
+    Зупиняє пул процесів мініатюр, якщо його було створено.
+    """
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _pillow_available() -> bool:
+    return find_spec("PIL") is not None
+
+
+async def store_avatar(
+    user_id: int,
+    upload: Path,
+    extension: str,
+    storage: AvatarStorage = avatar_storage,
+    sizes: list[int] = settings.AVATAR_THUMBNAIL_SIZES,
+) -> str:
+    """
+    Генерує мініатюри завантаженого зображення й зберігає їх у сховищі.
+
+    Тимчасовий файл видаляється в будь-якому разі. Файли користувача мають сталі
+    назви й перезаписуються, а URL містить версію, щоб клієнти не брали старий
+    аватар з кешу.
+
+    Args:
+        user_id (int): Ідентифікатор користувача.
+        upload (Path): Тимчасовий файл з ``receive_upload``.
+        extension (str): Розширення за типом вмісту.
+        storage (AvatarStorage): Сховище файлів.
+        sizes (list[int]): Сторони мініатюр; порожній список — зберегти сам файл.
+
+    Returns:
+        str: URL аватара (найбільшої мініатюри).
+
+    Raises:
+        InvalidAvatar: Якщо зображення не читається.
+    """
+    version = uuid.uuid4().hex[:8]
+    try:
+        if not sizes or not _pillow_available():
+            # Тип уже перевірено за сигнатурою; без Pillow зберігаємо файл як є
+            url = await storage.save(f"{user_id}/avatar.{extension}", upload)
+            return f"{url}?v={version}"
+        workdir = Path(await asyncio.to_thread(tempfile.mkdtemp, prefix="avatar-thumbnails-"))
+        try:
+            loop = asyncio.get_running_loop()
+            try:
+                paths = await loop.run_in_executor(
+                    thumbnail_pool(), make_thumbnails, str(upload), str(workdir), list(sizes)
+                )
+            except ValueError as e:
+                raise InvalidAvatar(str(e)) from e
+            urls = [await storage.save(f"{user_id}/{Path(path).name}", Path(path)) for path in paths]
+        finally:
+            await asyncio.to_thread(shutil.rmtree, workdir, True)
+        return f"{urls[0]}?v={version}"
+    finally:
+        await asyncio.to_thread(upload.unlink, True)
+
+
+async def delete_avatar(user_id: int, storage: AvatarStorage = avatar_storage) -> None:
+    """
+    Видаляє збережені файли аватара користувача.
+
+    Args:
+        user_id (int): Ідентифікатор користувача.
+        storage (AvatarStorage): Сховище файлів.
+    """
+    await storage.delete(str(user_id))
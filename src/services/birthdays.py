@@ -0,0 +1,414 @@
+"""
+Найближчі дні народження: кеш вікна для запитів користувачів і щоденний дайджест.
+
+Кеш тримає для кожного користувача відсортований за MMDD масив контактів, тож
+запит на ``days`` днів — це два bisect і зріз (або два зрізи, якщо вікно
+переходить через Новий рік). Масив не залежить від поточної дати: зі зміною дати
+зсувається лише вікно, а перебудова не потрібна.
+
+Для дайджесту замість запиту на кожного користувача дні народження всіх користувачів
+вибираються одним запитом за індексом ``(birthday_md, user_id)``, упорядкованим
+за власником, і читаються частинами за ключем ``(user_id, id)``: кожна частина —
+окрема коротка транзакція. Рядки одного власника збираються в один дайджест,
+дайджести надсилаються пакетами з обмеженням швидкості.
+
+Запуск з командного рядка (наприклад, з cron)::
+
+    python -m src.services.maintenance birthday-digest --days 7
+"""
+import calendar
+import json
+import logging
+import time
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import asdict, dataclass, field
+from datetime import date, timedelta
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Optional
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.conf.config import settings
+from src.database.db import DatabaseSessionManager, sessionmanager
+from src.database.models import Contact, User, month_day
+from src.schemas.contacts import ContactResponse
+from src.services.search import UserIndexCache
+
+logger = logging.getLogger("src.services.birthdays")
+
+
+@dataclass
+class BirthdayDigest:
+    """
+    Дайджест одного користувача.
+    """
+
+    user_id: int
+    username: str
+    email: str
+    days: int
+    contacts: list[dict] = field(default_factory=list)
+
+
+@dataclass
+class DigestReport:
+    """
+    Підсумок запуску розсилки дайджестів.
+    """
+
+    users: int = 0
+    contacts: int = 0
+    sent: int = 0
+    failed: int = 0
+    chunks: int = 0
+    query_seconds: float = 0.0
+    send_seconds: float = 0.0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def users_per_second(self) -> float:
+        return round(self.users / self.elapsed_seconds, 1) if self.elapsed_seconds else 0.0
+
+
+def birthday_window(start: date, days: int) -> dict[int, int]:
+    """
+    Значення MMDD днів періоду та кількість днів до кожного з них.
+
+    Період може переходити через Новий рік. У невисокосний рік контакти,
+    народжені 29 лютого, потрапляють на 28 лютого.
+
+    Args:
+        start (date): Перший день періоду.
+        days (int): Кількість днів після ``start`` (включно з останнім днем).
+
+    Returns:
+        dict[int, int]: MMDD -> днів до дня народження.
+    """
+    window: dict[int, int] = {}
+    for offset in range(min(days, 365) + 1):
+        day = start + timedelta(days=offset)
+        window.setdefault(month_day(day), offset)
+        if (day.month, day.day) == (2, 28) and not calendar.isleap(day.year):
+            window.setdefault(229, offset)
+    return window
+
+
+def window_bounds(start: date, days: int) -> Optional[tuple[int, int]]:
+    """
+    Межі вікна днів народження у значеннях MMDD.
+
+    Args:
+        start (date): Перший день вікна.
+        days (int): Кількість днів після ``start`` (включно з останнім днем).
+
+    Returns:
+        Optional[tuple[int, int]]: Перше та останнє MMDD; якщо перше більше за
+        останнє, вікно переходить через Новий рік. None — вікно охоплює весь рік.
+    """
+    if days >= 365:
+        return None
+    end = start + timedelta(days=days)
+    end_md = month_day(end)
+    # У невисокосний рік день народження 29 лютого святкують 28 лютого
+    if end_md == 228 and not calendar.isleap(end.year):
+        end_md = 229
+    return month_day(start), end_md
+
+
+class BirthdayIndex:
+    """
+    Контакти одного користувача, відсортовані за днем народження без року.
+    """
+
+    def __init__(self):
+        self._keys: list[tuple[int, int]] = []
+        self._docs: dict[int, tuple[int, ContactResponse]] = {}
+        self.built_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, contact_id: int, md: Optional[int], contact: ContactResponse) -> None:
+        """
+        Додає або оновлює контакт.
+
+        Якщо день народження не змінився, оновлюються лише дані контакту, а
+        позиція в масиві залишається.
+
+        Args:
+            contact_id (int): Ідентифікатор контакту.
+            md (Optional[int]): День народження у вигляді MMDD.
+            contact (ContactResponse): Дані контакту для відповіді.
+        """
+        current = self._docs.get(contact_id)
+        if current is not None and current[0] == md:
+            self._docs[contact_id] = (md, contact)
+            return
+        self.remove(contact_id)
+        if md is None:
+            return
+        self._docs[contact_id] = (md, contact)
+        insort(self._keys, (md, contact_id))
+
+    def extend(self, rows: Iterable) -> None:
+        """
+        Додає багато контактів з одним сортуванням.
+
+        Args:
+            rows (Iterable): Рядки з колонками ``BirthdayCache.columns``.
+        """
+        for row in rows:
+            if row.birthday_md is None:
+                continue
+            self._docs[row.id] = (row.birthday_md, ContactResponse.from_orm(row))
+            self._keys.append((row.birthday_md, row.id))
+        self._keys.sort()
+
+    def remove(self, contact_id: int) -> None:
+        """
+        Видаляє контакт з індексу, якщо він є.
+
+        Args:
+            contact_id (int): Ідентифікатор контакту.
+        """
+        doc = self._docs.pop(contact_id, None)
+        if doc is None:
+            return
+        position = bisect_left(self._keys, (doc[0], contact_id))
+        if position < len(self._keys) and self._keys[position] == (doc[0], contact_id):
+            del self._keys[position]
+
+    def window(self, start: date, days: int, limit: Optional[int] = None) -> list[ContactResponse]:
+        """
+        Контакти з днями народження від ``start`` до ``start + days`` у порядку настання.
+
+        Args:
+            start (date): Перший день вікна.
+            days (int): Довжина вікна, днів.
+            limit (Optional[int]): Максимальна кількість контактів.
+
+        Returns:
+            list[ContactResponse]: Контакти.
+        """
+        keys = self._keys
+        bounds = window_bounds(start, days)
+        if bounds is None:
+            lo = hi = bisect_left(keys, (month_day(start),))
+            wraps = True
+        else:
+            lo = bisect_left(keys, (bounds[0],))
+            hi = bisect_right(keys, (bounds[1], float("inf")))
+            wraps = bounds[0] > bounds[1]
+        limit = len(keys) if limit is None else limit
+        if wraps:
+            selected = keys[lo:lo + limit]
+            selected += keys[:min(hi, limit - len(selected))]
+        else:
+            selected = keys[lo:min(hi, lo + limit)]
+        return [self._docs[contact_id][1] for _, contact_id in selected]
+
+
+class BirthdayCache(UserIndexCache):
+    """
+    Реєстр індексів днів народження за користувачами (LRU з TTL).
+    """
+
+    columns = (
+        Contact.id,
+        Contact.birthday_md,
+        Contact.first_name,
+        Contact.last_name,
+        Contact.email,
+        Contact.phone_number,
+        Contact.created_at,
+    )
+
+    @staticmethod
+    def build(rows: Iterable) -> BirthdayIndex:
+        index = BirthdayIndex()
+        index.extend(rows)
+        return index
+
+    @staticmethod
+    def add(index: BirthdayIndex, contact: Contact) -> None:
+        index.add(contact.id, contact.birthday_md, ContactResponse.from_orm(contact))
+
+    async def upcoming(
+        self, db: AsyncSession, user_id: int, start: date, days: int, limit: Optional[int] = None
+    ) -> list[ContactResponse]:
+        """
+        Найближчі дні народження контактів користувача.
+
+        Args:
+            db (AsyncSession): Сесія бази даних (для першої побудови індексу).
+            user_id (int): Ідентифікатор користувача.
+            start (date): Перший день вікна.
+            days (int): Довжина вікна, днів.
+            limit (Optional[int]): Максимальна кількість контактів.
+
+        Returns:
+            list[ContactResponse]: Контакти в порядку настання днів народження.
+        """
+        index = await self.get(db, user_id)
+        return index.window(start, days, limit)
+
+
+birthday_cache = BirthdayCache(
+    max_users=settings.BIRTHDAY_CACHE_MAX_USERS, ttl=settings.BIRTHDAY_CACHE_TTL_SECONDS
+)
+
+
+def _chunk_query(window: dict[int, int], after: tuple[int, int], limit: int):
+    return (
+        select(
+            Contact.user_id,
+            Contact.id,
+            Contact.first_name,
+            Contact.last_name,
+            Contact.email,
+            Contact.birthday_md,
+            User.username,
+            User.email.label("user_email"),
+        )
+        .join(User, User.id == Contact.user_id)
+        .where(
+            Contact.birthday_md.in_(list(window)),
+            User.confirmed.is_(True),
+            tuple_(Contact.user_id, Contact.id) > tuple_(*after),
+        )
+        .order_by(Contact.user_id, Contact.id)
+        .limit(limit)
+    )
+
+
+async def iter_digests(
+    start: date,
+    days: int,
+    chunk_size: int = settings.BIRTHDAY_DIGEST_CHUNK_SIZE,
+    manager: DatabaseSessionManager = sessionmanager,
+    report: Optional[DigestReport] = None,
+) -> AsyncIterator[BirthdayDigest]:
+    """
+    Дайджести всіх користувачів, у контактів яких є дні народження в періоді.
+
+    Args:
+        start (date): Перший день періоду.
+        days (int): Довжина періоду, днів.
+        chunk_size (int): Кількість рядків в одній частині запиту.
+        manager (DatabaseSessionManager): Менеджер сесій бази даних.
+        report (Optional[DigestReport]): Звіт, у якому накопичується час запитів.
+
+    Yields:
+        BirthdayDigest: Дайджест користувача з контактами за зростанням днів до свята.
+    """
+    window = birthday_window(start, days)
+    after = (0, 0)
+    current: Optional[BirthdayDigest] = None
+    while True:
+        started = time.perf_counter()
+        async with manager.session() as db:
+            rows = (await db.execute(_chunk_query(window, after, chunk_size))).all()
+        if report is not None:
+            report.query_seconds += time.perf_counter() - started
+            report.chunks += 1
+        for row in rows:
+            if current is None or current.user_id != row.user_id:
+                if current is not None:
+                    yield _finish(current)
+                current = BirthdayDigest(row.user_id, row.username, row.user_email, days)
+            days_left = window[row.birthday_md]
+            current.contacts.append({
+                "first_name": row.first_name,
+                "last_name": row.last_name,
+                "email": row.email,
+                "date": (start + timedelta(days=days_left)).isoformat(),
+                "days_left": days_left,
+            })
+        if len(rows) < chunk_size:
+            break
+        after = (rows[-1].user_id, rows[-1].id)
+    if current is not None:
+        yield _finish(current)
+
+
+def _finish(digest: BirthdayDigest) -> BirthdayDigest:
+    digest.contacts.sort(key=lambda item: (item["days_left"], item["last_name"], item["first_name"]))
+    return digest
+
+
+async def send_digest_batch(digests: list[BirthdayDigest]) -> tuple[int, int]:
+    """
+    Надсилає пакет дайджестів поштою з обмеженням швидкості.
+
+    Args:
+        digests (list[BirthdayDigest]): Дайджести.
+
+    Returns:
+        tuple[int, int]: Кількість надісланих листів і помилок.
+    """
+    from src.services.email import birthday_digest_message, send_messages
+
+    messages = (
+        birthday_digest_message(digest.email, digest.username, digest.contacts, digest.days)
+        for digest in digests
+    )
+    return await send_messages(
+        messages,
+        "birthday_digest.html",
+        concurrency=settings.BIRTHDAY_DIGEST_CONCURRENCY,
+        rate_per_second=settings.BIRTHDAY_DIGEST_RATE_PER_SECOND,
+    )
+
+
+async def send_birthday_digests(
+    start: Optional[date] = None,
+    days: int = settings.BIRTHDAY_DIGEST_DAYS,
+    chunk_size: int = settings.BIRTHDAY_DIGEST_CHUNK_SIZE,
+    batch_size: int = settings.BIRTHDAY_DIGEST_BATCH_SIZE,
+    send: Callable[[list[BirthdayDigest]], Awaitable[tuple[int, int]]] = send_digest_batch,
+    manager: DatabaseSessionManager = sessionmanager,
+) -> DigestReport:
+    """
+    Формує та надсилає дайджести днів народження всім користувачам за один прохід.
+
+    Args:
+        start (Optional[date]): Перший день періоду; за замовчуванням сьогодні.
+        days (int): Довжина періоду, днів.
+        chunk_size (int): Кількість рядків в одній частині запиту.
+        batch_size (int): Кількість дайджестів у пакеті надсилання.
+        send (Callable): Функція, що надсилає пакет і повертає (надіслано, помилок).
+        manager (DatabaseSessionManager): Менеджер сесій бази даних.
+
+    Returns:
+        DigestReport: Кількість користувачів, контактів, листів і тривалість етапів.
+    """
+    start = start or date.today()
+    report = DigestReport()
+    started = time.perf_counter()
+    batch: list[BirthdayDigest] = []
+
+    async def flush() -> None:
+        if not batch:
+            return
+        send_started = time.perf_counter()
+        sent, failed = await send(batch)
+        report.send_seconds += time.perf_counter() - send_started
+        report.sent += sent
+        report.failed += failed
+        batch.clear()
+
+    async for digest in iter_digests(start, days, chunk_size, manager, report):
+        report.users += 1
+        report.contacts += len(digest.contacts)
+        batch.append(digest)
+        if len(batch) >= batch_size:
+            await flush()
+    await flush()
+
+    report.query_seconds = round(report.query_seconds, 3)
+    report.send_seconds = round(report.send_seconds, 3)
+    report.elapsed_seconds = round(time.perf_counter() - started, 3)
+    logger.info(
+        "Birthday digests: %s", json.dumps({**asdict(report), "users_per_second": report.users_per_second})
+    )
+    return report
@@ -1,11 +1,24 @@
+from sqlalchemy import delete, func, literal_column, or_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from datetime import date, timedelta
-from src.database.models import Contact
-from src.schemas.contacts import ContactBase, ContactResponse
+import time
+from datetime import date
+from src.conf.config import settings
+from src.database.db import release_session
+from src.database.models import Contact, ContactDuplicate, ContactTombstone
+from src.database.phones import to_e164
+from src.repository.contacts import CONTACT_BY_ID, CONTACT_FOR_UPDATE, CONTACTS_PAGE
+from src.schemas.contacts import ContactBase, ContactChanges, ContactResponse, ContactSuggestion, PhoneMatch
 from src.database.models import User
+from src.services.birthdays import birthday_cache, birthday_window
+from src.services.events import contact_events
+from src.services.sync import SyncToken, encode_sync_token
+from src.services.search import contact_prefixes, contact_search, index_contact, unindex_contact
 from typing import List, Optional
 
+# Вираз має збігатися з виразом GIN-індексу ix_contacts_full_name_trgm
+FULL_NAME = Contact.first_name.op("||")(literal_column("' '")).op("||")(Contact.last_name)
+
 
 class ContactService:
     """
@@ -21,6 +34,37 @@ class ContactService:
         """
         self.db = db
 
+    async def _release(self, value):
+        # Результат уже перетворено на схеми, тож з'єднання можна повернути до пулу,
+        # не чекаючи завершення обробки запиту
+        await release_session(self.db)
+        return value
+
+    def _search_query(
+        self,
+        user: Optional[User],
+        first_name: Optional[str],
+        last_name: Optional[str],
+        email: Optional[str],
+        q: Optional[str],
+    ):
+        query = select(Contact)
+        if user is not None:
+            query = query.where(Contact.user_id == user.id)
+
+        if q:
+            query = query.where(
+                or_(Contact.first_name.ilike(f"%{q}%"), Contact.last_name.ilike(f"%{q}%"))
+            )
+
+        if first_name:
+            query = query.where(Contact.first_name.ilike(f"%{first_name}%"))
+        if last_name:
+            query = query.where(Contact.last_name.ilike(f"%{last_name}%"))
+        if email:
+            query = query.where(Contact.email.ilike(f"%{email}%"))
+        return query
+
     async def search_contacts(
         self,
         first_name: Optional[str],
@@ -28,6 +72,8 @@ class ContactService:
         email: Optional[str],
         skip: int = 0,
         limit: int = 100,
+        q: Optional[str] = None,
+        user: Optional[User] = None,
     ) -> List[ContactResponse]:
         """
         Пошук контактів за ім'ям, прізвищем або email.
@@ -38,40 +84,314 @@ class ContactService:
             email (Optional[str]): Email контакту для пошуку (частковий збіг).
             skip (int, optional): Кількість пропущених записів. За замовчуванням 0.
             limit (int, optional): Максимальна кількість контактів у відповіді. За замовчуванням 100.
+            q (Optional[str]): Частковий збіг з ім'ям або прізвищем.
+            user (Optional[User]): Обмежити пошук контактами користувача.
 
         Returns:
             List[ContactResponse]: Список знайдених контактів.
         """
-        query = select(Contact).offset(skip).limit(limit)
-
-        if first_name:
-            query = query.where(Contact.first_name.ilike(f"%{first_name}%"))
-        if last_name:
-            query = query.where(Contact.last_name.ilike(f"%{last_name}%"))
-        if email:
-            query = query.where(Contact.email.ilike(f"%{email}%"))
-
+        query = self._search_query(user, first_name, last_name, email, q).offset(skip).limit(limit)
         result = await self.db.execute(query)
         contacts = result.scalars().all()
-        return [ContactResponse.from_orm(contact) for contact in contacts]
+        return await self._release([ContactResponse.from_orm(contact) for contact in contacts])
+
+    async def search_contacts_page(
+        self,
+        user: User,
+        first_name: Optional[str],
+        last_name: Optional[str],
+        email: Optional[str],
+        skip: int = 0,
+        limit: int = 100,
+        q: Optional[str] = None,
+    ) -> tuple[List[ContactResponse], int]:
+        """
+        Сторінка контактів користувача разом із загальною кількістю збігів.
+
+        Без фільтрів кількість береться з лічильника ``users.contacts_count``. З
+        фільтрами — з віконної функції ``COUNT(*) OVER ()`` у тому ж запиті, що
+        повертає сторінку; лише для сторінки за межами результатів потрібен
+        окремий підрахунок.
+
+        Args:
+            user (User): Власник контактів.
+            first_name (Optional[str]): Ім'я контакту для пошуку (частковий збіг).
+            last_name (Optional[str]): Прізвище контакту для пошуку (частковий збіг).
+            email (Optional[str]): Email контакту для пошуку (частковий збіг).
+            skip (int, optional): Кількість пропущених записів. За замовчуванням 0.
+            limit (int, optional): Максимальна кількість контактів у відповіді. За замовчуванням 100.
+            q (Optional[str]): Частковий збіг з ім'ям або прізвищем.
+
+        Returns:
+            tuple[List[ContactResponse], int]: Контакти сторінки та загальна кількість.
+        """
+        filtered = any((first_name, last_name, email, q))
+        query = self._search_query(user, first_name, last_name, email, q)
+        if not filtered:
+            result = await self.db.execute(query.order_by(Contact.id).offset(skip).limit(limit))
+            contacts = [ContactResponse.from_orm(contact) for contact in result.scalars().all()]
+            return await self._release((contacts, await self._counter(user)))
+
+        windowed = query.add_columns(func.count().over().label("total"))
+        result = await self.db.execute(windowed.order_by(Contact.id).offset(skip).limit(limit))
+        rows = result.all()
+        if rows:
+            total = rows[0].total
+        else:
+            total = await self.db.scalar(select(func.count()).select_from(query.subquery()))
+        contacts = [ContactResponse.from_orm(row[0]) for row in rows]
+        return await self._release((contacts, total))
+
+    async def get_changes(
+        self, user: User, token: Optional[SyncToken] = None, limit: int = 500
+    ) -> ContactChanges:
+        """
+        Зміни контактів користувача після позиції токена синхронізації.
+
+        Створені та змінені контакти й tombstone-записи видалених контактів
+        вибираються за індексами ``(user_id, change_seq)`` і об'єднуються в порядку
+        номерів змін. Без токена повертається повний поточний стан.
+
+        Args:
+            user (User): Власник контактів.
+            token (Optional[SyncToken]): Позиція клієнта; None — повна синхронізація.
+            limit (int, optional): Максимальна кількість змін на сторінці. За замовчуванням 500.
+
+        Returns:
+            ContactChanges: Зміни, видалені ідентифікатори та наступний токен.
+        """
+        since = token.seq if token else 0
+        contacts = await self.db.execute(
+            select(Contact)
+            .where(Contact.user_id == user.id, Contact.change_seq > since)
+            .order_by(Contact.change_seq)
+            .limit(limit + 1)
+        )
+        entries = [(contact.change_seq, contact) for contact in contacts.scalars().all()]
+        if token is not None:
+            tombstones = await self.db.execute(
+                select(ContactTombstone.change_seq, ContactTombstone.contact_id)
+                .where(ContactTombstone.user_id == user.id, ContactTombstone.change_seq > since)
+                .order_by(ContactTombstone.change_seq)
+                .limit(limit + 1)
+            )
+            entries.extend(tombstones.all())
+            entries.sort(key=lambda entry: entry[0])
+
+        has_more = len(entries) > limit
+        page = entries[:limit]
+        last_seq = page[-1][0] if page else since
+        # Поки сторінки не вичерпано, зберігаємо час першого токена: від нього
+        # залежить, чи не видалені ще tombstone-записи для решти змін
+        issued_at = token.issued_at if token and has_more else int(time.time())
+        changes = ContactChanges(
+            changes=[ContactResponse.from_orm(item) for _, item in page if isinstance(item, Contact)],
+            deleted=[item for _, item in page if not isinstance(item, Contact)],
+            next_token=encode_sync_token(SyncToken(last_seq, issued_at)),
+            has_more=has_more,
+        )
+        return await self._release(changes)
+
+    async def _next_change_seq(self, user_id: int, contacts_delta: int = 0, count: int = 1) -> int:
+        # Інкремент у рядку користувача блокує його до commit, тож зміни одного
+        # користувача фіксуються в порядку своїх номерів і клієнт не пропустить жодної.
+        # Для count > 1 резервуються номери від результату - count + 1 до результату
+        values = {"change_seq": User.change_seq + count}
+        if contacts_delta:
+            values["contacts_count"] = User.contacts_count + contacts_delta
+        result = await self.db.execute(
+            update(User).where(User.id == user_id).values(**values).returning(User.change_seq)
+        )
+        return result.scalar_one()
+
+    async def _counter(self, user: User) -> int:
+        return await self.db.scalar(select(User.contacts_count).where(User.id == user.id)) or 0
+
+    async def get_facets(self, user: User, top_domains: int = 10) -> dict:
+        """
+        Фасети контактів користувача: кількість за місяцем народження та доменом email.
+
+        Обидва групування виконуються в БД за індексом ``contacts.user_id``, а загальна
+        кількість береться з лічильника користувача.
+
+        Args:
+            user (User): Власник контактів.
+            top_domains (int, optional): Кількість найчастіших доменів. За замовчуванням 10.
+
+        Returns:
+            dict: Загальна кількість, розподіл за місяцями (1–12) та за доменами email.
+        """
+        month = func.extract("month", Contact.birthday)
+        months = await self.db.execute(
+            select(month, func.count()).where(Contact.user_id == user.id).group_by(month)
+        )
+        if self.db.get_bind().dialect.name == "postgresql":
+            domain = func.lower(func.split_part(Contact.email, "@", 2))
+        else:
+            domain = func.lower(func.substr(Contact.email, func.instr(Contact.email, "@") + 1))
+        domains = await self.db.execute(
+            select(domain.label("domain"), func.count().label("count"))
+            .where(Contact.user_id == user.id)
+            .group_by(domain)
+            .order_by(func.count().desc(), domain)
+            .limit(top_domains)
+        )
+        facets = {
+            "total": await self._counter(user),
+            "birth_month": {int(m): count for m, count in months.all()},
+            "email_domain": {d: count for d, count in domains.all()},
+        }
+        return await self._release(facets)
+
+    async def fuzzy_search(
+        self, user: User, q: str, skip: int = 0, limit: int = 100
+    ) -> List[ContactResponse]:
+        """
+        Нечіткий пошук контактів користувача за ім'ям і прізвищем з ранжуванням.
+
+        У Postgres використовується схожість триграм pg_trgm (оператор ``%`` за
+        GIN-індексом), в інших СУБД — індекс триграм у пам'яті процесу.
+        Результати впорядковано за спаданням схожості.
+
+        Args:
+            user (User): Власник контактів.
+            q (str): Рядок запиту, допускаються одруківки.
+            skip (int, optional): Кількість пропущених записів. За замовчуванням 0.
+            limit (int, optional): Максимальна кількість контактів у відповіді. За замовчуванням 100.
+
+        Returns:
+            List[ContactResponse]: Знайдені контакти, від найсхожіших.
+        """
+        threshold = settings.FUZZY_SEARCH_THRESHOLD
+        if self.db.get_bind().dialect.name == "postgresql":
+            score = func.similarity(FULL_NAME, q)
+            query = (
+                select(Contact)
+                .where(Contact.user_id == user.id, FULL_NAME.op("%")(q), score >= threshold)
+                .order_by(score.desc(), Contact.id)
+                .offset(skip)
+                .limit(limit)
+            )
+            result = await self.db.execute(query)
+            contacts = result.scalars().all()
+            return await self._release([ContactResponse.from_orm(contact) for contact in contacts])
+
+        index = await contact_search.get(self.db, user.id)
+        ranked = index.search(q, threshold=threshold, limit=skip + limit)[skip:]
+        if not ranked:
+            return await self._release([])
+        result = await self.db.execute(
+            select(Contact).where(Contact.user_id == user.id, Contact.id.in_([doc_id for doc_id, _ in ranked]))
+        )
+        by_id = {contact.id: contact for contact in result.scalars().all()}
+        return await self._release(
+            [ContactResponse.from_orm(by_id[doc_id]) for doc_id, _ in ranked if doc_id in by_id]
+        )
+
+    async def autocomplete(self, user: User, prefix: str, limit: int = 10) -> List[ContactSuggestion]:
+        """
+        Підказки контактів користувача за префіксом імені, прізвища або email.
+
+        Відповідь формується з індексу префіксів у пам'яті процесу; до бази даних
+        звертаємося лише для побудови індексу.
+
+        Args:
+            user (User): Власник контактів.
+            prefix (str): Префікс без урахування регістру.
+            limit (int, optional): Максимальна кількість підказок. За замовчуванням 10.
+
+        Returns:
+            List[ContactSuggestion]: Підказки в алфавітному порядку.
+        """
+        index = await contact_prefixes.get(self.db, user.id)
+        suggestions = [
+            ContactSuggestion(id=doc_id, name=name, email=email)
+            for doc_id, name, email in index.complete(prefix, limit)
+        ]
+        return await self._release(suggestions)
+
+    async def lookup_by_phone(self, user: User, phone: str) -> Optional[List[ContactResponse]]:
+        """
+        Знаходить контакти користувача за телефоном у будь-якому форматі.
+
+        Номер нормалізується до E.164, тож пошук іде за індексом
+        ``(user_id, phone_e164)``.
+
+        Args:
+            user (User): Власник контактів.
+            phone (str): Телефон.
 
-    async def get_upcoming_birthdays(self, days: int = 7) -> List[ContactResponse]:
+        Returns:
+            Optional[List[ContactResponse]]: Контакти з цим номером або None, якщо номер некоректний.
+        """
+        e164 = to_e164(phone)
+        if e164 is None:
+            return await self._release(None)
+        result = await self.db.execute(
+            select(Contact)
+            .where(Contact.user_id == user.id, Contact.phone_e164 == e164)
+            .order_by(Contact.id)
+        )
+        contacts = [ContactResponse.from_orm(contact) for contact in result.scalars().all()]
+        return await self._release(contacts)
+
+    async def lookup_by_phones(self, user: User, phones: List[str]) -> List[PhoneMatch]:
+        """
+        Пакетний пошук контактів користувача за телефонами одним запитом.
+
+        Args:
+            user (User): Власник контактів.
+            phones (List[str]): Телефони у довільному форматі.
+
+        Returns:
+            List[PhoneMatch]: Результат для кожного телефону в порядку запиту.
+        """
+        normalized = [(phone, to_e164(phone)) for phone in phones]
+        numbers = {e164 for _, e164 in normalized if e164 is not None}
+        by_number: dict[str, list[ContactResponse]] = {}
+        if numbers:
+            result = await self.db.execute(
+                select(Contact)
+                .where(Contact.user_id == user.id, Contact.phone_e164.in_(numbers))
+                .order_by(Contact.id)
+            )
+            for contact in result.scalars().all():
+                by_number.setdefault(contact.phone_e164, []).append(ContactResponse.from_orm(contact))
+        matches = [
+            PhoneMatch(phone=phone, e164=e164, contacts=by_number.get(e164, []))
+            for phone, e164 in normalized
+        ]
+        return await self._release(matches)
+
+    async def get_upcoming_birthdays(
+        self, days: int = 7, user: Optional[User] = None, limit: Optional[int] = None
+    ) -> List[ContactResponse]:
         """
         Отримує список контактів, які мають день народження протягом заданої кількості днів.
 
+        Для користувача результат береться з кешу відсортованих днів народження
+        (``birthday_cache``) у порядку настання свят; без користувача виконується
+        запит до БД за ``birthday_md``.
+
         Args:
             days (int, optional): Кількість днів, у межах яких слід шукати дні народження. За замовчуванням 7.
+            user (Optional[User]): Власник контактів.
+            limit (Optional[int]): Максимальна кількість контактів.
 
         Returns:
             List[ContactResponse]: Список контактів з днями народження у вказаний період.
         """
         today = date.today()
-        end_date = today + timedelta(days=days)
-        query = select(Contact).filter(Contact.birthday.between(today, end_date))
+        if user is not None:
+            contacts = await birthday_cache.upcoming(self.db, user.id, today, days, limit)
+            return await self._release(contacts)
+        query = select(Contact).filter(Contact.birthday_md.in_(list(birthday_window(today, days))))
+        if limit is not None:
+            query = query.limit(limit)
 
         result = await self.db.execute(query)
         contacts = result.scalars().all()
-        return [ContactResponse.from_orm(contact) for contact in contacts]
+        return await self._release([ContactResponse.from_orm(contact) for contact in contacts])
 
     async def get_contacts(
         self, user: User, skip: int = 0, limit: int = 100
@@ -87,83 +407,179 @@ class ContactService:
         Returns:
             List[ContactResponse]: Список контактів користувача.
         """
-        query = select(Contact).offset(skip).limit(limit)
-        result = await self.db.execute(query)
+        if user is None:
+            result = await self.db.execute(select(Contact).offset(skip).limit(limit))
+        else:
+            result = await self.db.execute(CONTACTS_PAGE, {"user_id": user.id, "skip": skip, "limit": limit})
         contacts = result.scalars().all()
-        return [ContactResponse.from_orm(contact) for contact in contacts]
+        return await self._release([ContactResponse.from_orm(contact) for contact in contacts])
 
-    async def get_contact_by_id(self, contact_id: int) -> Optional[ContactResponse]:
+    async def get_contact_by_id(self, contact_id: int, user: User) -> Optional[ContactResponse]:
         """
-        Отримує контакт за його ідентифікатором.
+        Отримує контакт користувача за його ідентифікатором.
 
         Args:
             contact_id (int): Ідентифікатор контакту.
+            user (User): Власник контакту.
 
         Returns:
             Optional[ContactResponse]: Об'єкт контакту, якщо знайдено, інакше None.
         """
-        query = select(Contact).filter(Contact.id == contact_id)
-        result = await self.db.execute(query)
+        result = await self.db.execute(CONTACT_BY_ID, {"user_id": user.id, "contact_id": contact_id})
         contact = result.scalar_one_or_none()
         if contact:
-            return ContactResponse.from_orm(contact)
-        return None
+            return await self._release(ContactResponse.from_orm(contact))
+        return await self._release(None)
 
-    async def create_contact(self, contact_data: ContactBase) -> ContactResponse:
+    async def create_contact(self, contact_data: ContactBase, user: User) -> ContactResponse:
         """
         Створює новий контакт.
 
         Args:
             contact_data (ContactBase): Дані для створення нового контакту.
+            user (User): Власник контакту.
 
         Returns:
             ContactResponse: Створений контакт.
         """
-        contact = Contact(**contact_data.dict())
+        contact = Contact(**contact_data.dict(), user_id=user.id)
         self.db.add(contact)
+        contact.change_seq = await self._next_change_seq(user.id, contacts_delta=1)
         await self.db.commit()
         await self.db.refresh(contact)
-        return ContactResponse.from_orm(contact)
+        index_contact(contact)
+        birthday_cache.upsert(contact)
+        response = ContactResponse.from_orm(contact)
+        await self._publish("created", contact.user_id, contact.change_seq, response)
+        return await self._release(response)
+
+    async def _publish(
+        self, event: str, user_id: Optional[int], change_seq: Optional[int], contact: ContactResponse
+    ) -> None:
+        # Подія публікується лише після commit, щоб підписники не побачили відкочених змін
+        if user_id is None:
+            return
+        data = {"id": contact.id} if event == "deleted" else contact.model_dump(mode="json")
+        await contact_events.publish(user_id, event, data, change_seq)
 
     async def update_contact(
-        self, contact_id: int, contact_data: ContactBase
+        self, contact_id: int, contact_data: ContactBase, user: User
     ) -> Optional[ContactResponse]:
         """
-        Оновлює існуючий контакт за ідентифікатором.
+        Оновлює існуючий контакт користувача за ідентифікатором.
 
         Args:
             contact_id (int): Ідентифікатор контакту.
             contact_data (ContactBase): Нові дані для оновлення контакту.
+            user (User): Власник контакту.
 
         Returns:
             Optional[ContactResponse]: Оновлений контакт або None, якщо не знайдено.
         """
-        query = select(Contact).filter(Contact.id == contact_id)
-        result = await self.db.execute(query)
+        result = await self.db.execute(CONTACT_FOR_UPDATE, {"user_id": user.id, "contact_id": contact_id})
         contact = result.scalar_one_or_none()
         if contact:
             for field, value in contact_data.dict(exclude_unset=True).items():
                 setattr(contact, field, value)
+            contact.change_seq = await self._next_change_seq(user.id)
             await self.db.commit()
             await self.db.refresh(contact)
-            return ContactResponse.from_orm(contact)
-        return None
+            index_contact(contact)
+            birthday_cache.upsert(contact)
+            response = ContactResponse.from_orm(contact)
+            await self._publish("updated", contact.user_id, contact.change_seq, response)
+            return await self._release(response)
+        return await self._release(None)
 
-    async def remove_contact(self, contact_id: int) -> Optional[ContactResponse]:
+    async def remove_contact(self, contact_id: int, user: User) -> Optional[ContactResponse]:
         """
-        Видаляє контакт за ідентифікатором.
+        Видаляє контакт користувача за ідентифікатором.
 
         Args:
             contact_id (int): Ідентифікатор контакту для видалення.
+            user (User): Власник контакту.
 
         Returns:
             Optional[ContactResponse]: Видалений контакт або None, якщо не знайдено.
         """
-        query = select(Contact).filter(Contact.id == contact_id)
-        result = await self.db.execute(query)
+        result = await self.db.execute(CONTACT_FOR_UPDATE, {"user_id": user.id, "contact_id": contact_id})
         contact = result.scalar_one_or_none()
         if contact:
+            # Відповідь формуємо до commit: після нього атрибути видаленого об'єкта недоступні
+            response = ContactResponse.from_orm(contact)
+            user_id = user.id
+            await self.db.execute(
+                delete(ContactDuplicate).where(
+                    ContactDuplicate.user_id == user_id,
+                    or_(ContactDuplicate.contact_id == contact_id, ContactDuplicate.duplicate_id == contact_id),
+                )
+            )
             await self.db.delete(contact)
+            change_seq = await self._next_change_seq(user_id, contacts_delta=-1)
+            self.db.add(ContactTombstone(user_id=user_id, contact_id=contact_id, change_seq=change_seq))
             await self.db.commit()
-            return ContactResponse.from_orm(contact)
-        return None
+            unindex_contact(user_id, contact_id)
+            birthday_cache.remove(user_id, contact_id)
+            await self._publish("deleted", user_id, change_seq, response)
+            return await self._release(response)
+        return await self._release(None)
+
+    async def merge_contacts(
+        self, user: User, contact_id: int, duplicate_ids: List[int]
+    ) -> Optional[ContactResponse]:
+        """
+        Зливає дублікати в основний контакт однією транзакцією.
+
+        Порожні необов'язкові поля основного контакту заповнюються значеннями
+        дублікатів, дублікати видаляються (з tombstone-записами для синхронізації),
+        а пари дублікатів, що їх стосуються, прибираються.
+
+        Args:
+            user (User): Власник контактів.
+            contact_id (int): Основний контакт, що залишається.
+            duplicate_ids (List[int]): Контакти, що зливаються в основний.
+
+        Returns:
+            Optional[ContactResponse]: Оновлений основний контакт або None, якщо якийсь
+            із контактів не знайдено серед контактів користувача.
+        """
+        duplicate_ids = sorted(set(duplicate_ids) - {contact_id})
+        ids = [contact_id, *duplicate_ids]
+        result = await self.db.execute(
+            select(Contact).where(Contact.id.in_(ids), Contact.user_id == user.id).with_for_update()
+        )
+        contacts = {contact.id: contact for contact in result.scalars().all()}
+        if not duplicate_ids or len(contacts) != len(ids):
+            return await self._release(None)
+
+        primary = contacts[contact_id]
+        duplicates = [contacts[duplicate_id] for duplicate_id in duplicate_ids]
+        for duplicate in duplicates:
+            if not primary.additional_info and duplicate.additional_info:
+                primary.additional_info = duplicate.additional_info
+        last_seq = await self._next_change_seq(
+            user.id, contacts_delta=-len(duplicates), count=len(duplicates) + 1
+        )
+        deleted = []
+        for seq, duplicate in enumerate(duplicates, start=last_seq - len(duplicates)):
+            deleted.append(ContactResponse.from_orm(duplicate))
+            await self.db.delete(duplicate)
+            self.db.add(ContactTombstone(user_id=user.id, contact_id=duplicate.id, change_seq=seq))
+        primary.change_seq = last_seq
+        await self.db.execute(
+            delete(ContactDuplicate).where(
+                or_(ContactDuplicate.contact_id.in_(ids), ContactDuplicate.duplicate_id.in_(ids))
+            )
+        )
+        await self.db.commit()
+        await self.db.refresh(primary)
+
+        for seq, response in enumerate(deleted, start=last_seq - len(deleted)):
+            unindex_contact(user.id, response.id)
+            birthday_cache.remove(user.id, response.id)
+            await self._publish("deleted", user.id, seq, response)
+        index_contact(primary)
+        birthday_cache.upsert(primary)
+        merged = ContactResponse.from_orm(primary)
+        await self._publish("updated", user.id, last_seq, merged)
+        return await self._release(merged)
@@ -0,0 +1,364 @@
+"""
+Пошук дублікатів контактів за ключами блокування.
+
+Кожен контакт отримує до трьох ключів: нормалізований email, нормалізований
+телефон і фонетичний ключ імені (Soundex прізвища та імені). Порівнюються лише
+контакти з однаковим ключем, тож кількість порівнянь лінійна за розміром
+адресної книги, а не квадратична. Великі блоки за email або телефоном
+порівнюються "зіркою" з першим контактом блоку; великі блоки за іменем
+(поширені імена) пропускаються, бо самі по собі нічого не означають.
+
+Перевірка інкрементна: для користувача запам'ятовується ``users.dedup_seq``, і
+наступний прохід перераховує лише пари, де хоча б один контакт змінився після
+цієї позиції. Знайдені пари зберігаються в ``contact_duplicates``.
+
+Запуск з командного рядка::
+
+    python -m src.services.maintenance dedup
+"""
+import logging
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from src.conf.config import settings
+from src.database.db import DatabaseSessionManager, sessionmanager
+from src.database.models import Contact, ContactDuplicate, User
+from src.database.phones import to_e164
+from src.schemas.contacts import ContactResponse, DuplicateSuggestion
+from src.services.search import similarity, trigrams
+
+logger = logging.getLogger("src.services.dedup")
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+_TRANSLIT = str.maketrans({
+    "а": "a", "б": "b", "в": "v", "г": "h", "ґ": "g", "д": "d", "е": "e", "є": "ie", "ж": "zh",
+    "з": "z", "и": "y", "і": "i", "ї": "i", "й": "i", "к": "k", "л": "l", "м": "m", "н": "n",
+    "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u", "ф": "f", "х": "kh", "ц": "ts",
+    "ч": "ch", "ш": "sh", "щ": "shch", "ь": "", "ю": "iu", "я": "ia", "ы": "y", "э": "e", "ё": "io",
+    "ъ": "",
+})
+
+EMAIL_WEIGHT = 0.5
+PHONE_WEIGHT = 0.4
+NAME_KEY_WEIGHT = 0.2
+NAME_SIMILARITY_WEIGHT = 0.4
+
+
+def normalize_email(email: Optional[str]) -> str:
+    """
+    Нормалізує email для порівняння: без пробілів і в нижньому регістрі.
+
+    Args:
+        email (Optional[str]): Email.
+
+    Returns:
+        str: Нормалізований email або порожній рядок.
+    """
+    return (email or "").strip().lower()
+
+
+def normalize_phone(phone: Optional[str], country_code: str = settings.PHONE_DEFAULT_COUNTRY_CODE) -> str:
+    """
+    Нормалізує телефон до цифр формату E.164 без "+".
+
+    Args:
+        phone (Optional[str]): Телефон у довільному форматі.
+        country_code (str): Код країни для національних номерів.
+
+    Returns:
+        str: Цифри номера або порожній рядок, якщо номер некоректний.
+    """
+    e164 = to_e164(phone, country_code)
+    return e164[1:] if e164 else ""
+
+
+def soundex(word: str) -> str:
+    """
+    Код Soundex слова; кирилиця попередньо транслітерується.
+
+    Args:
+        word (str): Слово.
+
+    Returns:
+        str: Код з літери і трьох цифр або порожній рядок.
+    """
+    letters = [char for char in word.lower().translate(_TRANSLIT) if "a" <= char <= "z"]
+    if not letters:
+        return ""
+    code = [letters[0].upper()]
+    previous = _SOUNDEX_CODES.get(letters[0], "")
+    for char in letters[1:]:
+        digit = _SOUNDEX_CODES.get(char, "")
+        if digit and digit != previous:
+            code.append(digit)
+            if len(code) == 4:
+                break
+        # "h" і "w" не розділяють однакові коди, голосні — розділяють
+        if char not in "hw":
+            previous = digit
+    return "".join(code).ljust(4, "0")
+
+
+def name_key(first_name: str, last_name: str) -> str:
+    """
+    Фонетичний ключ імені для блокування.
+
+    Args:
+        first_name (str): Ім'я.
+        last_name (str): Прізвище.
+
+    Returns:
+        str: Ключ або порожній рядок.
+    """
+    last, first = soundex(last_name), soundex(first_name)
+    return f"{last}{first}" if last and first else ""
+
+
+@dataclass(frozen=True)
+class DuplicatePair:
+    """
+    Пара ймовірних дублікатів (``contact_id`` < ``duplicate_id``).
+    """
+
+    contact_id: int
+    duplicate_id: int
+    score: float
+    reasons: tuple[str, ...]
+
+
+def find_duplicates(
+    rows: Iterable[tuple[int, str, str, str, str]],
+    changed: Optional[set[int]] = None,
+    threshold: float = settings.DEDUP_THRESHOLD,
+    max_block: int = settings.DEDUP_MAX_BLOCK_SIZE,
+    country_code: str = settings.PHONE_DEFAULT_COUNTRY_CODE,
+) -> list[DuplicatePair]:
+    """
+    Знаходить ймовірні дублікати серед контактів одного користувача.
+
+    Args:
+        rows (Iterable[tuple]): Рядки (id, ім'я, прізвище, email, телефон) за зростанням id.
+        changed (Optional[set[int]]): Змінені контакти; None — перевірити всі пари.
+        threshold (float): Мінімальна оцінка пари.
+        max_block (int): Розмір блоку, після якого пари не перебираються повністю.
+        country_code (str): Код країни для нормалізації телефонів.
+
+    Returns:
+        list[DuplicatePair]: Пари за спаданням оцінки.
+    """
+    docs: dict[int, tuple[str, str, str, str]] = {}
+    blocks: dict[str, list[int]] = {}
+    for contact_id, first_name, last_name, email, phone in rows:
+        doc = (
+            normalize_email(email),
+            normalize_phone(phone, country_code),
+            name_key(first_name, last_name),
+            f"{first_name} {last_name}",
+        )
+        docs[contact_id] = doc
+        for prefix, key in zip("epn", doc):
+            if key:
+                blocks.setdefault(f"{prefix}:{key}", []).append(contact_id)
+
+    grams: dict[int, frozenset[str]] = {}
+
+    def name_grams(contact_id: int) -> frozenset[str]:
+        value = grams.get(contact_id)
+        if value is None:
+            value = grams[contact_id] = trigrams(docs[contact_id][3])
+        return value
+
+    scored: dict[tuple[int, int], Optional[DuplicatePair]] = {}
+    for key, members in blocks.items():
+        if len(members) < 2:
+            continue
+        if len(members) > max_block:
+            if key.startswith("n:"):
+                continue
+            head = members[0]
+            candidates = ((head, other) for other in members[1:])
+        else:
+            candidates = combinations(members, 2)
+        for pair in candidates:
+            if pair in scored or (changed is not None and pair[0] not in changed and pair[1] not in changed):
+                continue
+            left, right = docs[pair[0]], docs[pair[1]]
+            reasons = tuple(
+                reason for reason, a, b in zip(("email", "phone", "name"), left, right) if a and a == b
+            )
+            score = (
+                EMAIL_WEIGHT * ("email" in reasons)
+                + PHONE_WEIGHT * ("phone" in reasons)
+                + NAME_KEY_WEIGHT * ("name" in reasons)
+                + NAME_SIMILARITY_WEIGHT * similarity(name_grams(pair[0]), name_grams(pair[1]))
+            )
+            score = round(min(score, 1.0), 3)
+            scored[pair] = DuplicatePair(*pair, score, reasons) if score >= threshold else None
+    pairs = [pair for pair in scored.values() if pair is not None]
+    pairs.sort(key=lambda pair: (-pair.score, pair.contact_id, pair.duplicate_id))
+    return pairs
+
+
+class DedupService:
+    """
+    Сервіс перевірки контактів користувачів на дублікати.
+    """
+
+    def __init__(self, db: AsyncSession):
+        """
+        Ініціалізує сервіс.
+
+        Args:
+            db (AsyncSession): Асинхронна сесія бази даних SQLAlchemy.
+        """
+        self.db = db
+
+    async def refresh(self, user_id: int, force: bool = False) -> Optional[int]:
+        """
+        Перераховує дублікати контактів користувача, змінених після останньої перевірки.
+
+        Args:
+            user_id (int): Ідентифікатор користувача.
+            force (bool): Перевірити всі пари, а не лише змінені.
+
+        Returns:
+            Optional[int]: Кількість знайдених пар або None, якщо змін не було.
+        """
+        state = (
+            await self.db.execute(select(User.dedup_seq, User.change_seq).where(User.id == user_id))
+        ).one()
+        watermark = 0 if force else state.dedup_seq
+        if watermark and state.change_seq <= watermark:
+            return None
+        rows = (
+            await self.db.execute(
+                select(
+                    Contact.id,
+                    Contact.first_name,
+                    Contact.last_name,
+                    Contact.email,
+                    Contact.phone_number,
+                    Contact.change_seq,
+                )
+                .where(Contact.user_id == user_id)
+                .order_by(Contact.id)
+            )
+        ).all()
+        changed = None
+        if watermark:
+            changed = {row.id for row in rows if row.change_seq is None or row.change_seq > watermark}
+            # Коли змінилась більшість контактів, простіше перевірити все заново
+            if len(changed) * 2 > len(rows):
+                changed = None
+        pairs = find_duplicates((row[:5] for row in rows), changed)
+
+        stale = delete(ContactDuplicate).where(ContactDuplicate.user_id == user_id)
+        if changed is not None:
+            stale = stale.where(
+                or_(ContactDuplicate.contact_id.in_(changed), ContactDuplicate.duplicate_id.in_(changed))
+            )
+        await self.db.execute(stale)
+        if pairs:
+            await self.db.execute(
+                insert(ContactDuplicate),
+                [
+                    {
+                        "user_id": user_id,
+                        "contact_id": pair.contact_id,
+                        "duplicate_id": pair.duplicate_id,
+                        "score": pair.score,
+                        "reasons": ",".join(pair.reasons),
+                    }
+                    for pair in pairs
+                ],
+            )
+        await self.db.execute(update(User).where(User.id == user_id).values(dedup_seq=state.change_seq))
+        await self.db.commit()
+        return len(pairs)
+
+    async def suggestions(
+        self, user_id: int, limit: int = 50, min_score: float = 0.0
+    ) -> list[DuplicateSuggestion]:
+        """
+        Збережені пари ймовірних дублікатів користувача за спаданням оцінки.
+
+        Args:
+            user_id (int): Ідентифікатор користувача.
+            limit (int): Максимальна кількість пар.
+            min_score (float): Мінімальна оцінка.
+
+        Returns:
+            list[DuplicateSuggestion]: Пари контактів з оцінкою та ознаками збігу.
+        """
+        first, second = aliased(Contact), aliased(Contact)
+        rows = await self.db.execute(
+            select(ContactDuplicate.score, ContactDuplicate.reasons, first, second)
+            .join(first, (first.user_id == ContactDuplicate.user_id) & (first.id == ContactDuplicate.contact_id))
+            .join(second, (second.user_id == ContactDuplicate.user_id) & (second.id == ContactDuplicate.duplicate_id))
+            .where(ContactDuplicate.user_id == user_id, ContactDuplicate.score >= min_score)
+            .order_by(ContactDuplicate.score.desc(), ContactDuplicate.contact_id)
+            .limit(limit)
+        )
+        return [
+            DuplicateSuggestion(
+                contact=ContactResponse.from_orm(contact),
+                duplicate=ContactResponse.from_orm(duplicate),
+                score=score,
+                reasons=reasons.split(",") if reasons else [],
+            )
+            for score, reasons, contact, duplicate in rows.all()
+        ]
+
+
+async def run_dedup(
+    batch_size: int = settings.DEDUP_USERS_BATCH_SIZE,
+    manager: DatabaseSessionManager = sessionmanager,
+) -> dict:
+    """
+    Інкрементно перевіряє на дублікати контакти всіх користувачів зі змінами.
+
+    Кожен користувач обробляється в окремій транзакції.
+
+    Args:
+        batch_size (int): Кількість користувачів, що вибираються за один запит.
+        manager (DatabaseSessionManager): Менеджер сесій бази даних.
+
+    Returns:
+        dict: Кількість оброблених користувачів і знайдених пар.
+    """
+    report = {"users": 0, "pairs": 0}
+    after = 0
+    while True:
+        async with manager.session() as db:
+            user_ids = (
+                await db.execute(
+                    select(User.id)
+                    .where(User.id > after, User.change_seq > User.dedup_seq)
+                    .order_by(User.id)
+                    .limit(batch_size)
+                )
+            ).scalars().all()
+        for user_id in user_ids:
+            async with manager.session() as db:
+                found = await DedupService(db).refresh(user_id)
+            if found is not None:
+                report["users"] += 1
+                report["pairs"] += found
+        if len(user_ids) < batch_size:
+            break
+        after = user_ids[-1]
+    if report["users"]:
+        logger.info("Dedup: %s users checked, %s duplicate pairs", report["users"], report["pairs"])
+    return report
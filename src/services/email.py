@@ -1,26 +1,59 @@
+import asyncio
+import logging
+from email.utils import formataddr
+from functools import lru_cache
 from pathlib import Path
+from typing import Iterable
 
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
-from fastapi_mail.errors import ConnectionErrors
 from pydantic import EmailStr
 
 from src.services.auth import create_email_token
 from src.conf.config import settings
 
-# Налаштування підключення до поштового сервера
-conf = ConnectionConfig(
-    MAIL_USERNAME=settings.MAIL_USERNAME,
-    MAIL_PASSWORD=settings.MAIL_PASSWORD,
-    MAIL_FROM=settings.MAIL_FROM,
-    MAIL_PORT=settings.MAIL_PORT,
-    MAIL_SERVER=settings.MAIL_SERVER,
-    MAIL_FROM_NAME=settings.MAIL_FROM_NAME,
-    MAIL_STARTTLS=settings.MAIL_STARTTLS,
-    MAIL_SSL_TLS=settings.MAIL_SSL_TLS,
-    USE_CREDENTIALS=settings.USE_CREDENTIALS,
-    VALIDATE_CERTS=settings.VALIDATE_CERTS,
-    TEMPLATE_FOLDER=Path(__file__).parent / "templates",
-)
+logger = logging.getLogger("src.services.email")
+
+# fastapi_mail імпортується лише під час першого надсилання листа:
+# разом із залежностями (redis, email_validator) це найважчий імпорт застосунку
+_LAZY_MAIL_NAMES = ("FastMail", "MessageSchema", "MessageType", "ConnectionConfig")
+
+
+def __getattr__(name: str):
+    if name in _LAZY_MAIL_NAMES:
+        import fastapi_mail
+
+        value = getattr(fastapi_mail, name)
+        globals()[name] = value
+        return value
+    if name == "conf":
+        return get_mail_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _mail(name: str):
+    return globals().get(name) or __getattr__(name)
+
+
+@lru_cache
+def get_mail_config():
+    """
+    Створює (один раз) налаштування підключення до поштового сервера.
+
+    Returns:
+        ConnectionConfig: Налаштування fastapi_mail.
+    """
+    return _mail("ConnectionConfig")(
+        MAIL_USERNAME=settings.MAIL_USERNAME,
+        MAIL_PASSWORD=settings.MAIL_PASSWORD,
+        MAIL_FROM=settings.MAIL_FROM,
+        MAIL_PORT=settings.MAIL_PORT,
+        MAIL_SERVER=settings.MAIL_SERVER,
+        MAIL_FROM_NAME=settings.MAIL_FROM_NAME,
+        MAIL_STARTTLS=settings.MAIL_STARTTLS,
+        MAIL_SSL_TLS=settings.MAIL_SSL_TLS,
+        USE_CREDENTIALS=settings.USE_CREDENTIALS,
+        VALIDATE_CERTS=settings.VALIDATE_CERTS,
+        TEMPLATE_FOLDER=Path(__file__).parent / "templates",
+    )
 
 async def send_email(email: EmailStr, username: str, host: str):
     """
@@ -34,9 +67,11 @@ async def send_email(email: EmailStr, username: str, host: str):
     Raises:
         ConnectionErrors: Якщо виникає помилка підключення до SMTP-сервера.
     """
+    from fastapi_mail.errors import ConnectionErrors
+
     try:
         token_verification = create_email_token({"sub": email})
-        message = MessageSchema(
+        message = _mail("MessageSchema")(
             subject="Confirm your email",
             recipients=[email],
             template_body={
@@ -44,10 +79,127 @@ async def send_email(email: EmailStr, username: str, host: str):
                 "username": username,
                 "token": token_verification,
             },
-            subtype=MessageType.html,
+            subtype=_mail("MessageType").html,
         )
 
-        fm = FastMail(conf)
+        fm = _mail("FastMail")(get_mail_config())
         await fm.send_message(message, template_name="verify_email.html")
     except ConnectionErrors as err:
         print(err)
+
+
+def birthday_digest_message(email: str, username: str, contacts: list[dict], days: int):
+    """
+    Формує лист-дайджест найближчих днів народження.
+
+    Args:
+        email (str): Email-адреса одержувача.
+        username (str): Ім'я користувача для вставки в лист.
+        contacts (list[dict]): Контакти з полями first_name, last_name, email, date, days_left.
+        days (int): Довжина періоду, днів.
+
+    Returns:
+        MessageSchema: Повідомлення для надсилання з шаблоном ``birthday_digest.html``.
+    """
+    return _mail("MessageSchema")(
+        subject=f"Upcoming birthdays: {len(contacts)}",
+        recipients=[email],
+        template_body={"username": username, "contacts": contacts, "days": days},
+        subtype=_mail("MessageType").html,
+    )
+
+
+async def _close_connection(connection) -> None:
+    try:
+        await connection.__aexit__(None, None, None)
+    except Exception:
+        # Сесія вже могла бути розірвана сервером
+        logger.debug("Closing SMTP session failed", exc_info=True)
+
+
+async def send_messages(
+    messages: Iterable,
+    template_name: str,
+    concurrency: int = 5,
+    rate_per_second: float = 0.0,
+) -> tuple[int, int]:
+    """
+    Надсилає пакет листів пулом із ``concurrency`` воркерів, кожен зі своєю SMTP-сесією.
+
+    Повідомлення беруться з ``messages`` через обмежену чергу, тож у пам'яті
+    одночасно перебуває не більше ``2 * concurrency`` листів, навіть якщо
+    ``messages`` — генератор на сотні тисяч адрес. Воркер відкриває SMTP-сесію
+    при першому листі й надсилає нею всі наступні; після помилки сесія
+    закривається і відкривається знову для наступного листа. Налаштування
+    підключення і шаблон завантажуються один раз на пакет, а початок надсилання
+    рівномірно розподіляється так, щоб не перевищити ``rate_per_second`` листів за
+    секунду.
+
+    Args:
+        messages (Iterable[MessageSchema]): Повідомлення.
+        template_name (str): Назва шаблону.
+        concurrency (int): Кількість воркерів і одночасних SMTP-сесій.
+        rate_per_second (float): Обмеження швидкості; 0 — без обмеження.
+
+    Returns:
+        tuple[int, int]: Кількість надісланих листів і помилок.
+    """
+    from fastapi_mail.connection import Connection
+    from fastapi_mail.fastmail import email_dispatched
+    from fastapi_mail.msg import MailMsg
+
+    config = get_mail_config()
+    template = config.template_engine().get_template(template_name)
+    sender = formataddr((config.MAIL_FROM_NAME, config.MAIL_FROM)) if config.MAIL_FROM_NAME else config.MAIL_FROM
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+    interval = 1.0 / rate_per_second if rate_per_second else 0.0
+    loop = asyncio.get_running_loop()
+    next_slot = loop.time()
+    sent = failed = 0
+
+    async def render(message):
+        body = message.template_body
+        if body is not None:
+            message.template_body = template.render({"body": body} if isinstance(body, list) else body)
+        return await MailMsg(message)._message(sender)
+
+    async def worker() -> None:
+        nonlocal sent, failed, next_slot
+        connection = None
+        try:
+            while (message := await queue.get()) is not None:
+                now = loop.time()
+                start = max(next_slot, now)
+                next_slot = start + interval
+                if start > now:
+                    await asyncio.sleep(start - now)
+                try:
+                    msg = await render(message)
+                    if connection is None:
+                        connection = await Connection(config).__aenter__()
+                    if not config.SUPPRESS_SEND:
+                        await connection.session.send_message(msg)
+                    email_dispatched.send(msg)
+                    sent += 1
+                except Exception:
+                    logger.exception("Sending email to %s failed", message.recipients)
+                    failed += 1
+                    if connection is not None:
+                        await _close_connection(connection)
+                        connection = None
+        finally:
+            if connection is not None:
+                await _close_connection(connection)
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        for message in messages:
+            await queue.put(message)
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+    return sent, failed
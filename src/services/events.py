@@ -0,0 +1,311 @@
+"""
+Потік подій змін контактів для Server-Sent Events.
+
+Сервіс контактів публікує події ``created``, ``updated`` та ``deleted`` після
+фіксації транзакції. Кожна подія серіалізується один раз у готовий SSE-кадр і
+розсилається чергам підписників власника контакту. З увімкненим
+``EVENTS_REDIS_ENABLED`` публікація йде через Redis pub/sub, а кожен воркер тримає
+одне pattern-підключення і розсилає отримані кадри своїм локальним підписникам,
+тож події доходять до клієнтів на будь-якому воркері чи вузлі.
+
+Неактивне з'єднання коштує лише черги та генератора відповіді: окремих задач на
+підписника немає, а heartbeat-коментар надсилається раз на ``EVENTS_HEARTBEAT_SECONDS``.
+"""
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Optional
+
+from fastapi.responses import StreamingResponse
+
+from src.conf.config import settings
+from src.services.redis import get_redis_client
+
+logger = logging.getLogger("src.services.events")
+
+HEARTBEAT = ": heartbeat\n\n"
+# Клієнт не встиг прочитати події: він має догнати стан через /contacts/changes
+RESYNC = "event: resync\ndata: {}\n\n"
+
+
+class TooManySubscribers(RuntimeError):
+    """
+    Досягнуто обмеження кількості одночасних підписок воркера.
+    """
+
+
+def format_event(event: str, data: dict, event_id: Optional[int] = None) -> str:
+    """
+    Формує SSE-кадр.
+
+    Args:
+        event (str): Тип події.
+        data (dict): Дані події (серіалізуються в JSON).
+        event_id (Optional[int]): Ідентифікатор події (поле ``id``).
+
+    Returns:
+        str: Кадр у форматі text/event-stream.
+    """
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, separators=(',', ':'), default=str)}\n\n"
+
+
+class Subscription:
+    """
+    Черга кадрів одного SSE-з'єднання з обмеженням розміру.
+
+    Черга сама по собі не обмежена, але ``push`` перестає приймати кадри, щойно їх
+    накопичилось ``maxsize``: повільний клієнт отримує кадр ``resync`` і від'єднується,
+    не затримуючи розсилку іншим і не накопичуючи пам'ять.
+    """
+
+    def __init__(self, user_id: int, maxsize: int):
+        self.user_id = user_id
+        self.maxsize = maxsize
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.overflowed = False
+
+    def push(self, frame: str) -> bool:
+        """
+        Додає кадр у чергу.
+
+        Args:
+            frame (str): SSE-кадр.
+
+        Returns:
+            bool: False, якщо клієнт відстав і підписку завершено.
+        """
+        if self.overflowed:
+            return False
+        if self.queue.qsize() >= self.maxsize:
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+            self.queue.put_nowait(None)
+            return False
+        self.queue.put_nowait(frame)
+        return True
+
+    def close(self) -> None:
+        """
+        Завершує потік після вже отриманих кадрів.
+        """
+        self.queue.put_nowait(None)
+
+
+class ContactEventBroadcaster:
+    """
+    Розсилка подій змін контактів підписникам за користувачами.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = 100,
+        max_connections: int = 10000,
+        redis_enabled: bool = False,
+        channel_prefix: str = "contacts:events:",
+    ):
+        """
+        Ініціалізація ContactEventBroadcaster.
+
+        Args:
+            queue_size (int): Максимальна кількість непрочитаних кадрів на з'єднання.
+            max_connections (int): Максимальна кількість одночасних підписок.
+            redis_enabled (bool): Розсилати події між воркерами через Redis pub/sub.
+            channel_prefix (str): Префікс каналів Redis (далі йде id користувача).
+        """
+        self.queue_size = queue_size
+        self.max_connections = max_connections
+        self.redis_enabled = redis_enabled
+        self.channel_prefix = channel_prefix
+        self.connections = 0
+        self.dropped = 0
+        self._subscribers: dict[int, set[Subscription]] = {}
+        self._listener: Optional[asyncio.Task] = None
+
+    def subscribe(self, user_id: int) -> Subscription:
+        """
+        Реєструє нове з'єднання користувача.
+
+        Args:
+            user_id (int): Ідентифікатор користувача.
+
+        Returns:
+            Subscription: Черга кадрів з'єднання.
+
+        Raises:
+            TooManySubscribers: Якщо досягнуто ``max_connections``.
+        """
+        if self.connections >= self.max_connections:
+            raise TooManySubscribers("Too many event stream connections")
+        if self.redis_enabled and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+        subscription = Subscription(user_id, self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        self.connections += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        Видаляє з'єднання з розсилки.
+
+        Args:
+            subscription (Subscription): Підписка з'єднання.
+        """
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is None or subscription not in subscribers:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.user_id]
+        self.connections -= 1
+
+    def deliver(self, user_id: int, frame: str) -> int:
+        """
+        Передає кадр усім локальним з'єднанням користувача.
+
+        Args:
+            user_id (int): Ідентифікатор користувача.
+            frame (str): SSE-кадр.
+
+        Returns:
+            int: Кількість з'єднань, що прийняли кадр.
+        """
+        delivered = 0
+        for subscription in list(self._subscribers.get(user_id, ())):
+            if subscription.push(frame):
+                delivered += 1
+            else:
+                self.dropped += 1
+                self.unsubscribe(subscription)
+        return delivered
+
+    async def publish(self, user_id: int, event: str, data: dict, event_id: Optional[int] = None) -> None:
+        """
+        Публікує подію для всіх з'єднань користувача.
+
+        Якщо Redis недоступний, подія доставляється хоча б локальним підписникам.
+
+        Args:
+            user_id (int): Власник контакту.
+            event (str): Тип події (``created``, ``updated``, ``deleted``).
+            data (dict): Дані події.
+            event_id (Optional[int]): Номер зміни (``change_seq``).
+        """
+        frame = format_event(event, data, event_id)
+        if self.redis_enabled:
+            try:
+                client = await get_redis_client()
+                await client.publish(f"{self.channel_prefix}{user_id}", frame)
+                return
+            except Exception:
+                logger.exception("Publishing contact event to Redis failed")
+        self.deliver(user_id, frame)
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                client = await get_redis_client()
+                pubsub = client.pubsub()
+                await pubsub.psubscribe(f"{self.channel_prefix}*")
+                try:
+                    async for message in pubsub.listen():
+                        if message["type"] != "pmessage":
+                            continue
+                        user_id = int(message["channel"][len(self.channel_prefix):])
+                        self.deliver(user_id, message["data"])
+                finally:
+                    await pubsub.aclose()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Contact event listener failed, reconnecting")
+                await asyncio.sleep(1.0)
+
+    async def stream(self, subscription: Subscription, heartbeat: float) -> AsyncIterator[str]:
+        """
+        Генератор SSE-відповіді для підписки.
+
+        Args:
+            subscription (Subscription): Підписка з'єднання.
+            heartbeat (float): Інтервал heartbeat-коментарів, с.
+
+        Yields:
+            str: SSE-кадри.
+        """
+        try:
+            yield f"retry: {int(heartbeat * 1000)}\n\n"
+            while True:
+                try:
+                    async with asyncio.timeout(heartbeat):
+                        frame = await subscription.queue.get()
+                except TimeoutError:
+                    yield HEARTBEAT
+                    continue
+                if frame is None:
+                    break
+                yield frame
+        finally:
+            self.unsubscribe(subscription)
+
+    async def close(self) -> None:
+        """
+        Завершує всі потоки та зупиняє слухача Redis.
+        """
+        for subscribers in list(self._subscribers.values()):
+            for subscription in subscribers:
+                subscription.close()
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    def snapshot(self) -> dict:
+        return {"connections": self.connections, "users": len(self._subscribers), "dropped": self.dropped}
+
+
+class EventStreamResponse(StreamingResponse):
+    """
+    SSE-відповідь, що знімає підписку, хоч би як завершилося її надсилання.
+
+    Генератор ``stream`` знімає підписку у своєму ``finally``, але якщо клієнт
+    відключився або надсилання зламалося до першої ітерації, генератор так і не
+    стартує. Тоді підписку знімає сама відповідь, інакше ``connections`` не
+    зменшується і ліміт ``max_connections`` поступово вичерпується.
+    """
+
+    def __init__(self, broadcaster: ContactEventBroadcaster, subscription: Subscription, heartbeat: float):
+        """
+        Ініціалізація EventStreamResponse.
+
+        Args:
+            broadcaster (ContactEventBroadcaster): Розсилка, що видала підписку.
+            subscription (Subscription): Підписка з'єднання.
+            heartbeat (float): Інтервал heartbeat-коментарів, с.
+        """
+        super().__init__(
+            broadcaster.stream(subscription, heartbeat),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+        self.broadcaster = broadcaster
+        self.subscription = subscription
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.broadcaster.unsubscribe(self.subscription)
+            await self.body_iterator.aclose()
+
+
+contact_events = ContactEventBroadcaster(
+    queue_size=settings.EVENTS_QUEUE_SIZE,
+    max_connections=settings.EVENTS_MAX_CONNECTIONS,
+    redis_enabled=settings.EVENTS_REDIS_ENABLED,
+    channel_prefix=settings.EVENTS_CHANNEL_PREFIX,
+)
@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import ssl
+import time
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import text
+
+from src.conf.config import settings
+from src.database.db import DatabaseSessionManager, sessionmanager
+from src.services.redis import get_redis_client
+
+logger = logging.getLogger("src.services.health")
+
+Probe = Callable[[], Awaitable[None]]
+
+
+class ProbeResult:
+    """
+    Результат останньої перевірки однієї залежності.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.healthy = False
+        self.latency_ms: Optional[float] = None
+        self.checked_at: Optional[float] = None
+        self.last_success_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def is_fresh(self, max_age: float) -> bool:
+        """
+        Перевіряє, чи результат не застарів.
+
+        Args:
+            max_age (float): Максимальний вік результату, с.
+
+        Returns:
+            bool: True, якщо перевірка виконувалася не пізніше ``max_age`` секунд тому.
+        """
+        return self.checked_at is not None and time.monotonic() - self.checked_at <= max_age
+
+    def to_dict(self) -> dict:
+        now = time.monotonic()
+        return {
+            "healthy": self.healthy,
+            "latency_ms": self.latency_ms,
+            "age_seconds": None if self.checked_at is None else round(now - self.checked_at, 3),
+            "last_success_age_seconds": (
+                None if self.last_success_at is None else round(now - self.last_success_at, 3)
+            ),
+            "last_error": self.last_error,
+        }
+
+
+class HealthMonitor:
+    """
+    Фонова перевірка залежностей з кешуванням результатів.
+
+    Перевірки виконуються паралельно кожні ``interval`` секунд. Ендпоінти лише читають
+    кешовані результати, тож частота опитування балансувальником не впливає на
+    навантаження на БД, Redis чи SMTP.
+    """
+
+    def __init__(
+        self,
+        probes: dict[str, Probe],
+        required: tuple[str, ...] = ("db",),
+        interval: float = 10.0,
+        timeout: float = 2.0,
+    ):
+        """
+        Ініціалізація HealthMonitor.
+
+        Args:
+            probes (dict[str, Probe]): Назва залежності -> корутинна функція перевірки.
+            required (tuple[str, ...]): Залежності, без яких застосунок не готовий.
+            interval (float): Інтервал між перевірками, с.
+            timeout (float): Тайм-аут однієї перевірки, с.
+
+        Raises:
+            ValueError: Якщо серед обов'язкових є залежність без перевірки.
+        """
+        unknown = [name for name in required if name not in probes]
+        if unknown:
+            raise ValueError(
+                f"Unknown required health probes: {', '.join(unknown)} (available: {', '.join(probes)})"
+            )
+        self.probes = probes
+        self.required = required
+        self.interval = interval
+        self.timeout = timeout
+        self.results = {name: ProbeResult(name) for name in probes}
+        self._ready = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def max_age(self) -> float:
+        # Якщо фонова задача зупинилася, результати старіють і готовність зникає
+        return self.interval * 3 + self.timeout
+
+    @property
+    def ready(self) -> bool:
+        """
+        Готовність застосунку: усі обов'язкові залежності здорові за свіжими результатами.
+        """
+        return self._ready and all(self.results[name].is_fresh(self.max_age) for name in self.required)
+
+    async def _run_probe(self, name: str) -> None:
+        result = self.results[name]
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self.probes[name](), self.timeout)
+        except Exception as e:
+            result.healthy = False
+            result.last_error = f"{type(e).__name__}: {e}"
+        else:
+            result.healthy = True
+            result.last_success_at = time.monotonic()
+        result.latency_ms = round((time.perf_counter() - started) * 1000, 3)
+        result.checked_at = time.monotonic()
+
+    async def check_all(self) -> None:
+        """
+        Виконує всі перевірки паралельно й оновлює кеш.
+        """
+        await asyncio.gather(*(self._run_probe(name) for name in self.probes))
+        self._ready = all(self.results[name].healthy for name in self.required)
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.check_all()
+            except Exception:
+                logger.exception("Health check round failed")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """
+        Запускає фонову задачу перевірок у поточному event loop.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        """
+        Зупиняє фонову задачу перевірок.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> dict:
+        """
+        Повертає детальний стан усіх залежностей.
+
+        Returns:
+            dict: Загальна готовність та стан кожної залежності.
+        """
+        return {
+            "ready": self.ready,
+            "required": list(self.required),
+            "interval_seconds": self.interval,
+            "dependencies": {name: result.to_dict() for name, result in self.results.items()},
+        }
+
+
+async def _ping(manager: DatabaseSessionManager) -> None:
+    async with manager.read_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def check_database(manager: DatabaseSessionManager = sessionmanager) -> None:
+    """
+    Перевіряє основну базу та кожен шард ``DB_SHARD_URLS``.
+
+    Користувачі й контакти живуть на шардах, тож недоступний шард робить
+    застосунок неготовим так само, як і основна база.
+
+    Args:
+        manager (DatabaseSessionManager): Менеджер основної бази.
+
+    Raises:
+        ConnectionError: Якщо недоступна хоча б одна база; у повідомленні — які саме.
+    """
+    databases = {"primary": manager}
+    for index, shard in enumerate(manager.shards):
+        # Без шардування shards — це сам менеджер; шард з URL основної бази ділить її рушій
+        if shard is not manager:
+            databases[f"shard {index}"] = shard
+    results = await asyncio.gather(*(_ping(database) for database in databases.values()), return_exceptions=True)
+    failed = [
+        f"{name}: {type(error).__name__}: {error}"
+        for name, error in zip(databases, results)
+        if isinstance(error, Exception)
+    ]
+    if failed:
+        raise ConnectionError("; ".join(failed))
+
+
+async def check_redis() -> None:
+    client = await get_redis_client()
+    await client.ping()
+
+
+async def check_smtp() -> None:
+    # Лише з'єднання та привітання сервера (220), без автентифікації
+    context = ssl.create_default_context() if settings.MAIL_SSL_TLS else None
+    reader, writer = await asyncio.open_connection(settings.MAIL_SERVER, settings.MAIL_PORT, ssl=context)
+    try:
+        greeting = await reader.readline()
+        if not greeting.startswith(b"220"):
+            raise ConnectionError(f"Unexpected SMTP greeting: {greeting[:64]!r}")
+        writer.write(b"QUIT\r\n")
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+health_monitor = HealthMonitor(
+    probes={"db": check_database, "redis": check_redis, "smtp": check_smtp},
+    required=tuple(settings.HEALTH_REQUIRED_PROBES),
+    interval=settings.HEALTH_CHECK_INTERVAL_SECONDS,
+    timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,280 @@
+"""
+Службові задачі обслуговування бази даних.
+
+Очищення застарілих непідтверджених акаунтів і tombstone-записів видалених контактів
+можна запускати з командного рядка::
+
+    python -m src.services.maintenance purge-unconfirmed --days 7 --batch-size 500
+    python -m src.services.maintenance prune-tombstones --days 30
+    python -m src.services.maintenance birthday-digest --days 7
+    python -m src.services.maintenance dedup
+
+або як періодичні задачі застосунку (``PURGE_UNCONFIRMED_ENABLED=True``,
+``TOMBSTONE_PRUNE_ENABLED=True``, ``BIRTHDAY_DIGEST_ENABLED=True``,
+``DEDUP_ENABLED=True``). При шардуванні (``DB_SHARD_URLS``) задачі виконуються
+на кожному шарді по черзі. Дайджест
+днів народження в застосунку варто вмикати лише для одного воркера, інакше
+кожен воркер надішле власну копію; для кількох воркерів запускайте CLI з cron.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import delete, select
+
+from src.conf.config import settings
+from src.database.db import DatabaseSessionManager, route_session, sessionmanager
+from src.database.models import ContactTombstone, User
+from src.repository.users import UserRepository
+from src.services.birthdays import send_birthday_digests
+from src.services.dedup import DedupService, run_dedup
+
+logger = logging.getLogger("src.services.maintenance")
+
+
+@dataclass
+class PurgeReport:
+    """
+    Підсумок очищення непідтверджених акаунтів.
+    """
+
+    users: int = 0
+    contacts: int = 0
+    batches: int = 0
+    elapsed_seconds: float = 0.0
+
+
+async def purge_unconfirmed_users(
+    older_than_days: int = settings.PURGE_UNCONFIRMED_AFTER_DAYS,
+    batch_size: int = settings.PURGE_BATCH_SIZE,
+    pause_seconds: float = settings.PURGE_PAUSE_SECONDS,
+    max_batches: Optional[int] = None,
+    manager: DatabaseSessionManager = sessionmanager,
+) -> PurgeReport:
+    """
+    Видаляє непідтверджених користувачів, старших за ``older_than_days`` днів, пакетами.
+
+    Кожен пакет — окрема коротка транзакція з власним з'єднанням; між пакетами
+    задача поступається event loop і робить паузу, тож блокування не тримаються
+    довго, а обробка запитів не зупиняється.
+
+    Args:
+        older_than_days (int): Мінімальний вік акаунта, днів.
+        batch_size (int): Кількість користувачів у пакеті.
+        pause_seconds (float): Пауза між пакетами, с.
+        max_batches (Optional[int]): Обмеження кількості пакетів за один запуск.
+        manager (DatabaseSessionManager): Менеджер сесій бази даних.
+
+    Returns:
+        PurgeReport: Кількість видалених користувачів і контактів.
+    """
+    created_before = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=older_than_days)
+    report = PurgeReport()
+    started = time.perf_counter()
+    while max_batches is None or report.batches < max_batches:
+        async with manager.session() as db:
+            repository = UserRepository(db)
+            user_ids = await repository.get_stale_unconfirmed_ids(created_before, batch_size)
+            if not user_ids:
+                break
+            users, contacts = await repository.delete_unconfirmed_users(user_ids)
+            await db.commit()
+            if manager.directory is not None and users:
+                # Імена й email видалених користувачів звільняються в довіднику шардування
+                kept = set((await db.execute(select(User.id).where(User.id.in_(user_ids)))).scalars())
+                await manager.directory.unregister([user_id for user_id in user_ids if user_id not in kept])
+        report.users += users
+        report.contacts += contacts
+        report.batches += 1
+        if len(user_ids) < batch_size:
+            break
+        await asyncio.sleep(pause_seconds)
+    report.elapsed_seconds = round(time.perf_counter() - started, 3)
+    if report.users:
+        logger.info("Purged unconfirmed users: %s", json.dumps(asdict(report)))
+    return report
+
+
+async def prune_tombstones(
+    retention_days: float = settings.SYNC_TOKEN_TTL_DAYS,
+    batch_size: int = settings.PURGE_BATCH_SIZE,
+    pause_seconds: float = settings.PURGE_PAUSE_SECONDS,
+    manager: DatabaseSessionManager = sessionmanager,
+) -> int:
+    """
+    Видаляє tombstone-записи, старші за термін дії токенів синхронізації, пакетами.
+
+    Токени, видані раніше, вже вважаються застарілими, тож ці записи клієнтам
+    більше не потрібні.
+
+    Args:
+        retention_days (float): Термін зберігання, днів.
+        batch_size (int): Кількість записів у пакеті.
+        pause_seconds (float): Пауза між пакетами, с.
+        manager (DatabaseSessionManager): Менеджер сесій бази даних.
+
+    Returns:
+        int: Кількість видалених записів.
+    """
+    deleted_before = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=retention_days)
+    removed = 0
+    while True:
+        async with manager.session() as db:
+            ids = (
+                await db.execute(
+                    select(ContactTombstone.id)
+                    .where(ContactTombstone.deleted_at < deleted_before)
+                    .order_by(ContactTombstone.id)
+                    .limit(batch_size)
+                )
+            ).scalars().all()
+            if ids:
+                await db.execute(delete(ContactTombstone).where(ContactTombstone.id.in_(ids)))
+                await db.commit()
+        removed += len(ids)
+        if len(ids) < batch_size:
+            break
+        await asyncio.sleep(pause_seconds)
+    if removed:
+        logger.info("Pruned %s contact tombstones", removed)
+    return removed
+
+
+async def on_every_shard(
+    func: Callable[..., Awaitable], manager: DatabaseSessionManager = sessionmanager, **kwargs
+) -> list:
+    """
+    Виконує задачу обслуговування на кожному шарді по черзі.
+
+    Args:
+        func (Callable[..., Awaitable]): Задача з параметром ``manager``.
+        manager (DatabaseSessionManager): Менеджер основної бази; без шардування
+            задача виконується лише на ній.
+        **kwargs: Інші параметри задачі.
+
+    Returns:
+        list: Результати задачі для кожного шарда.
+    """
+    return [await func(manager=shard, **kwargs) for shard in manager.shards]
+
+
+class PeriodicTask:
+    """
+    Фонова задача, що виконує корутинну функцію з фіксованим інтервалом.
+    """
+
+    def __init__(self, name: str, func: Callable[[], Awaitable], interval: float):
+        """
+        Ініціалізація PeriodicTask.
+
+        Args:
+            name (str): Назва задачі для журналу.
+            func (Callable[[], Awaitable]): Корутинна функція без аргументів.
+            interval (float): Інтервал між запусками, с.
+        """
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.last_result = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                self.last_result = await self.func()
+            except Exception:
+                logger.exception("Periodic task %s failed", self.name)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """
+        Запускає задачу в поточному event loop.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        """
+        Зупиняє задачу.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+purge_task = PeriodicTask(
+    "purge_unconfirmed_users", partial(on_every_shard, purge_unconfirmed_users), settings.PURGE_INTERVAL_SECONDS
+)
+tombstone_task = PeriodicTask(
+    "prune_tombstones", partial(on_every_shard, prune_tombstones), settings.TOMBSTONE_PRUNE_INTERVAL_SECONDS
+)
+birthday_digest_task = PeriodicTask(
+    "birthday_digest", partial(on_every_shard, send_birthday_digests), settings.BIRTHDAY_DIGEST_INTERVAL_SECONDS
+)
+dedup_task = PeriodicTask(
+    "dedup_contacts", partial(on_every_shard, run_dedup), settings.DEDUP_INTERVAL_SECONDS
+)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Database maintenance tasks")
+    commands = parser.add_subparsers(dest="command", required=True)
+    purge = commands.add_parser("purge-unconfirmed", help="delete stale unconfirmed users")
+    purge.add_argument("--days", type=int, default=settings.PURGE_UNCONFIRMED_AFTER_DAYS)
+    purge.add_argument("--batch-size", type=int, default=settings.PURGE_BATCH_SIZE)
+    purge.add_argument("--pause", type=float, default=settings.PURGE_PAUSE_SECONDS)
+    purge.add_argument("--max-batches", type=int)
+    prune = commands.add_parser("prune-tombstones", help="delete expired contact tombstones")
+    prune.add_argument("--days", type=float, default=settings.SYNC_TOKEN_TTL_DAYS)
+    prune.add_argument("--batch-size", type=int, default=settings.PURGE_BATCH_SIZE)
+    prune.add_argument("--pause", type=float, default=settings.PURGE_PAUSE_SECONDS)
+    digest = commands.add_parser("birthday-digest", help="email upcoming birthdays to every user")
+    digest.add_argument("--days", type=int, default=settings.BIRTHDAY_DIGEST_DAYS)
+    digest.add_argument("--chunk-size", type=int, default=settings.BIRTHDAY_DIGEST_CHUNK_SIZE)
+    digest.add_argument("--batch-size", type=int, default=settings.BIRTHDAY_DIGEST_BATCH_SIZE)
+    dedup = commands.add_parser("dedup", help="find duplicate contacts of users with changes")
+    dedup.add_argument("--user-id", type=int, help="check a single user")
+    dedup.add_argument("--force", action="store_true", help="recheck all pairs of the user")
+    args = parser.parse_args(argv)
+
+    async def command(manager: DatabaseSessionManager) -> dict:
+        if args.command == "prune-tombstones":
+            return {"tombstones": await prune_tombstones(args.days, args.batch_size, args.pause, manager)}
+        if args.command == "birthday-digest":
+            report = await send_birthday_digests(
+                days=args.days, chunk_size=args.chunk_size, batch_size=args.batch_size, manager=manager
+            )
+            return {**asdict(report), "users_per_second": report.users_per_second}
+        if args.command == "dedup":
+            return await run_dedup(manager=manager)
+        report = await purge_unconfirmed_users(args.days, args.batch_size, args.pause, args.max_batches, manager)
+        return asdict(report)
+
+    async def run() -> dict:
+        try:
+            if args.command == "dedup" and args.user_id is not None:
+                async with sessionmanager.session() as db:
+                    await route_session(db, user_id=args.user_id)
+                    return {"pairs": await DedupService(db).refresh(args.user_id, force=args.force)}
+            results = await on_every_shard(command)
+            return {"shards": results} if sessionmanager.sharded else results[0]
+        finally:
+            await sessionmanager.close()
+
+    print(json.dumps(asyncio.run(run())))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
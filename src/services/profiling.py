@@ -0,0 +1,211 @@
+import asyncio
+import cProfile
+import hmac
+import json
+import logging
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from src.database.query_timer import QueryTimings, current_timings
+
+logger = logging.getLogger("src.services.profiling")
+
+# Функції, час у яких вважаємо серіалізацією відповіді
+_SERIALIZATION_MARKERS = ("serialize_response", "jsonable_encoder", "JSONResponse.render")
+# cProfile перехоплює весь потік, і в ньому може бути активний лише один профайлер
+_pstats_lock = threading.Lock()
+
+
+class _StackSampler(threading.Thread):
+    """
+    Потік, що періодично знімає стек потоку event loop, поки виконується задача запиту.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, task: asyncio.Task, interval: float):
+        super().__init__(daemon=True)
+        self.loop = loop
+        self.task = task
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+        self.frames: dict[tuple, int] = {}
+        self.samples: list[list[int]] = []
+        self.idle_samples = 0
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            # Семпли інших задач відкидаємо, щоб профіль стосувався лише цього запиту
+            if asyncio.current_task(self.loop) is not self.task:
+                self.idle_samples += 1
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                key = (code.co_qualname, code.co_filename, code.co_firstlineno)
+                stack.append(self.frames.setdefault(key, len(self.frames)))
+                frame = frame.f_back
+            stack.reverse()
+            self.samples.append(stack)
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+    def serialization_samples(self) -> int:
+        marked = {
+            index for (name, _, _), index in self.frames.items()
+            if name.endswith(_SERIALIZATION_MARKERS)
+        }
+        return sum(1 for stack in self.samples if marked.intersection(stack))
+
+    def to_speedscope(self, name: str) -> dict:
+        interval_ms = self.interval * 1000
+        frames = [None] * len(self.frames)
+        for (qualname, filename, line), index in self.frames.items():
+            frames[index] = {"name": qualname, "file": filename, "line": line}
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "goit-pythonweb-hw-12",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": interval_ms * len(self.samples),
+                    "samples": self.samples,
+                    "weights": [interval_ms] * len(self.samples),
+                }
+            ],
+        }
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware для профілювання окремих запитів на вимогу.
+
+    Запит профілюється, якщо заголовок ``header_name`` містить ``token`` або
+    за випадковою вибіркою з імовірністю ``sample_rate``. Формат "speedscope" —
+    статистичний профіль лише задачі цього запиту; "pstats" — cProfile, який
+    охоплює весь потік, тож паралельні запити також потраплять у результат.
+    Одночасно активний лише один pstats-профіль: запити, що надійшли під час
+    нього, виконуються без профілювання.
+    """
+
+    def __init__(
+        self,
+        app,
+        output_dir: Path,
+        token: str = "",
+        header_name: str = "x-profile-token",
+        sample_rate: float = 0.0,
+        interval_ms: float = 1.0,
+        fmt: str = "speedscope",
+    ):
+        """
+        Ініціалізація ProfilingMiddleware.
+
+        Args:
+            app: ASGI-застосунок.
+            output_dir (Path): Каталог для збереження профілів.
+            token (str): Секрет, що вмикає профілювання через заголовок. Порожній — вимкнено.
+            header_name (str): Назва заголовка з токеном.
+            sample_rate (float): Частка запитів, що профілюються випадково (0..1).
+            interval_ms (float): Інтервал семплування, мс.
+            fmt (str): Формат результату: "speedscope" або "pstats".
+        """
+        if fmt not in ("speedscope", "pstats"):
+            raise ValueError(f"Unknown profile format: {fmt}")
+        self.app = app
+        self.output_dir = Path(output_dir)
+        self.token = token.encode()
+        self.header_name = header_name.lower().encode()
+        self.sample_rate = sample_rate
+        self.interval = interval_ms / 1000
+        self.fmt = fmt
+
+    def _should_profile(self, scope) -> bool:
+        if self.token:
+            for name, value in scope["headers"]:
+                if name == self.header_name and hmac.compare_digest(value, self.token):
+                    return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+        if self.fmt == "pstats":
+            profiler = self._start_pstats()
+            if profiler is None:
+                await self.app(scope, receive, send)
+                return
+
+        timings = QueryTimings()
+        token = current_timings.set(timings)
+        name = f"{scope['method']} {scope['path']}"
+        started = time.perf_counter()
+        if self.fmt != "pstats":
+            sampler = _StackSampler(asyncio.get_running_loop(), asyncio.current_task(), self.interval)
+            sampler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            wall_ms = (time.perf_counter() - started) * 1000
+            current_timings.reset(token)
+            summary = {
+                "event": "request_profile",
+                "route": name,
+                "wall_ms": round(wall_ms, 3),
+                "db_ms": round(timings.db_ms, 3),
+                "db_queries": timings.db_queries,
+            }
+            if self.fmt == "pstats":
+                profiler.disable()
+                _pstats_lock.release()
+                path = self._path(scope, "pstats")
+                await asyncio.to_thread(self._write_pstats, profiler, path)
+            else:
+                sampler.stop()
+                interval_ms = self.interval * 1000
+                summary["cpu_ms"] = round(len(sampler.samples) * interval_ms, 3)
+                summary["serialization_ms"] = round(sampler.serialization_samples() * interval_ms, 3)
+                path = self._path(scope, "speedscope.json")
+                await asyncio.to_thread(self._write_json, sampler.to_speedscope(name), path)
+            summary["file"] = str(path)
+            logger.info(json.dumps(summary, ensure_ascii=False), extra={"request_profile": summary})
+
+    @staticmethod
+    def _start_pstats() -> Optional[cProfile.Profile]:
+        if not _pstats_lock.acquire(blocking=False):
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Потік уже профілює інший інструмент (sys.monitoring зайнятий)
+            _pstats_lock.release()
+            return None
+        return profiler
+
+    def _path(self, scope, suffix: str) -> Path:
+        slug = re.sub(r"[^\w]+", "_", scope["path"]).strip("_") or "root"
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        return self.output_dir / f"{stamp}-{scope['method']}-{slug}-{uuid.uuid4().hex[:8]}.{suffix}"
+
+    def _write_json(self, data: dict, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data), encoding="utf-8")
+
+    def _write_pstats(self, profiler: cProfile.Profile, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(path)
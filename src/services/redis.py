@@ -1,9 +1,34 @@
-import redis.asyncio as redis
-from fastapi import Depends
 from src.conf.config import settings
 
-# Підключення до Redis
+_client = None
+
+
 async def get_redis_client():
-    redis = aioredis.from_url("redis://localhost:6379", encoding="utf-8", decode_responses=True)
-    return redis
-  
+    """
+    Повертає спільний асинхронний клієнт Redis, створюючи його при першому виклику.
+
+    Імпорт redis.asyncio відкладено до першого звернення, щоб не сповільнювати старт.
+
+    Returns:
+        redis.asyncio.Redis: Клієнт Redis.
+    """
+    global _client
+    if _client is None:
+        import redis.asyncio as redis
+
+        _client = redis.from_url(
+            f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}",
+            encoding="utf-8",
+            decode_responses=True,
+        )
+    return _client
+
+
+async def close_redis_client() -> None:
+    """
+    Закриває спільний клієнт Redis, якщо його було створено.
+    """
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,444 @@
+import asyncio
+import re
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.conf.config import settings
+from src.database.models import Contact
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def trigrams(text: str) -> frozenset[str]:
+    """
+    Розбиває текст на триграми так само, як pg_trgm.
+
+    Кожне слово переводиться в нижній регістр і доповнюється двома пробілами
+    спереду та одним ззаду, тож "John" дає "  j", " jo", "joh", "ohn", "hn ".
+
+    Args:
+        text (str): Вхідний текст.
+
+    Returns:
+        frozenset[str]: Множина триграм.
+    """
+    grams = set()
+    for word in _WORD.findall(text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def similarity(left: frozenset[str], right: frozenset[str]) -> float:
+    """
+    Схожість двох множин триграм (коефіцієнт Жаккара, як ``similarity()`` у pg_trgm).
+
+    Args:
+        left (frozenset[str]): Перша множина.
+        right (frozenset[str]): Друга множина.
+
+    Returns:
+        float: Значення від 0 до 1.
+    """
+    if not left or not right:
+        return 0.0
+    shared = len(left & right)
+    return shared / (len(left) + len(right) - shared)
+
+
+class TrigramIndex:
+    """
+    Інвертований індекс триграм для контактів одного користувача.
+
+    Для кожної триграми зберігається множина ідентифікаторів контактів. Пошук
+    підраховує спільні триграми лише для кандидатів з posting-списків запиту, тож
+    час залежить від кількості збігів, а не від розміру адресної книги.
+    """
+
+    def __init__(self):
+        self._docs: dict[int, frozenset[str]] = {}
+        self._postings: dict[str, set[int]] = {}
+        self.built_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, doc_id: int, text: str) -> None:
+        """
+        Додає або оновлює документ.
+
+        Args:
+            doc_id (int): Ідентифікатор контакту.
+            text (str): Текст для індексації.
+        """
+        if doc_id in self._docs:
+            self.remove(doc_id)
+        grams = trigrams(text)
+        self._docs[doc_id] = grams
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(doc_id)
+
+    def remove(self, doc_id: int) -> None:
+        """
+        Видаляє документ з індексу, якщо він є.
+
+        Args:
+            doc_id (int): Ідентифікатор контакту.
+        """
+        grams = self._docs.pop(doc_id, None)
+        if grams is None:
+            return
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(doc_id)
+                if not posting:
+                    del self._postings[gram]
+
+    def search(self, query: str, threshold: float = 0.3, limit: Optional[int] = None) -> list[tuple[int, float]]:
+        """
+        Шукає документи, схожі на запит.
+
+        Args:
+            query (str): Рядок запиту.
+            threshold (float): Мінімальна схожість.
+            limit (Optional[int]): Максимальна кількість результатів.
+
+        Returns:
+            list[tuple[int, float]]: Пари (ідентифікатор, схожість) за спаданням схожості.
+        """
+        grams = trigrams(query)
+        if not grams:
+            return []
+        shared: dict[int, int] = {}
+        for gram in grams:
+            for doc_id in self._postings.get(gram, ()):
+                shared[doc_id] = shared.get(doc_id, 0) + 1
+
+        size = len(grams)
+        # Верхня межа схожості shared / size дозволяє відкинути кандидатів без доступу до документа
+        minimum = threshold * size
+        docs = self._docs
+        scored = []
+        for doc_id, count in shared.items():
+            if count < minimum:
+                continue
+            score = count / (size + len(docs[doc_id]) - count)
+            if score >= threshold:
+                scored.append((doc_id, score))
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:limit] if limit is not None else scored
+
+
+def contact_text(first_name: str, last_name: str) -> str:
+    return f"{first_name} {last_name}"
+
+
+class PrefixIndex:
+    """
+    Індекс префіксів для автодоповнення контактів одного користувача.
+
+    Ключі (ім'я, прізвище, повне ім'я та email у нижньому регістрі) зберігаються
+    у відсортованому масиві пар (ключ, ідентифікатор); пошук префікса — це bisect
+    і послідовний прохід до першого ключа, що не починається з префікса.
+    """
+
+    def __init__(self):
+        self._keys: list[tuple[str, int]] = []
+        self._docs: dict[int, tuple[str, str, tuple[str, ...]]] = {}
+        self.built_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    @staticmethod
+    def _terms(first_name: str, last_name: str, email: str) -> tuple[str, ...]:
+        terms = {first_name.lower(), last_name.lower(), contact_text(first_name, last_name).lower(), email.lower()}
+        return tuple(term for term in terms if term)
+
+    def add(self, doc_id: int, first_name: str, last_name: str, email: str) -> None:
+        """
+        Додає або оновлює контакт.
+
+        Args:
+            doc_id (int): Ідентифікатор контакту.
+            first_name (str): Ім'я.
+            last_name (str): Прізвище.
+            email (str): Email.
+        """
+        if doc_id in self._docs:
+            self.remove(doc_id)
+        terms = self._terms(first_name, last_name, email)
+        self._docs[doc_id] = (contact_text(first_name, last_name), email, terms)
+        for term in terms:
+            insort(self._keys, (term, doc_id))
+
+    def extend(self, rows: Iterable[tuple[int, str, str, str]]) -> None:
+        """
+        Додає багато контактів з одним сортуванням замість вставки по одному.
+
+        Args:
+            rows (Iterable[tuple[int, str, str, str]]): Рядки (id, ім'я, прізвище, email).
+        """
+        for doc_id, first_name, last_name, email in rows:
+            terms = self._terms(first_name, last_name, email)
+            self._docs[doc_id] = (contact_text(first_name, last_name), email, terms)
+            self._keys.extend((term, doc_id) for term in terms)
+        self._keys.sort()
+
+    def remove(self, doc_id: int) -> None:
+        """
+        Видаляє контакт з індексу, якщо він є.
+
+        Args:
+            doc_id (int): Ідентифікатор контакту.
+        """
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return
+        for term in doc[2]:
+            position = bisect_left(self._keys, (term, doc_id))
+            if position < len(self._keys) and self._keys[position] == (term, doc_id):
+                del self._keys[position]
+
+    def complete(self, prefix: str, limit: int = 10) -> list[tuple[int, str, str]]:
+        """
+        Повертає контакти, ім'я, прізвище або email яких починається з префікса.
+
+        Args:
+            prefix (str): Префікс без урахування регістру.
+            limit (int): Максимальна кількість результатів.
+
+        Returns:
+            list[tuple[int, str, str]]: Трійки (id, відображуване ім'я, email) в
+            алфавітному порядку ключа, що збігся.
+        """
+        prefix = prefix.lower().strip()
+        if not prefix:
+            return []
+        keys = self._keys
+        found: dict[int, None] = {}
+        position = bisect_left(keys, (prefix,))
+        while position < len(keys) and len(found) < limit:
+            term, doc_id = keys[position]
+            if not term.startswith(prefix):
+                break
+            found[doc_id] = None
+            position += 1
+        return [(doc_id, *self._docs[doc_id][:2]) for doc_id in found]
+
+
+class UserIndexCache(ABC):
+    """
+    Реєстр індексів контактів за користувачами з обмеженим розміром (LRU).
+
+    Індекс користувача будується при першому зверненні й далі оновлюється
+    інкрементно при створенні, зміні та видаленні контактів. Оскільки кожен процес
+    має власний реєстр, індекс перебудовується після ``ttl`` секунд, щоб підхопити
+    зміни, зроблені іншими воркерами. Підкласи визначають ``build`` і ``add``.
+    """
+
+    # Колонки контактів, з яких будується індекс (передаються в ``build``)
+    columns = (Contact.id, Contact.first_name, Contact.last_name, Contact.email)
+
+    def __init__(self, max_users: int = 1000, ttl: float = 300.0):
+        """
+        Ініціалізація реєстру.
+
+        Args:
+            max_users (int): Максимальна кількість індексів у пам'яті.
+            ttl (float): Час життя індексу, с.
+        """
+        self.max_users = max_users
+        self.ttl = ttl
+        self.builds = 0
+        self._indexes: OrderedDict = OrderedDict()
+        self._locks: dict[int, asyncio.Lock] = {}
+        # Скільки задач тримають або чекають замок; замок видаляється, коли їх не лишилося
+        self._lock_users: dict[int, int] = {}
+        # Лічильник змін контактів користувачів, чий індекс саме будується
+        self._changes: dict[int, int] = {}
+
+    @staticmethod
+    @abstractmethod
+    def build(rows: Iterable[tuple]):
+        """
+        Будує індекс користувача з рядків ``columns``.
+
+        Args:
+            rows (Iterable[tuple]): Рядки контактів користувача.
+
+        Returns:
+            Новий індекс.
+        """
+
+    @staticmethod
+    @abstractmethod
+    def add(index, contact: Contact) -> None:
+        """
+        Додає контакт до індексу або замінює наявний з тим самим id.
+
+        Args:
+            index: Індекс користувача.
+            contact (Contact): Збережений контакт.
+        """
+
+    def _fresh(self, user_id: int):
+        index = self._indexes.get(user_id)
+        if index is None:
+            return None
+        if time.monotonic() - index.built_at > self.ttl:
+            del self._indexes[user_id]
+            return None
+        self._indexes.move_to_end(user_id)
+        return index
+
+    async def get(self, db: AsyncSession, user_id: int):
+        """
+        Повертає індекс користувача, будуючи його за потреби.
+
+        Одночасно індекс користувача будує лише одна задача. Якщо під час побудови
+        контакти користувача змінилися, вибірка могла їх не побачити, тож індекс
+        будується ще раз; якщо й він застарів, його не кешуємо.
+
+        Args:
+            db (AsyncSession): Сесія бази даних.
+            user_id (int): Ідентифікатор користувача.
+
+        Returns:
+            Індекс контактів користувача.
+        """
+        index = self._fresh(user_id)
+        if index is not None:
+            return index
+        lock = self._locks.setdefault(user_id, asyncio.Lock())
+        self._lock_users[user_id] = self._lock_users.get(user_id, 0) + 1
+        try:
+            async with lock:
+                index = self._fresh(user_id)
+                if index is None:
+                    index = await self._build(db, user_id)
+        finally:
+            self._lock_users[user_id] -= 1
+            if not self._lock_users[user_id]:
+                del self._lock_users[user_id], self._locks[user_id]
+        return index
+
+    async def _build(self, db: AsyncSession, user_id: int):
+        self._changes[user_id] = 0
+        try:
+            for _ in range(2):
+                seen = self._changes[user_id]
+                rows = await db.execute(select(*self.columns).where(Contact.user_id == user_id))
+                index = self.build(rows.all())
+                self.builds += 1
+                if self._changes[user_id] == seen:
+                    self._store(user_id, index)
+                    break
+        finally:
+            del self._changes[user_id]
+        return index
+
+    def _store(self, user_id: int, index) -> None:
+        self._indexes[user_id] = index
+        self._indexes.move_to_end(user_id)
+        while len(self._indexes) > self.max_users:
+            self._indexes.popitem(last=False)
+
+    def upsert(self, contact: Contact) -> None:
+        """
+        Оновлює контакт в уже побудованому індексі власника.
+
+        Args:
+            contact (Contact): Збережений контакт.
+        """
+        self._changed(contact.user_id)
+        index = self._indexes.get(contact.user_id)
+        if index is not None:
+            self.add(index, contact)
+
+    def remove(self, user_id: Optional[int], contact_id: int) -> None:
+        """
+        Видаляє контакт з уже побудованого індексу користувача.
+        """
+        self._changed(user_id)
+        index = self._indexes.get(user_id)
+        if index is not None:
+            index.remove(contact_id)
+
+    def _changed(self, user_id: Optional[int]) -> None:
+        if user_id in self._changes:
+            self._changes[user_id] += 1
+
+    def clear(self) -> None:
+        self._indexes.clear()
+
+
+class ContactSearchIndex(UserIndexCache):
+    """
+    Реєстр індексів триграм для нечіткого пошуку.
+    """
+
+    @staticmethod
+    def build(rows: Iterable[tuple[int, str, str, str]]) -> TrigramIndex:
+        index = TrigramIndex()
+        for doc_id, first_name, last_name, *_ in rows:
+            index.add(doc_id, contact_text(first_name, last_name))
+        return index
+
+    @staticmethod
+    def add(index: TrigramIndex, contact: Contact) -> None:
+        index.add(contact.id, contact_text(contact.first_name, contact.last_name))
+
+
+class ContactPrefixIndex(UserIndexCache):
+    """
+    Реєстр індексів префіксів для автодоповнення.
+    """
+
+    @staticmethod
+    def build(rows: Iterable[tuple[int, str, str, str]]) -> PrefixIndex:
+        index = PrefixIndex()
+        index.extend(rows)
+        return index
+
+    @staticmethod
+    def add(index: PrefixIndex, contact: Contact) -> None:
+        index.add(contact.id, contact.first_name, contact.last_name, contact.email)
+
+
+contact_search = ContactSearchIndex(
+    max_users=settings.FUZZY_INDEX_MAX_USERS, ttl=settings.FUZZY_INDEX_TTL_SECONDS
+)
+contact_prefixes = ContactPrefixIndex(
+    max_users=settings.AUTOCOMPLETE_MAX_USERS, ttl=settings.AUTOCOMPLETE_TTL_SECONDS
+)
+
+
+def index_contact(contact: Contact) -> None:
+    """
+    Оновлює контакт в усіх побудованих індексах його власника.
+
+    Args:
+        contact (Contact): Збережений контакт.
+    """
+    for registry in (contact_search, contact_prefixes):
+        registry.upsert(contact)
+
+
+def unindex_contact(user_id: Optional[int], contact_id: int) -> None:
+    """
+    Видаляє контакт з усіх побудованих індексів власника.
+
+    Args:
+        user_id (Optional[int]): Власник контакту.
+        contact_id (int): Ідентифікатор контакту.
+    """
+    for registry in (contact_search, contact_prefixes):
+        registry.remove(user_id, contact_id)
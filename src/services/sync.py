@@ -0,0 +1,73 @@
+import base64
+import binascii
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from src.conf.config import settings
+
+
+class SyncTokenError(ValueError):
+    """
+    Некоректний токен синхронізації.
+    """
+
+
+class SyncTokenExpired(SyncTokenError):
+    """
+    Токен старший за термін зберігання tombstone-записів: потрібна повна синхронізація.
+    """
+
+
+@dataclass(frozen=True)
+class SyncToken:
+    """
+    Позиція клієнта в журналі змін: послідовність змін та час видачі першого токена.
+    """
+
+    seq: int
+    issued_at: int
+
+
+def encode_sync_token(token: SyncToken) -> str:
+    """
+    Кодує токен синхронізації в непрозорий рядок.
+
+    Args:
+        token (SyncToken): Позиція в журналі змін.
+
+    Returns:
+        str: Рядок для передачі клієнту.
+    """
+    raw = f"v1.{token.seq}.{token.issued_at}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_sync_token(value: str, ttl_days: Optional[float] = None, now: Optional[float] = None) -> SyncToken:
+    """
+    Розбирає та перевіряє токен синхронізації.
+
+    Args:
+        value (str): Рядок токена від клієнта.
+        ttl_days (Optional[float]): Термін дії токена, днів. За замовчуванням ``SYNC_TOKEN_TTL_DAYS``.
+        now (Optional[float]): Поточний час (Unix), для тестів.
+
+    Returns:
+        SyncToken: Позиція в журналі змін.
+
+    Raises:
+        SyncTokenError: Якщо токен пошкоджений.
+        SyncTokenExpired: Якщо токен застарів і tombstone-записи могли бути видалені.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)).decode()
+        version, seq, issued_at = raw.split(".")
+        if version != "v1":
+            raise ValueError(version)
+        token = SyncToken(int(seq), int(issued_at))
+    except (ValueError, UnicodeDecodeError, binascii.Error) as e:
+        raise SyncTokenError("Invalid sync token") from e
+    ttl = (settings.SYNC_TOKEN_TTL_DAYS if ttl_days is None else ttl_days) * 86400
+    if (time.time() if now is None else now) - token.issued_at > ttl:
+        raise SyncTokenExpired("Sync token expired, full resync required")
+    return token
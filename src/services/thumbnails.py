@@ -0,0 +1,46 @@
+"""
+Мініатюри аватарів, що генеруються в процесах пулу.
+
+Модуль не імпортує налаштувань і залежностей застосунку: процес пулу, запущений
+через spawn, завантажує лише його та Pillow.
+"""
+from pathlib import Path
+
+
+def make_thumbnails(source: str, target_dir: str, sizes: list[int]) -> list[str]:
+    """
+    Зменшує зображення до квадратів зі стороною ``sizes`` і зберігає їх у JPEG.
+
+    Мініатюри робляться від більшої до меншої, кожна з попередньої. Для
+    анімованих зображень береться перший кадр, орієнтація з EXIF застосовується.
+
+    Args:
+        source (str): Шлях до завантаженого зображення.
+        target_dir (str): Каталог для мініатюр.
+        sizes (list[int]): Сторони мініатюр, пікселів.
+
+    Returns:
+        list[str]: Шляхи до мініатюр ``<size>.jpg`` від більшої до меншої.
+
+    Raises:
+        ValueError: Якщо зображення не вдається прочитати.
+    """
+    from PIL import Image, ImageOps
+
+    sizes = sorted(sizes, reverse=True)
+    paths = []
+    try:
+        with Image.open(source) as image:
+            # Декодер JPEG одразу зменшує зображення в 2-8 разів, якщо це дозволяє розмір
+            image.draft("RGB", (sizes[0], sizes[0]))
+            image = ImageOps.exif_transpose(image).convert("RGB")
+            for size in sizes:
+                image.thumbnail((size, size), Image.Resampling.LANCZOS)
+                path = Path(target_dir) / f"{size}.jpg"
+                image.save(path, "JPEG", quality=85, optimize=True)
+                paths.append(str(path))
+    except Exception as e:
+        # Помилки Pillow (UnidentifiedImageError, DecompressionBombError, обрізаний файл)
+        # мають різні типи; викликаючій стороні достатньо знати, що файл не зображення
+        raise ValueError(f"Cannot read image: {e}") from None
+    return paths
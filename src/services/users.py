@@ -1,6 +1,6 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from libgravatar import Gravatar
 
+from src.database.db import allocate_user, release_session, route_session
 from src.repository.users import UserRepository
 from src.schemas.users import UserCreate
 
@@ -18,8 +18,15 @@ class UserService:
         Args:
             db (AsyncSession): Асинхронна сесія бази даних.
         """
+        self.db = db
         self.repository = UserRepository(db)
 
+    async def _release(self, value):
+        # Користувач уже завантажений, з'єднання повертаємо до пулу одразу
+        # (зокрема до перевірки пароля bcrypt під час входу)
+        await release_session(self.db)
+        return value
+
     async def create_user(self, body: UserCreate):
         """
         Створює нового користувача та генерує аватар за допомогою Gravatar.
@@ -30,6 +37,8 @@ class UserService:
         Returns:
             User: Створений користувач.
         """
+        from libgravatar import Gravatar
+
         avatar = None
         try:
             g = Gravatar(body.email)
@@ -37,7 +46,16 @@ class UserService:
         except Exception as e:
             print(e)
 
-        return await self.repository.create_user(body, avatar)
+        # При шардуванні користувач отримує глобальний id з довідника, а сесія —
+        # шард, на якому він житиме
+        user_id = await allocate_user(self.db, body.username, body.email)
+        try:
+            user = await self.repository.create_user(body, avatar, user_id)
+        except Exception:
+            if user_id is not None:
+                await self.db.manager.directory.unregister([user_id])
+            raise
+        return await self._release(user)
 
     async def get_user_by_id(self, user_id: int):
         """
@@ -49,7 +67,9 @@ class UserService:
         Returns:
             Optional[User]: Об'єкт користувача або None, якщо не знайдено.
         """
-        return await self.repository.get_user_by_id(user_id)
+        if not await route_session(self.db, user_id=user_id):
+            return None
+        return await self._release(await self.repository.get_user_by_id(user_id))
 
     async def get_user_by_username(self, username: str):
         """
@@ -61,7 +81,9 @@ class UserService:
         Returns:
             Optional[User]: Об'єкт користувача або None, якщо не знайдено.
         """
-        return await self.repository.get_user_by_username(username)
+        if not await route_session(self.db, username=username):
+            return None
+        return await self._release(await self.repository.get_user_by_username(username))
 
     async def get_user_by_email(self, email: str):
         """
@@ -73,7 +95,9 @@ class UserService:
         Returns:
             Optional[User]: Об'єкт користувача або None, якщо не знайдено.
         """
-        return await self.repository.get_user_by_email(email)
+        if not await route_session(self.db, email=email):
+            return None
+        return await self._release(await self.repository.get_user_by_email(email))
 
     async def confirmed_email(self, email: str) -> None:
         """
@@ -82,7 +106,9 @@ class UserService:
         Args:
             email (str): Email користувача.
         """
-        return await self.repository.confirmed_email(email)
+        if not await route_session(self.db, email=email):
+            return None
+        return await self._release(await self.repository.confirmed_email(email))
 
     async def update_avatar(self, user_id: int, avatar_url: str):
         """
@@ -95,9 +121,11 @@ class UserService:
         Returns:
             Optional[User]: Оновлений користувач або None, якщо користувач не знайдений.
         """
+        if not await route_session(self.db, user_id=user_id):
+            return None
         user = await self.repository.get_user_by_id(user_id)
         if user:
             user.avatar = avatar_url
             await self.repository.update_user(user)
-            return user
-        return None
+            return await self._release(user)
+        return await self._release(None)
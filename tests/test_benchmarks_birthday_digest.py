@@ -0,0 +1,13 @@
+import pytest
+
+from benchmarks.birthday_digest import run
+
+
+@pytest.mark.asyncio
+async def test_run_reports_projection():
+    result = await run(users=20, contacts=500, chunk_size=50, target_users=100, rate_per_second=10)
+
+    report = result["report"]
+    assert report["users"] > 0
+    assert report["sent"] == report["users"]
+    assert result["projection"]["send_seconds"] == pytest.approx(report["users"] * 5 / 10, abs=0.1)
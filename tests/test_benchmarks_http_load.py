@@ -0,0 +1,44 @@
+import pytest
+
+from benchmarks.http_load import compare, percentile, run
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile([], 99) == 0.0
+
+
+def test_compare_flags_regressions():
+    baseline = {"routes": {"GET /api/healthchecker": {"rps": 100, "p95_ms": 10, "p99_ms": 20}}}
+    current = {"routes": {"GET /api/healthchecker": {"rps": 80, "p95_ms": 10.5, "p99_ms": 30}}}
+
+    regressions = compare(current, baseline, tolerance=0.1)
+
+    assert len(regressions) == 2
+    assert regressions[0].startswith("GET /api/healthchecker: rps")
+    assert "p99_ms" in regressions[1]
+
+
+@pytest.mark.asyncio
+async def test_run_reports_every_route(tmp_path):
+    report = await run(
+        f"sqlite+aiosqlite:///{tmp_path / 'bench.db'}",
+        contacts=50,
+        profile="read",
+        duration=0.5,
+        concurrency=2,
+    )
+
+    assert set(report["routes"]) == {
+        "GET /api/contacts/",
+        "GET /api/contacts/birthdays",
+        "GET /api/users/me",
+        "GET /api/healthchecker",
+        "POST /api/auth/login",
+    }
+    assert report["total"]["requests"] > 0
+    assert report["routes"]["GET /api/contacts/"]["errors"] == 0
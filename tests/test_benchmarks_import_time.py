@@ -0,0 +1,30 @@
+import subprocess
+import sys
+
+from benchmarks.import_time import build_report, parse_importtime
+
+SAMPLE = """import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     src.conf
+import time:      2000 |       5000 |   src.api.auth
+import time:      3000 |      10000 | main
+"""
+
+
+def test_parse_and_report():
+    modules = parse_importtime(SAMPLE)
+
+    assert modules["src.api.auth"] == {"self_ms": 2.0, "cumulative_ms": 5.0, "depth": 1}
+    report = build_report([modules, modules], "main")
+    assert report["total_ms"] == 10.0
+    assert report["packages_ms"]["src"] == 2.1
+    assert list(report["modules"])[0] == "main"
+
+
+def test_heavy_subsystems_are_not_imported_with_app():
+    code = (
+        "import sys, main; "
+        "print(','.join(m for m in ('fastapi_mail', 'passlib', 'jose', 'libgravatar', 'redis') if m in sys.modules))"
+    )
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+    assert completed.stdout.strip() == ""
@@ -0,0 +1,22 @@
+from benchmarks.micro import compare, measure, run
+
+
+def test_measure_reports_stable_statistics():
+    result = measure(lambda: sum(range(100)), repeat=3, min_time=0.01)
+
+    assert result["repeat"] == 3
+    assert result["loops"] >= 1
+    assert 0 < result["min_us"] <= result["median_us"]
+
+
+def test_run_filters_benchmarks():
+    report = run("access_token", repeat=2, min_time=0.01)
+
+    assert list(report["results"]) == ["access_token_create_decode"]
+
+
+def test_compare_uses_median():
+    baseline = {"results": {"a": {"median_us": 10.0}, "b": {"median_us": 10.0}}}
+    current = {"results": {"a": {"median_us": 10.5}, "b": {"median_us": 12.0}}}
+
+    assert compare(current, baseline, tolerance=0.1) == ["b: median 12.0us > 10.0us"]
@@ -0,0 +1,13 @@
+import pytest
+
+from benchmarks.sqlite_profile import run
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", ["default", "sqlite_profile"])
+async def test_run_reports_reads_and_writes(mode):
+    report = await run(mode, contacts=50, duration=0.5, concurrency=4, write_ratio=0.5)
+
+    assert set(report["routes"]) == {"read", "create", "update"}
+    assert report["total"]["requests"] > 0
+    assert report["config"]["mode"] == mode
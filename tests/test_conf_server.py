@@ -0,0 +1,55 @@
+import pytest
+
+from src.conf import server
+from src.conf.config import settings
+
+
+def test_dev_mode_uses_single_reloading_process():
+    options = server.uvicorn_options(settings.model_copy(update={"SERVER_MODE": "dev"}))
+
+    assert options["reload"] is True
+    assert options["workers"] == 1
+
+
+def test_prod_mode_sizes_workers_and_picks_fast_loop(monkeypatch):
+    monkeypatch.setattr(server, "available_cpus", lambda: 6)
+    monkeypatch.setattr(server, "has_module", lambda name: name in ("uvloop", "httptools"))
+    config = settings.model_copy(update={"SERVER_MODE": "prod", "SERVER_LIMIT_MAX_REQUESTS": 1000})
+
+    options = server.uvicorn_options(config)
+
+    assert options["reload"] is False
+    assert options["workers"] == 6
+    assert options["loop"] == "uvloop"
+    assert options["http"] == "httptools"
+    assert options["limit_max_requests"] == 1000
+
+
+def test_prod_mode_falls_back_without_optional_packages(monkeypatch):
+    monkeypatch.setattr(server, "has_module", lambda name: False)
+    config = settings.model_copy(update={"SERVER_MODE": "prod", "SERVER_WORKERS": 3})
+
+    options = server.uvicorn_options(config)
+
+    assert options["workers"] == 3
+    assert (options["loop"], options["http"]) == ("asyncio", "h11")
+
+
+def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        server.uvicorn_options(settings.model_copy(update={"SERVER_MODE": "staging"}))
+
+
+@pytest.mark.parametrize("workers, cpus", [(1, 8), (0, 1)])
+def test_prod_mode_single_worker_never_limits_requests(monkeypatch, caplog, workers, cpus):
+    monkeypatch.setattr(server, "available_cpus", lambda: cpus)
+    config = settings.model_copy(
+        update={"SERVER_MODE": "prod", "SERVER_WORKERS": workers, "SERVER_LIMIT_MAX_REQUESTS": 1000}
+    )
+
+    with caplog.at_level("WARNING", logger="src.conf.server"):
+        options = server.uvicorn_options(config)
+
+    assert options["workers"] == 1
+    assert "limit_max_requests" not in options
+    assert "SERVER_LIMIT_MAX_REQUESTS is ignored" in caplog.text
@@ -0,0 +1,149 @@
+import pytest
+from sqlalchemy import Column, Integer, String, create_engine, func, inspect, select, text
+
+from src.database.online_migrations import (
+    add_column_online,
+    backfill,
+    checkpoints,
+    copy_rows,
+    reconcile_rows,
+    create_index_online,
+    reset_checkpoint,
+    set_not_null_online,
+)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrate.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT, slug TEXT)"))
+        # Прогалини в ключах не повинні давати порожніх пакетів
+        conn.execute(
+            text("INSERT INTO items (id, name) VALUES (:id, :name)"),
+            [{"id": i * 3, "name": f"Item {i}"} for i in range(1, 101)],
+        )
+    yield engine
+    engine.dispose()
+
+
+def _slug(row):
+    return {"slug": row.name.lower().replace(" ", "-")}
+
+
+def test_backfill_with_sql_expression(engine):
+    batches = []
+    with engine.connect() as conn:
+        state = backfill(
+            conn, "items_slug", "items", values={"slug": func.lower(text("name"))},
+            batch_size=30, progress=batches.append,
+        )
+
+        assert state.done and state.processed == 100
+        assert conn.scalar(select(func.count()).select_from(text("items")).where(text("slug IS NULL"))) == 0
+    assert [b.last_key for b in batches[:4]] == [90, 180, 270, 300]
+
+
+def test_backfill_resumes_from_checkpoint(engine):
+    calls = []
+
+    def failing(row):
+        if len(calls) == 45:
+            raise RuntimeError("interrupted")
+        calls.append(row.id)
+        return _slug(row)
+
+    with engine.connect() as conn:
+        with pytest.raises(RuntimeError):
+            backfill(conn, "items_slug", "items", compute=failing, columns=["name"], batch_size=20, progress=None)
+        conn.rollback()
+        checkpoint = conn.execute(select(checkpoints)).one()
+        assert checkpoint.processed == 40 and not checkpoint.done
+
+        resumed = []
+        state = backfill(
+            conn, "items_slug", "items", compute=lambda row: resumed.append(row.id) or _slug(row),
+            columns=["name"], batch_size=20, progress=None,
+        )
+
+        assert state.done and state.processed == 100
+        assert min(resumed) > checkpoint.last_key
+        assert conn.scalar(text("SELECT slug FROM items WHERE id = 300")) == "item-100"
+
+        again = backfill(conn, "items_slug", "items", compute=_slug, columns=["name"], progress=None)
+        assert again.done and again.processed == 100
+
+        reset_checkpoint(conn, "items_slug")
+        assert conn.execute(select(checkpoints)).first() is None
+
+
+def test_backfill_requires_exactly_one_mode(engine):
+    with engine.connect() as conn, pytest.raises(ValueError):
+        backfill(conn, "x", "items")
+
+
+def test_schema_helpers_with_alembic_operations(engine):
+    pytest.importorskip("alembic")
+    from alembic.migration import MigrationContext
+    from alembic.operations import Operations
+
+    with engine.begin() as conn:
+        operations = Operations(MigrationContext.configure(conn))
+        add_column_online(operations, "items", Column("rank", Integer))
+        with pytest.raises(ValueError):
+            add_column_online(operations, "items", Column("code", String, nullable=False))
+        create_index_online(operations, "ix_items_rank", "items", ["rank"])
+        create_index_online(operations, "ix_items_rank", "items", ["rank"])
+
+    columns = {column["name"] for column in inspect(engine).get_columns("items")}
+    assert "rank" in columns
+    assert [index["name"] for index in inspect(engine).get_indexes("items")] == ["ix_items_rank"]
+
+
+def test_set_not_null_online(engine):
+    pytest.importorskip("alembic")
+    from alembic.migration import MigrationContext
+    from alembic.operations import Operations
+
+    with engine.begin() as conn:
+        set_not_null_online(Operations(MigrationContext.configure(conn)), "items", "name")
+
+    columns = {column["name"]: column for column in inspect(engine).get_columns("items")}
+    assert columns["name"]["nullable"] is False
+    assert columns["slug"]["nullable"] is True
+
+
+def test_copy_rows_skips_existing_and_resumes(engine):
+    with engine.connect() as conn:
+        conn.execute(text("CREATE TABLE items_copy (id INTEGER PRIMARY KEY, name TEXT, slug TEXT)"))
+        conn.execute(text("INSERT INTO items_copy (id, name, slug) VALUES (3, 'Mirrored', 'new')"))
+        conn.commit()
+
+        first = copy_rows(conn, "items_copy", "items", "items_copy", batch_size=40, progress=None)
+        again = copy_rows(conn, "items_copy", "items", "items_copy", batch_size=40, progress=None)
+
+        assert first.done and first.processed == 99
+        assert again.processed == 99
+        assert conn.scalar(select(func.count()).select_from(text("items_copy"))) == 100
+        # Рядок, уже записаний у цільову таблицю, не перезаписується старою версією
+        assert conn.scalar(text("SELECT name FROM items_copy WHERE id = 3")) == "Mirrored"
+
+
+def test_reconcile_rows_removes_stale_copies(engine):
+    with engine.connect() as conn:
+        conn.execute(text("CREATE TABLE items_copy (id INTEGER PRIMARY KEY, name TEXT, slug TEXT)"))
+        conn.commit()
+        copy_rows(conn, "items_copy", "items", "items_copy", batch_size=40, progress=None)
+        # Пакет повторно вставив рядок після того, як тригер видалив його з обох таблиць
+        conn.execute(text("DELETE FROM items WHERE id = 6"))
+        # Застаріла версія рядка, зміненого у вихідній таблиці
+        conn.execute(text("UPDATE items SET name = 'Renamed' WHERE id = 9"))
+        conn.commit()
+
+        removed = reconcile_rows(conn, "items", "items_copy")
+
+        assert removed == 2
+        assert conn.scalar(text("SELECT count(*) FROM items_copy WHERE id IN (6, 9)")) == 0
+        assert conn.scalar(select(func.count()).select_from(text("items_copy"))) == 98
+        # Рядки з NULL у колонках вважаються однаковими
+        assert conn.scalar(text("SELECT count(*) FROM items_copy WHERE slug IS NULL")) == 98
@@ -0,0 +1,34 @@
+import pytest
+
+from benchmarks.partitioning import scanned_relations
+from src.database.partitioning import mirror_trigger_ddl, partition_ddl
+
+
+def test_partition_ddl_creates_hash_partitions_with_composite_key():
+    statements = partition_ddl("contacts", 4)
+
+    assert "PARTITION BY HASH (user_id)" in statements[0]
+    assert any("PRIMARY KEY (user_id, id)" in sql for sql in statements)
+    partitions = [sql for sql in statements if "PARTITION OF" in sql]
+    assert len(partitions) == 4
+    assert "contacts_p3" in partitions[-1] and "MODULUS 4, REMAINDER 3" in partitions[-1]
+
+
+def test_partition_ddl_requires_two_partitions():
+    with pytest.raises(ValueError):
+        partition_ddl("contacts", 1)
+
+
+def test_mirror_trigger_replaces_rows_by_partition_key():
+    function, trigger = mirror_trigger_ddl("contacts")
+
+    assert "DELETE FROM contacts_partitioned WHERE user_id = OLD.user_id AND id = OLD.id" in function
+    assert "AFTER INSERT OR UPDATE OR DELETE ON contacts" in trigger
+
+
+def test_scanned_relations_walks_nested_plan():
+    plan = [{"Plan": {"Node Type": "Limit", "Plans": [
+        {"Node Type": "Append", "Plans": [{"Relation Name": "contacts_p3"}, {"Relation Name": "contacts_p7"}]},
+    ]}}]
+
+    assert scanned_relations(plan) == ["contacts_p3", "contacts_p7"]
@@ -0,0 +1,29 @@
+import pytest
+
+from src.database.models import Contact
+from src.database.phones import to_e164
+
+
+@pytest.mark.parametrize(
+    "phone",
+    ["+380671234567", "+380 67 123 4567", "0671234567", "(671) 234-567", "00380671234567", "380-67-123-45-67"],
+)
+def test_to_e164_variants(phone):
+    assert to_e164(phone, "380") == "+380671234567"
+
+
+def test_to_e164_keeps_foreign_numbers():
+    assert to_e164("+1 (415) 555-2671", "380") == "+14155552671"
+
+
+@pytest.mark.parametrize("phone", [None, "", "123", "+1234567890123456"])
+def test_to_e164_rejects_invalid(phone):
+    assert to_e164(phone) is None
+
+
+def test_contact_keeps_phone_e164_in_sync():
+    contact = Contact(phone_number="067 123 45 67")
+    assert contact.phone_e164 == "+380671234567"
+
+    contact.phone_number = "n/a"
+    assert contact.phone_e164 is None
@@ -0,0 +1,43 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.database.query_timer import QueryTimings, attach_db_timer, current_timings
+
+
+@pytest.mark.asyncio
+async def test_queries_counted_only_inside_timed_context():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    attach_db_timer(engine.sync_engine)
+    timings = QueryTimings()
+
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        token = current_timings.set(timings)
+        try:
+            await conn.execute(text("SELECT 1"))
+            await conn.execute(text("SELECT 2"))
+        finally:
+            current_timings.reset(token)
+        await conn.execute(text("SELECT 3"))
+    await engine.dispose()
+
+    assert timings.db_queries == 2
+    assert timings.db_ms > 0
+
+
+@pytest.mark.asyncio
+async def test_failed_query_does_not_leak_start_time():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    attach_db_timer(engine.sync_engine)
+    token = current_timings.set(QueryTimings())
+
+    try:
+        async with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                await conn.execute(text("SELECT * FROM missing_table"))
+            assert conn.info["query_timer_start"] == []
+    finally:
+        current_timings.reset(token)
+    await engine.dispose()
@@ -0,0 +1,42 @@
+import random
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.database.models import Contact, User
+from src.database.seed import address_book_sizes, generate_contacts, seed_database
+
+
+def test_address_book_sizes_are_skewed_and_exact():
+    sizes = address_book_sizes(random.Random(1), users=100, contacts=10000)
+
+    assert sum(sizes) == 10000
+    assert max(sizes) > 5 * (10000 / 100)
+    assert min(sizes) < 10000 / 100
+
+
+def test_generate_contacts_is_deterministic():
+    first = list(generate_contacts(random.Random(7), [1, 2], [50, 50]))
+    second = list(generate_contacts(random.Random(7), [1, 2], [50, 50]))
+
+    strip = lambda rows: [{k: v for k, v in row.items() if k not in ("created_at", "updated_at")} for row in rows]
+    assert strip(first) == strip(second)
+    assert {row["user_id"] for row in first} == {1, 2}
+
+
+@pytest.mark.asyncio
+async def test_seed_database_writes_users_and_contacts(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'seed.db'}"
+
+    stats = await seed_database(url, users=5, contacts=200, seed_value=3, batch_size=64, recreate=True)
+
+    assert stats["users"] == 5
+    assert stats["contacts"] == 200
+    engine = create_async_engine(url)
+    async with engine.connect() as conn:
+        assert await conn.scalar(select(func.count()).select_from(User)) == 5
+        assert await conn.scalar(select(func.count()).select_from(Contact)) == 200
+        assert await conn.scalar(select(func.count()).where(Contact.user_id.is_(None))) == 0
+        assert await conn.scalar(select(func.sum(User.contacts_count))) == 200
+    await engine.dispose()
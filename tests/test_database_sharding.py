@@ -0,0 +1,163 @@
+from datetime import date
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+
+from src.database.db import DatabaseSessionManager
+from src.database.models import Base, Contact, ContactDuplicate, ContactTombstone, User, UserDirectory
+from src.database.sharding import move_user, shard_stats, sync_directory
+from src.schemas.users import UserCreate
+from src.services.maintenance import on_every_shard, purge_unconfirmed_users
+from src.services.users import UserService
+
+
+@pytest_asyncio.fixture
+async def manager(tmp_path):
+    manager = DatabaseSessionManager(
+        f"sqlite+aiosqlite:///{tmp_path / 'directory.db'}",
+        sqlite_profile=False,
+        shard_urls=[f"sqlite+aiosqlite:///{tmp_path / f'shard{i}.db'}" for i in range(2)],
+    )
+    for database in (manager, *manager.shards):
+        async with database.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    yield manager
+    await manager.close()
+
+
+async def _register(manager, username):
+    async with manager.session() as db:
+        return await UserService(db).create_user(
+            UserCreate(username=username, email=f"{username}@example.com", password="password")
+        )
+
+
+async def _add_contacts(manager, shard, user_id, count, start_seq=0):
+    async with manager.shard(shard).session() as db:
+        contacts = [
+            Contact(
+                first_name=f"Name{i}", last_name="Last", email=f"c{i}@example.com", phone_number="0501234567",
+                birthday=date(1990, 1, 1), user_id=user_id, change_seq=start_seq + i + 1,
+            )
+            for i in range(count)
+        ]
+        db.add_all(contacts)
+        user = await db.get(User, user_id)
+        user.change_seq = start_seq + count
+        user.contacts_count = count
+        await db.flush()
+        ids = [contact.id for contact in contacts]
+        await db.commit()
+        return ids
+
+
+async def _count(manager, shard, model, **filters):
+    async with manager.shard(shard).engine.connect() as conn:
+        stmt = select(func.count()).select_from(model)
+        for column, value in filters.items():
+            stmt = stmt.where(getattr(model, column) == value)
+        return (await conn.execute(stmt)).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_users_are_placed_by_directory_id_and_routed_on_lookup(manager):
+    first = await _register(manager, "alice")
+    second = await _register(manager, "bob")
+
+    assert (first.id, second.id) == (1, 2)
+    # Користувач живе лише на своєму шарді (id % 2)
+    assert await _count(manager, 1, User, username="alice") == 1
+    assert await _count(manager, 0, User, username="alice") == 0
+    assert await _count(manager, 0, User, username="bob") == 1
+    async with manager.session() as db:
+        service = UserService(db)
+        assert (await service.get_user_by_username("bob")).id == 2
+        assert (await service.get_user_by_email("alice@example.com")).id == 1
+        assert await service.get_user_by_username("nobody") is None
+
+
+@pytest.mark.asyncio
+async def test_failed_registration_releases_directory_entry(manager):
+    await _register(manager, "alice")
+    # Рядок users уже є на шарді, хоча в довіднику його немає
+    async with manager.engine.begin() as conn:
+        await conn.execute(UserDirectory.__table__.delete())
+
+    with pytest.raises(Exception):
+        await _register(manager, "alice")
+
+    assert await manager.directory.counts() == {}
+
+
+@pytest.mark.asyncio
+async def test_move_user_copies_data_and_renumbers_taken_contact_ids(manager):
+    alice = await _register(manager, "alice")
+    bob = await _register(manager, "bob")
+    alice_contacts = await _add_contacts(manager, 1, alice.id, 3)
+    bob_contacts = await _add_contacts(manager, 0, bob.id, 2)
+    async with manager.shard(1).session() as db:
+        db.add(ContactTombstone(user_id=alice.id, contact_id=99, change_seq=3))
+        db.add(ContactDuplicate(
+            user_id=alice.id, contact_id=alice_contacts[0], duplicate_id=alice_contacts[2], score=0.9, reasons="phone"
+        ))
+        await db.commit()
+
+    report = await move_user(manager, alice.id, 0)
+
+    assert report == {"user_id": alice.id, "source": 1, "target": 0, "contacts": 3, "renumbered": 2}
+    assert await manager.directory.lookup(user_id=alice.id) == 0
+    assert await _count(manager, 1, User) == 0
+    assert await _count(manager, 1, Contact) == 0
+    assert await _count(manager, 0, Contact, user_id=alice.id) == 3
+    async with manager.shard(0).session() as db:
+        moved = await db.get(User, alice.id)
+        assert (moved.contacts_count, moved.change_seq) == (3, 7)
+        ids = set((await db.execute(select(Contact.id).where(Contact.user_id == alice.id))).scalars())
+        assert alice_contacts[2] in ids and not ids & set(bob_contacts)
+        # Клієнти синхронізації бачать видалення старих id перенумерованих контактів
+        removed = set((await db.execute(
+            select(ContactTombstone.contact_id).where(ContactTombstone.user_id == alice.id)
+        )).scalars())
+        assert removed == {99, *bob_contacts}
+        pair = (await db.execute(select(ContactDuplicate))).scalar_one()
+        # Пара лишається впорядкованою після перенумерації
+        assert pair.contact_id == alice_contacts[2] and pair.duplicate_id in ids
+        assert pair.contact_id < pair.duplicate_id
+
+    async with manager.session() as db:
+        assert (await UserService(db).get_user_by_username("alice")).id == alice.id
+
+
+@pytest.mark.asyncio
+async def test_move_user_rejects_unknown_shard_and_user(manager):
+    await _register(manager, "alice")
+
+    with pytest.raises(ValueError):
+        await move_user(manager, 1, 5)
+    with pytest.raises(LookupError):
+        await move_user(manager, 42, 0)
+
+
+@pytest.mark.asyncio
+async def test_maintenance_runs_on_every_shard_and_frees_directory(manager):
+    await _register(manager, "alice")
+    await _register(manager, "bob")
+
+    reports = await on_every_shard(purge_unconfirmed_users, manager, older_than_days=-1, pause_seconds=0)
+
+    assert [report.users for report in reports] == [1, 1]
+    assert await manager.directory.counts() == {}
+
+
+@pytest.mark.asyncio
+async def test_sync_directory_registers_existing_users(manager):
+    async with manager.shard(0).session() as db:
+        db.add_all([User(id=10, username="old", email="old@example.com"), User(id=11, username="new", email="n@e.com")])
+        await db.commit()
+
+    assert await sync_directory(manager) == {0: 2, 1: 0}
+    assert await sync_directory(manager) == {0: 0, 1: 0}
+    stats = await shard_stats(manager)
+    assert stats["directory"] == {0: 2}
+    assert stats["shards"][0] == {"shard": 0, "users": 2, "contacts": 0}
@@ -0,0 +1,95 @@
+import json
+import logging
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from src.database.models import Base, Contact, User
+from src.database.slow_query import SlowQueryLogger, fingerprint, parameter_shapes
+from src.repository.contacts import ContactRepository
+
+
+def test_fingerprint_ignores_literal_values():
+    first, first_digest = fingerprint("SELECT * FROM contacts WHERE id = 1 AND email = 'a@b.c'")
+    second, second_digest = fingerprint("SELECT *  FROM contacts\n WHERE id = 42 AND email = 'x@y.z'")
+
+    assert first == "SELECT * FROM contacts WHERE id = ? AND email = ?"
+    assert (second, second_digest) == (first, first_digest)
+    assert fingerprint("SELECT 1 WHERE id IN (?, ?, ?)")[0] == "SELECT ? WHERE id IN (?+)"
+
+
+def test_parameter_shapes_hide_values():
+    assert parameter_shapes({"email": "john@example.com", "id": 5}) == {"email": "str[16]", "id": "int"}
+    assert parameter_shapes([("a", 1), ("b", 2)], executemany=True) == {
+        "executemany": 2,
+        "shape": ["str[1]", "int"],
+    }
+
+
+@pytest.mark.asyncio
+async def test_slow_query_logged_with_caller_and_plan(caplog):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    SlowQueryLogger(threshold_ms=0, explain=True, log_interval=60).attach(engine.sync_engine)
+    session_maker = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async with session_maker() as session:
+        session.add(
+            Contact(
+                first_name="John",
+                last_name="Doe",
+                email="john@example.com",
+                phone_number="123",
+                birthday=date(1990, 1, 1),
+                user_id=1,
+            )
+        )
+        await session.commit()
+
+        caplog.clear()
+        with caplog.at_level(logging.WARNING, logger="src.database.slow_query"):
+            repo = ContactRepository(session)
+            await repo.get_contact_by_id(1, User(id=1))
+            await repo.get_contact_by_id(2, User(id=1))
+
+    await engine.dispose()
+
+    records = [json.loads(r.message) for r in caplog.records]
+    # Другий запит з тим самим відбитком пригнічується лімітом частоти
+    assert len(records) == 1
+    record = records[0]
+    assert record["caller"] == "src.repository.contacts:ContactRepository.get_contact_by_id"
+    assert record["route"] is None
+    assert record["parameters"] == ["int", "int"]
+    assert record["plan"]
+
+
+@pytest.mark.asyncio
+async def test_failed_query_does_not_leak_start_time():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    SlowQueryLogger(threshold_ms=1000).attach(engine.sync_engine)
+
+    async with engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            await conn.execute(text("SELECT * FROM missing_table"))
+        assert conn.info["slow_query_start"] == []
+        await conn.execute(text("SELECT 1"))
+        assert conn.info["slow_query_start"] == []
+    await engine.dispose()
+
+
+def test_rate_limit_state_is_bounded():
+    logger = SlowQueryLogger(threshold_ms=0, log_interval=60, max_fingerprints=3)
+
+    for index in range(10):
+        assert logger._acquire(f"digest{index}") == 0
+    assert logger._acquire("digest9") is None
+
+    assert list(logger._last_logged) == ["digest7", "digest8", "digest9"]
+    assert set(logger._suppressed) <= set(logger._last_logged)
+    # Витіснений відбиток знову записується
+    assert logger._acquire("digest0") == 0
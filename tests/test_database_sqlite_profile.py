@@ -0,0 +1,117 @@
+import asyncio
+from datetime import date
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, func, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.database.db import DatabaseSessionManager
+from src.database.models import Base, Contact, User
+from src.database.sqlite_profile import is_file_sqlite
+from src.schemas.contacts import ContactBase
+from src.services.contacts import ContactService
+
+
+def test_is_file_sqlite():
+    assert is_file_sqlite("sqlite+aiosqlite:///./app.db")
+    assert not is_file_sqlite("sqlite+aiosqlite:///:memory:")
+    assert not is_file_sqlite("postgresql+asyncpg://u:p@localhost/db")
+
+
+@pytest_asyncio.fixture
+async def manager(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'profile.db'}"
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(User.__table__.insert().values(id=1, username="owner", email="owner@example.com"))
+    await engine.dispose()
+    manager = DatabaseSessionManager(url, sqlite_profile=True)
+    yield manager
+    await manager.close()
+
+
+def _contact(index: int) -> ContactBase:
+    return ContactBase(
+        first_name=f"First{index}",
+        last_name="Last",
+        email=f"c{index}@example.com",
+        phone_number=f"+380{index:09d}",
+        birthday=date(1990, 1, 1),
+    )
+
+
+@pytest.mark.asyncio
+async def test_profile_applies_pragmas_and_read_only_pool(manager):
+    async with manager.engine.connect() as conn:
+        assert (await conn.scalar(text("PRAGMA journal_mode"))) == "wal"
+        assert (await conn.scalar(text("PRAGMA synchronous"))) == 1
+        assert (await conn.scalar(text("PRAGMA query_only"))) == 0
+    async with manager.read_engine.connect() as conn:
+        assert (await conn.scalar(text("PRAGMA query_only"))) == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_are_serialized(manager):
+    async def create(index: int):
+        async with manager.session() as db:
+            return await ContactService(db).create_contact(_contact(index), User(id=1))
+
+    created = await asyncio.gather(*(create(i) for i in range(20)))
+
+    assert len({contact.id for contact in created}) == 20
+    async with manager.session() as db:
+        assert await db.scalar(select(func.count()).select_from(Contact)) == 20
+
+
+@pytest.mark.asyncio
+async def test_reads_after_write_use_writer_until_commit(manager):
+    async with manager.session() as db:
+        db.add(Contact(**_contact(1).model_dump(), user_id=1))
+        await db.flush()
+
+        assert await db.scalar(select(func.count()).select_from(Contact)) == 1
+        await db.rollback()
+
+        assert await db.scalar(select(func.count()).select_from(Contact)) == 0
+
+
+@pytest.mark.asyncio
+async def test_text_reads_use_reader_and_reads_for_update_stay_on_writer(manager):
+    async with manager.session() as db:
+        session = db.sync_session
+        assert session.get_bind(clause=text("SELECT 1")) is session.reader
+        assert session.get_bind(clause=text("  (select count(*) FROM contacts)")) is session.reader
+        assert session.get_bind(clause=select(Contact)) is session.reader
+
+        assert session.get_bind(clause=select(Contact).with_for_update()) is session.writer
+        # Після читання для зміни решта транзакції йде через те саме з'єднання
+        assert session.get_bind(clause=select(Contact)) is session.writer
+
+    async with manager.session() as db:
+        assert db.sync_session.get_bind(clause=text("PRAGMA optimize")) is db.sync_session.writer
+
+
+@pytest.mark.asyncio
+async def test_update_contact_reads_on_writer(manager):
+    owner = User(id=1)
+    async with manager.session() as db:
+        created = await ContactService(db).create_contact(_contact(1), owner)
+
+    executed = []
+    for name, engine in (("reader", manager.read_engine), ("writer", manager.engine)):
+        event.listen(
+            engine.sync_engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args, name=name: executed.append((name, statement.split()[0])),
+        )
+
+    async with manager.session() as db:
+        updated = await ContactService(db).update_contact(
+            created.id, ContactBase(**{**_contact(1).model_dump(), "first_name": "Renamed"}), owner
+        )
+
+    assert updated.first_name == "Renamed"
+    # Контакт читається для зміни на тому ж з'єднанні, що й пише
+    assert executed[:2] == [("writer", "SELECT"), ("writer", "UPDATE")]
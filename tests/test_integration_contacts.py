@@ -52,7 +52,106 @@ def test_get_contacts(client, get_token):
     assert len(data) > 0
 
 
+def test_fuzzy_search_contacts(client, get_token):
+    response = client.get(
+        "/api/contacts",
+        params={"q": "Frist Last", "fuzzy": True},
+        headers={"Authorization": f"Bearer {get_token}"},
+    )
+    assert response.status_code == status.HTTP_200_OK, response.text
+    data = response.json()
+    assert data[0]["first_name"] == test_contact["first_name"]
+
+    response = client.get(
+        "/api/contacts",
+        params={"q": "Zzyzx", "fuzzy": True},
+        headers={"Authorization": f"Bearer {get_token}"},
+    )
+    assert response.status_code == 404, response.text
+
+
+def test_autocomplete_contacts(client, get_token):
+    response = client.get(
+        "/api/contacts/autocomplete",
+        params={"prefix": "fir"},
+        headers={"Authorization": f"Bearer {get_token}"},
+    )
+    assert response.status_code == status.HTTP_200_OK, response.text
+    data = response.json()
+    assert data[0]["name"] == "First Last"
+    assert data[0]["email"] == test_contact["email"]
+
+    response = client.get(
+        "/api/contacts/autocomplete",
+        params={"prefix": "zz"},
+        headers={"Authorization": f"Bearer {get_token}"},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == []
+
+
+def test_get_contacts_include_total(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    response = client.get("/api/contacts", params={"include_total": True}, headers=headers)
+    assert response.status_code == status.HTTP_200_OK, response.text
+    assert response.headers["X-Total-Count"] == "1"
+    assert len(response.json()) == 1
+
+    response = client.get(
+        "/api/contacts", params={"include_total": True, "first_name": "Fir", "skip": 10}, headers=headers
+    )
+    assert response.status_code == status.HTTP_200_OK, response.text
+    assert response.headers["X-Total-Count"] == "1"
+    assert response.json() == []
+
+    response = client.get(
+        "/api/contacts", params={"include_total": True, "email": "nobody"}, headers=headers
+    )
+    assert response.headers["X-Total-Count"] == "0"
+
+
+def test_upcoming_birthdays(client, get_token):
+    response = client.get(
+        "/api/contacts/birthdays",
+        params={"days": 366, "limit": 1},
+        headers={"Authorization": f"Bearer {get_token}"},
+    )
+    assert response.status_code == 200, response.text
+    assert len(response.json()) == 1
+
+
+def test_contact_facets(client, get_token):
+    response = client.get("/api/contacts/facets", headers={"Authorization": f"Bearer {get_token}"})
+    assert response.status_code == status.HTTP_200_OK, response.text
+    assert response.json() == {
+        "total": 1,
+        "birth_month": {"1": 1},
+        "email_domain": {"mail.com": 1},
+    }
+
 
+sync_state = {}
+
+
+def test_contact_changes_full_sync(client, get_token):
+    response = client.get(
+        "/api/contacts/changes", headers={"Authorization": f"Bearer {get_token}"}
+    )
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert 1 in [contact["id"] for contact in data["changes"]]
+    assert data["deleted"] == []
+    assert data["next_token"]
+    sync_state["token"] = data["next_token"]
+
+
+def test_contact_changes_invalid_token(client, get_token):
+    response = client.get(
+        "/api/contacts/changes",
+        params={"since": "garbage"},
+        headers={"Authorization": f"Bearer {get_token}"},
+    )
+    assert response.status_code == 400, response.text
 
 
 def test_update_contact(client, get_token):
@@ -89,6 +188,23 @@ def test_delete_contact(client, get_token):
     data = response.text
     assert data == ""
 
+def test_counter_after_delete(client, get_token):
+    response = client.get("/api/contacts/facets", headers={"Authorization": f"Bearer {get_token}"})
+    assert response.json()["total"] == 0
+
+
+def test_contact_changes_after_delete(client, get_token):
+    response = client.get(
+        "/api/contacts/changes",
+        params={"since": sync_state["token"]},
+        headers={"Authorization": f"Bearer {get_token}"},
+    )
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert 1 in data["deleted"]
+    assert 1 not in [contact["id"] for contact in data["changes"]]
+
+
 def test_repeat_delete_contact(client, get_token):
     response = client.delete(
         "/api/contacts/1", headers={"Authorization": f"Bearer {get_token}"}
@@ -97,3 +213,46 @@ def test_repeat_delete_contact(client, get_token):
     data = response.json()
     assert data["detail"] == "Contact not found"
 
+
+
+def test_duplicates_and_merge(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    ids = [
+        client.post("/api/contacts", json={**test_contact, "email": email}, headers=headers).json()["id"]
+        for email in ("dup@mail.com", " DUP@mail.com")
+    ]
+
+    response = client.get("/api/contacts/duplicates", params={"refresh": True}, headers=headers)
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert [(pair["contact"]["id"], pair["duplicate"]["id"]) for pair in data] == [tuple(sorted(ids))]
+
+    response = client.post(f"/api/contacts/{ids[0]}/merge", json={"duplicate_ids": [ids[1]]}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["id"] == ids[0]
+    assert client.get("/api/contacts/duplicates", headers=headers).json() == []
+
+    response = client.post(f"/api/contacts/{ids[0]}/merge", json={"duplicate_ids": [ids[1]]}, headers=headers)
+    assert response.status_code == 404, response.text
+
+
+def test_lookup_by_phone(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    contact_id = client.post(
+        "/api/contacts", json={**test_contact, "phone_number": "+380 67 765 4321"}, headers=headers
+    ).json()["id"]
+
+    response = client.get("/api/contacts/lookup", params={"phone": "067-765-43-21"}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert [contact["id"] for contact in response.json()] == [contact_id]
+
+    response = client.get("/api/contacts/lookup", params={"phone": "12"}, headers=headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST, response.text
+
+    response = client.post(
+        "/api/contacts/lookup", json={"phones": ["00380677654321", "+380990000000", "x"]}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert [item["e164"] for item in data] == ["+380677654321", "+380990000000", None]
+    assert [[contact["id"] for contact in item["contacts"]] for item in data] == [[contact_id], [], []]
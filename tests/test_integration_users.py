@@ -11,3 +11,42 @@ def test_get_me(client, get_token):
     assert data["email"] == test_user["email"]
     assert "avatar" in data
 
+
+
+def test_update_avatar(client, get_token, tmp_path, monkeypatch):
+    from src.services.avatars import avatar_storage
+    from test_services_avatars import png
+
+    monkeypatch.setattr(avatar_storage, "root", tmp_path)
+    headers = {"Authorization": f"Bearer {get_token}"}
+    response = client.patch(
+        "api/users/avatar", headers=headers, files={"file": ("me.png", png(8, 8), "image/png")}
+    )
+    assert response.status_code == 200, response.text
+    avatar = response.json()["avatar"]
+    assert avatar.startswith("/media/avatars/1/")
+    assert (tmp_path / avatar.split("/media/avatars/", 1)[1].split("?")[0]).exists()
+
+    response = client.patch(
+        "api/users/avatar", headers=headers, files={"file": ("me.png", b"not an image at all", "image/png")}
+    )
+    assert response.status_code == 415, response.text
+
+
+def test_update_avatar_for_missing_user_removes_files(client, get_token, tmp_path, monkeypatch):
+    from src.services.avatars import avatar_storage
+    from src.services.users import UserService
+    from test_services_avatars import png
+
+    async def missing(self, user_id, avatar_url):
+        return None
+
+    monkeypatch.setattr(avatar_storage, "root", tmp_path)
+    monkeypatch.setattr(UserService, "update_avatar", missing)
+    headers = {"Authorization": f"Bearer {get_token}"}
+    response = client.patch(
+        "api/users/avatar", headers=headers, files={"file": ("me.png", png(8, 8), "image/png")}
+    )
+
+    assert response.status_code == 404, response.text
+    assert not (tmp_path / "1").exists()
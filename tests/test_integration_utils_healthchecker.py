@@ -14,3 +14,26 @@ def test_healthchecker_success():
     assert response.json() == {"message": "APP is healthy"}
 
 
+def test_live():
+    response = client.get("/api/live")
+    assert response.status_code == 200
+    assert response.json() == {"status": "alive"}
+
+
+def test_ready_reads_cached_probes(monkeypatch):
+    from src.services.health import health_monitor
+
+    monkeypatch.setattr(type(health_monitor), "ready", property(lambda self: False))
+    response = client.get("/api/ready")
+    assert response.status_code == 503
+
+    monkeypatch.setattr(type(health_monitor), "ready", property(lambda self: True))
+    response = client.get("/api/ready")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ready"}
+
+
+def test_health_status_lists_dependencies():
+    response = client.get("/api/health/status")
+    assert response.status_code == 200
+    assert set(response.json()["dependencies"]) == {"db", "redis", "smtp"}
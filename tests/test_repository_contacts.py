@@ -40,7 +40,7 @@ async def test_get_contact_by_id():
 
     # Виклик функції
     contact_repo = ContactRepository(mock_db)
-    contact = await contact_repo.get_contact_by_id(contact_id=1)
+    contact = await contact_repo.get_contact_by_id(contact_id=1, user=User(id=1))
 
     # Перевірка результатів
     assert contact is not None
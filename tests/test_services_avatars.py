@@ -0,0 +1,155 @@
+import struct
+import zlib
+
+import pytest
+
+from src.services import avatars
+from src.services.avatars import (
+    AvatarMissing,
+    AvatarTooLarge,
+    AvatarTypeNotAllowed,
+    LocalAvatarStorage,
+    detect_image_type,
+    receive_upload,
+    store_avatar,
+)
+
+BOUNDARY = "avatarboundary"
+
+
+def png(width=1, height=1) -> bytes:
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    rows = b"".join(b"\x00" + b"\xff\x00\x00" * width for _ in range(height))
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(rows))
+        + chunk(b"IEND", b"")
+    )
+
+
+def multipart(content: bytes, field="file", filename="me.png") -> bytes:
+    return (
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"note\"\r\n\r\nhello\r\n"
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"{field}\"; filename=\"{filename}\"\r\n"
+        f"Content-Type: application/octet-stream\r\n\r\n"
+    ).encode() + content + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+class StreamingRequest:
+    def __init__(self, body: bytes, chunk_size=7, headers=None):
+        self.body = body
+        self.chunk_size = chunk_size
+        self.headers = {"content-type": f"multipart/form-data; boundary={BOUNDARY}", **(headers or {})}
+        self.chunks = 0
+
+    async def stream(self):
+        for start in range(0, len(self.body), self.chunk_size):
+            self.chunks += 1
+            yield self.body[start:start + self.chunk_size]
+
+
+@pytest.mark.parametrize(
+    "head, expected",
+    [
+        (b"\xff\xd8\xff\xe0" + b"\x00" * 8, "jpg"),
+        (png()[:12], "png"),
+        (b"GIF89a" + b"\x00" * 6, "gif"),
+        (b"RIFF\x00\x00\x00\x00WEBP", "webp"),
+        (b"<svg xmlns=", None),
+    ],
+)
+def test_detect_image_type(head, expected):
+    assert detect_image_type(head) == expected
+
+
+@pytest.mark.asyncio
+async def test_receive_upload_streams_file_part_to_disk(tmp_path):
+    content = png(4, 4)
+
+    path, extension = await receive_upload(StreamingRequest(multipart(content)), directory=tmp_path)
+
+    assert extension == "png"
+    assert path.parent == tmp_path
+    assert path.read_bytes() == content
+
+
+@pytest.mark.asyncio
+async def test_receive_upload_stops_reading_when_file_is_too_large(tmp_path):
+    request = StreamingRequest(multipart(png() + b"\x00" * 5000), chunk_size=256)
+
+    with pytest.raises(AvatarTooLarge):
+        await receive_upload(request, max_bytes=1000, directory=tmp_path)
+
+    assert request.chunks < len(request.body) // 256
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_receive_upload_rejects_large_content_length_before_reading(tmp_path):
+    request = StreamingRequest(multipart(png()), headers={"content-length": str(10 ** 9)})
+
+    with pytest.raises(AvatarTooLarge):
+        await receive_upload(request, directory=tmp_path)
+
+    assert request.chunks == 0
+
+
+@pytest.mark.asyncio
+async def test_receive_upload_rejects_non_image_content(tmp_path):
+    with pytest.raises(AvatarTypeNotAllowed):
+        await receive_upload(StreamingRequest(multipart(b"<svg onload=alert(1)>")), directory=tmp_path)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_receive_upload_requires_file_field(tmp_path):
+    with pytest.raises(AvatarMissing):
+        await receive_upload(StreamingRequest(multipart(png(), field="other")), directory=tmp_path)
+    request = StreamingRequest(b"{}", headers={"content-type": "application/json"})
+    with pytest.raises(AvatarMissing):
+        await receive_upload(request, directory=tmp_path)
+
+
+@pytest.mark.asyncio
+async def test_store_avatar_without_pillow_keeps_original(tmp_path, monkeypatch):
+    monkeypatch.setattr(avatars, "_pillow_available", lambda: False)
+    upload = tmp_path / "upload"
+    upload.write_bytes(png())
+    storage = LocalAvatarStorage(tmp_path / "avatars", "/media/avatars/")
+
+    url = await store_avatar(7, upload, "png", storage)
+
+    assert url.startswith("/media/avatars/7/avatar.png?v=")
+    assert (tmp_path / "avatars" / "7" / "avatar.png").read_bytes() == png()
+    assert not upload.exists()
+
+
+def test_make_thumbnails_resizes_largest_first(tmp_path):
+    pytest.importorskip("PIL")
+    from PIL import Image
+
+    from src.services.thumbnails import make_thumbnails
+
+    source = tmp_path / "source.png"
+    source.write_bytes(png(300, 150))
+
+    paths = make_thumbnails(str(source), str(tmp_path), [64, 256])
+
+    assert [path.rsplit("/", 1)[-1] for path in paths] == ["256.jpg", "64.jpg"]
+    with Image.open(paths[0]) as image:
+        assert image.size == (256, 128)
+
+
+def test_make_thumbnails_rejects_unreadable_image(tmp_path):
+    pytest.importorskip("PIL")
+    from src.services.thumbnails import make_thumbnails
+
+    source = tmp_path / "broken.png"
+    source.write_bytes(png()[:20])
+
+    with pytest.raises(ValueError):
+        make_thumbnails(str(source), str(tmp_path), [64])
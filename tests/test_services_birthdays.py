@@ -0,0 +1,163 @@
+from datetime import date, datetime
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.database.db import DatabaseSessionManager
+from src.database.models import Base, Contact, User
+from src.schemas.contacts import ContactBase, ContactResponse
+from src.services.birthdays import (
+    BirthdayCache,
+    BirthdayIndex,
+    birthday_window,
+    send_birthday_digests,
+)
+from src.services.contacts import ContactService
+
+
+def test_birthday_window_wraps_year():
+    window = birthday_window(date(2026, 12, 30), 3)
+
+    assert window == {1230: 0, 1231: 1, 101: 2, 102: 3}
+
+
+def test_birthday_window_feb_29_in_common_year():
+    assert birthday_window(date(2027, 2, 27), 2) == {227: 0, 228: 1, 229: 1, 301: 2}
+    assert 229 not in birthday_window(date(2028, 3, 1), 5)
+
+
+def test_contact_birthday_md_follows_birthday():
+    contact = Contact(birthday=date(1990, 12, 31))
+    assert contact.birthday_md == 1231
+
+    contact.birthday = date(1990, 2, 3)
+    assert contact.birthday_md == 203
+
+
+def birthday_index(birthdays: dict[int, int]) -> BirthdayIndex:
+    index = BirthdayIndex()
+    for contact_id, md in birthdays.items():
+        contact = ContactResponse(
+            id=contact_id, first_name="A", last_name="B", email="a@b.c", created_at=datetime.now(), phone_number="1"
+        )
+        index.add(contact_id, md, contact)
+    return index
+
+
+def ids(contacts: list[ContactResponse]) -> list[int]:
+    return [contact.id for contact in contacts]
+
+
+def test_birthday_index_window():
+    index = birthday_index({1: 1019, 2: 1020, 3: 1101, 4: 1231, 5: 101, 6: 105, 7: 1018})
+
+    assert ids(index.window(date(2026, 10, 19), 13)) == [1, 2, 3]
+    assert ids(index.window(date(2026, 10, 19), 13, limit=2)) == [1, 2]
+    assert ids(index.window(date(2026, 12, 30), 5)) == [4, 5]
+    assert ids(index.window(date(2026, 12, 30), 10, limit=3)) == [4, 5, 6]
+    assert ids(index.window(date(2026, 10, 19), 365)) == [1, 2, 3, 4, 5, 6, 7]
+
+
+def test_birthday_index_feb_29():
+    index = birthday_index({1: 228, 2: 229, 3: 301})
+
+    assert ids(index.window(date(2027, 2, 20), 8)) == [1, 2]
+    assert ids(index.window(date(2028, 2, 20), 8)) == [1]
+
+
+def test_birthday_index_moves_only_on_birthday_change():
+    index = birthday_index({1: 101, 2: 601})
+    keys = list(index._keys)
+
+    renamed = ContactResponse(
+        id=1, first_name="New", last_name="B", email="a@b.c", created_at=datetime.now(), phone_number="1"
+    )
+    index.add(1, 101, renamed)
+    assert index._keys == keys
+    assert index.window(date(2026, 1, 1), 0)[0].first_name == "New"
+
+    index.add(1, 701, renamed)
+    assert ids(index.window(date(2026, 5, 1), 90)) == [2, 1]
+    index.remove(2)
+    assert len(index) == 1
+
+
+@pytest_asyncio.fixture
+async def manager(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'digest.db'}"
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await engine.dispose()
+    manager = DatabaseSessionManager(url)
+    birthdays = {
+        "alice": [date(1990, 1, 2), date(1985, 12, 31), date(1980, 6, 1), date(2000, 12, 30)],
+        "bob": [date(1970, 1, 1)],
+        "carol": [date(1999, 7, 7)],
+        "mallory": [date(1990, 1, 1)],
+    }
+    async with manager.session() as db:
+        for name, dates in birthdays.items():
+            user = User(username=name, email=f"{name}@example.com", confirmed=name != "mallory")
+            db.add(user)
+            await db.flush()
+            for index, birthday in enumerate(dates):
+                db.add(Contact(
+                    first_name=f"{name}{index}", last_name="L", email=f"{name}{index}@example.com",
+                    phone_number="1", birthday=birthday, user_id=user.id,
+                ))
+        await db.commit()
+    yield manager
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_send_birthday_digests_groups_by_user(manager):
+    batches = []
+
+    async def send(batch):
+        batches.append([(digest.username, [c["first_name"] for c in digest.contacts]) for digest in batch])
+        return len(batch), 0
+
+    report = await send_birthday_digests(
+        date(2026, 12, 30), days=3, chunk_size=2, batch_size=1, send=send, manager=manager
+    )
+
+    assert batches == [
+        [("alice", ["alice3", "alice1", "alice0"])],
+        [("bob", ["bob0"])],
+    ]
+    assert (report.users, report.contacts, report.sent, report.chunks) == (2, 4, 2, 3)
+
+
+@pytest.mark.asyncio
+async def test_upcoming_birthdays_use_cache(manager, monkeypatch):
+    cache = BirthdayCache()
+    monkeypatch.setattr("src.services.contacts.birthday_cache", cache)
+    today = date.today()
+    async with manager.session() as db:
+        user = await db.scalar(select(User).where(User.username == "bob"))
+        db.expunge(user)
+        service = ContactService(db)
+        body = ContactBase(
+            first_name="Soon", last_name="L", email="soon@example.com", phone_number="1",
+            birthday=date(1990, today.month, today.day),
+        )
+        created = await service.create_contact(body, user)
+
+        first = await service.get_upcoming_birthdays(3, user=user)
+        assert created.id in ids(first)
+
+        await service.update_contact(created.id, ContactBase(**{**body.model_dump(), "first_name": "Renamed"}), user)
+        renamed = await service.get_upcoming_birthdays(3, user=user)
+        assert [contact.first_name for contact in renamed if contact.id == created.id] == ["Renamed"]
+
+        moved = date.fromordinal(today.toordinal() + 100)
+        await service.update_contact(created.id, ContactBase(**{**body.model_dump(), "birthday": moved}), user)
+        assert created.id not in ids(await service.get_upcoming_birthdays(3, user=user))
+
+        await service.remove_contact(created.id, user)
+        assert created.id not in ids(await service.get_upcoming_birthdays(365, user=user))
+        assert cache.builds == 1
@@ -2,7 +2,7 @@ import pytest
 from unittest.mock import AsyncMock, MagicMock
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date, datetime,timedelta
-from src.database.models import Contact
+from src.database.models import Contact, User
 from src.schemas.contacts import ContactResponse, ContactBase
 from src.services.contacts import ContactService
 
@@ -105,7 +105,7 @@ async def test_get_contact_by_id():
 
     # Виклик функції
     contact_service = ContactService(mock_db)
-    contact = await contact_service.get_contact_by_id(contact_id=1)
+    contact = await contact_service.get_contact_by_id(contact_id=1, user=User(id=1))
 
     # Перевірка результатів
     assert isinstance(contact, ContactResponse)
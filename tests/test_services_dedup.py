@@ -0,0 +1,154 @@
+from datetime import date
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.database.db import DatabaseSessionManager
+from src.database.models import Base, Contact, ContactDuplicate, ContactTombstone, User
+from src.schemas.contacts import ContactBase
+from src.services.contacts import ContactService
+from src.services.dedup import (
+    DedupService,
+    find_duplicates,
+    name_key,
+    normalize_email,
+    normalize_phone,
+    run_dedup,
+    soundex,
+)
+
+
+@pytest.mark.parametrize(
+    "phone", ["+380501234567", "+380 50 123 4567", "0501234567", "(501) 234-567", "380-50-123-45-67"]
+)
+def test_normalize_phone_variants(phone):
+    assert normalize_phone(phone, "380") == "380501234567"
+
+
+def test_normalize_email():
+    assert normalize_email(" John.Smith@Example.COM ") == "john.smith@example.com"
+    assert normalize_email(None) == ""
+
+
+@pytest.mark.parametrize(
+    "word, code",
+    [("Robert", "R163"), ("Rupert", "R163"), ("Ashcraft", "A261"), ("Tymczak", "T522"), ("Pfister", "P236"), ("Lee", "L000")],
+)
+def test_soundex(word, code):
+    assert soundex(word) == code
+
+
+def test_name_key_transliterates_cyrillic():
+    assert name_key("Тарас", "Шевченко") == name_key("Taras", "Shevchenko")
+
+
+def test_find_duplicates_by_blocking_keys():
+    rows = [
+        (1, "John", "Smith", "john@example.com", "+380501234567"),
+        (2, "Jon", "Smith", " JOHN@example.com", "0501234567"),
+        (3, "Mary", "Jones", "mary@example.com", "+380671111111"),
+        (4, "Mary", "Jones", "other@example.com", "+380672222222"),
+        (5, "Anna", "Koval", "anna@example.com", "(501) 234-567"),
+    ]
+
+    pairs = find_duplicates(rows, threshold=0.6)
+
+    assert [(pair.contact_id, pair.duplicate_id) for pair in pairs] == [(1, 2), (3, 4)]
+    assert pairs[0].reasons == ("email", "phone", "name")
+    assert pairs[0].score == 1.0
+    # Збіг лише телефону з іншим ім'ям не дотягує до порогу
+    assert all(5 not in (pair.contact_id, pair.duplicate_id) for pair in pairs)
+
+
+def test_find_duplicates_only_changed_pairs():
+    rows = [
+        (1, "John", "Smith", "john@example.com", "1"),
+        (2, "John", "Smith", "john@example.com", "2"),
+        (3, "Mary", "Jones", "mary@example.com", "3"),
+        (4, "Mary", "Jones", "mary@example.com", "4"),
+    ]
+
+    pairs = find_duplicates(rows, changed={4})
+
+    assert [(pair.contact_id, pair.duplicate_id) for pair in pairs] == [(3, 4)]
+
+
+def test_find_duplicates_large_blocks():
+    same_email = [(i, f"Name{i}", "Same", "shared@example.com", str(i)) for i in range(1, 201)]
+    same_name = [(i, "John", "Smith", f"j{i}@example.com", str(i)) for i in range(201, 401)]
+
+    pairs = find_duplicates(same_email + same_name, threshold=0.0, max_block=50)
+
+    # Великий блок email порівнюється зіркою з першим контактом, великий блок імені пропускається
+    assert len(pairs) == 199
+    assert {pair.contact_id for pair in pairs} == {1}
+
+
+@pytest_asyncio.fixture
+async def manager(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'dedup.db'}"
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await engine.dispose()
+    manager = DatabaseSessionManager(url)
+    async with manager.session() as db:
+        db.add(User(username="owner", email="owner@example.com", confirmed=True))
+        await db.commit()
+    yield manager
+    await manager.close()
+
+
+def contact(first_name: str, email: str, phone: str, info: str = None) -> ContactBase:
+    return ContactBase(
+        first_name=first_name, last_name="Smith", email=email, phone_number=phone,
+        birthday=date(1990, 1, 1), additional_info=info,
+    )
+
+
+@pytest.mark.asyncio
+async def test_refresh_suggest_and_merge(manager):
+    async with manager.session() as db:
+        user = await db.scalar(select(User))
+        db.expunge(user)
+        service = ContactService(db)
+        first = await service.create_contact(contact("John", "john@example.com", "0501234567"), user)
+        second = await service.create_contact(contact("John", "JOHN@example.com", "+380501234567", "note"), user)
+        third = await service.create_contact(contact("Kate", "kate@example.com", "0671111111"), user)
+
+        dedup = DedupService(db)
+        assert await dedup.refresh(user.id) == 1
+        assert await dedup.refresh(user.id) is None
+        suggestions = await dedup.suggestions(user.id)
+        assert [(s.contact.id, s.duplicate.id) for s in suggestions] == [(first.id, second.id)]
+        assert suggestions[0].reasons == ["email", "phone", "name"]
+
+        fourth = await service.create_contact(contact("Kate", "kate@example.com", "0671111111"), user)
+        assert await dedup.refresh(user.id) == 1
+        assert len(await dedup.suggestions(user.id)) == 2
+
+        merged = await service.merge_contacts(user, first.id, [second.id])
+        assert merged.id == first.id
+        assert await db.scalar(select(Contact.additional_info).where(Contact.id == first.id)) == "note"
+        assert await db.scalar(select(func.count()).select_from(Contact)) == 3
+        assert await db.scalar(select(ContactTombstone.contact_id)) == second.id
+        assert await db.scalar(select(User.contacts_count)) == 3
+        pairs = (await db.execute(select(ContactDuplicate.contact_id, ContactDuplicate.duplicate_id))).all()
+        assert pairs == [(third.id, fourth.id)]
+
+        assert await service.merge_contacts(user, first.id, [second.id]) is None
+
+
+@pytest.mark.asyncio
+async def test_run_dedup_checks_users_with_changes(manager):
+    async with manager.session() as db:
+        user = await db.scalar(select(User))
+        db.expunge(user)
+        service = ContactService(db)
+        await service.create_contact(contact("John", "john@example.com", "1"), user)
+        await service.create_contact(contact("John", "john@example.com", "2"), user)
+
+    assert await run_dedup(manager=manager) == {"users": 1, "pairs": 1}
+    assert await run_dedup(manager=manager) == {"users": 0, "pairs": 0}
@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 from unittest.mock import AsyncMock, patch
 from fastapi_mail import FastMail, MessageSchema
@@ -62,3 +64,82 @@ async def test_send_email_with_correct_parameters():
     assert message.template_body["username"] == "testuser"
     assert message.template_body["host"] == "http://localhost"
     assert "token" in message.template_body
+
+
+class FakeConnection:
+    """
+    SMTP-сесія fastapi_mail, що лише рахує відкриття й листи.
+    """
+
+    opened: list = []
+    send = None
+
+    def __init__(self, config):
+        self.session = AsyncMock()
+        self.session.send_message.side_effect = FakeConnection.send
+        self.closed = False
+
+    async def __aenter__(self):
+        FakeConnection.opened.append(self)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.closed = True
+
+    @classmethod
+    def sent(cls) -> int:
+        return sum(connection.session.send_message.await_count for connection in cls.opened)
+
+
+@pytest.mark.asyncio
+async def test_send_messages_reuses_one_session_per_worker():
+    from src.services.email import send_messages
+
+    pulled = []
+
+    def messages():
+        for i in range(20):
+            pulled.append(i)
+            yield MessageSchema(
+                subject="s",
+                recipients=[f"u{i}@example.com"],
+                template_body={"username": f"u{i}", "contacts": [], "days": 7},
+                subtype="html",
+            )
+
+    async def send(msg):
+        # Генератор не вичитується наперед більше ніж на розмір черги та кількість воркерів
+        assert len(pulled) - FakeConnection.sent() <= 5
+        await asyncio.sleep(0)
+
+    FakeConnection.opened, FakeConnection.send = [], send
+    with patch("fastapi_mail.connection.Connection", FakeConnection):
+        sent, failed = await send_messages(messages(), "birthday_digest.html", concurrency=2)
+
+    assert (sent, failed) == (20, 0)
+    assert len(FakeConnection.opened) == 2
+    assert all(connection.closed for connection in FakeConnection.opened)
+    assert FakeConnection.sent() == 20
+
+
+@pytest.mark.asyncio
+async def test_send_messages_counts_failures_and_reconnects():
+    from src.services.email import send_messages
+
+    results = iter([None, httpx.RequestError("down"), None])
+
+    async def send(msg):
+        error = next(results)
+        if error is not None:
+            raise error
+
+    FakeConnection.opened, FakeConnection.send = [], send
+    messages = [MessageSchema(subject="s", recipients=[f"u{i}@example.com"], body="b", subtype="plain") for i in range(3)]
+
+    with patch("fastapi_mail.connection.Connection", FakeConnection):
+        sent, failed = await send_messages(messages, "birthday_digest.html", concurrency=1, rate_per_second=1000)
+
+    assert (sent, failed) == (2, 1)
+    # Після помилки сесія закривається, і наступний лист іде новою
+    assert len(FakeConnection.opened) == 2
+    assert all(connection.closed for connection in FakeConnection.opened)
@@ -0,0 +1,90 @@
+import json
+
+import pytest
+from starlette.requests import ClientDisconnect
+
+from src.services.events import (
+    HEARTBEAT,
+    RESYNC,
+    ContactEventBroadcaster,
+    EventStreamResponse,
+    TooManySubscribers,
+    format_event,
+)
+
+
+def test_format_event():
+    frame = format_event("deleted", {"id": 3}, event_id=7)
+
+    assert frame == 'id: 7\nevent: deleted\ndata: {"id":3}\n\n'
+
+
+@pytest.mark.asyncio
+async def test_publish_reaches_only_owner_subscriptions():
+    broadcaster = ContactEventBroadcaster()
+    first = broadcaster.subscribe(1)
+    second = broadcaster.subscribe(1)
+    other = broadcaster.subscribe(2)
+
+    await broadcaster.publish(1, "created", {"id": 10}, event_id=1)
+
+    for subscription in (first, second):
+        frame = subscription.queue.get_nowait()
+        assert json.loads(frame.split("data: ")[1]) == {"id": 10}
+    assert other.queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_gets_resync_and_is_dropped():
+    broadcaster = ContactEventBroadcaster(queue_size=2)
+    slow = broadcaster.subscribe(1)
+
+    for index in range(3):
+        await broadcaster.publish(1, "updated", {"id": index})
+
+    assert [slow.queue.get_nowait(), slow.queue.get_nowait()] == [RESYNC, None]
+    assert broadcaster.snapshot() == {"connections": 0, "users": 0, "dropped": 1}
+
+
+def test_max_connections():
+    broadcaster = ContactEventBroadcaster(max_connections=1)
+    broadcaster.subscribe(1)
+
+    with pytest.raises(TooManySubscribers):
+        broadcaster.subscribe(2)
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_heartbeats_and_unsubscribes():
+    broadcaster = ContactEventBroadcaster()
+    subscription = broadcaster.subscribe(1)
+    stream = broadcaster.stream(subscription, heartbeat=0.01)
+
+    assert (await anext(stream)).startswith("retry:")
+    assert await anext(stream) == HEARTBEAT
+    await broadcaster.publish(1, "deleted", {"id": 5}, event_id=2)
+    assert (await anext(stream)).startswith("id: 2\nevent: deleted")
+
+    await broadcaster.close()
+    with pytest.raises(StopAsyncIteration):
+        await anext(stream)
+    assert broadcaster.connections == 0
+
+
+
+@pytest.mark.asyncio
+async def test_response_unsubscribes_when_stream_never_iterated():
+    broadcaster = ContactEventBroadcaster(max_connections=1)
+    response = EventStreamResponse(broadcaster, broadcaster.subscribe(1), heartbeat=10)
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        raise OSError("client disconnected")
+
+    with pytest.raises(ClientDisconnect):
+        await response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+
+    assert broadcaster.connections == 0
+    broadcaster.subscribe(2)
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from src.services.health import HealthMonitor
+
+
+async def ok():
+    pass
+
+
+async def broken():
+    raise ConnectionError("refused")
+
+
+async def hanging():
+    await asyncio.sleep(10)
+
+
+@pytest.mark.asyncio
+async def test_check_all_caches_results():
+    monitor = HealthMonitor(
+        probes={"db": ok, "redis": broken, "smtp": hanging}, required=("db",), timeout=0.05
+    )
+
+    assert monitor.ready is False
+    await monitor.check_all()
+
+    assert monitor.ready is True
+    snapshot = monitor.snapshot()
+    assert snapshot["dependencies"]["db"]["healthy"] is True
+    assert snapshot["dependencies"]["redis"]["last_error"] == "ConnectionError: refused"
+    assert snapshot["dependencies"]["smtp"]["healthy"] is False
+    assert snapshot["dependencies"]["smtp"]["latency_ms"] >= 50
+
+
+def test_unknown_required_probe_rejected():
+    with pytest.raises(ValueError, match="redsi"):
+        HealthMonitor(probes={"db": ok, "redis": ok}, required=("db", "redsi"))
+
+
+@pytest.mark.asyncio
+async def test_not_ready_when_required_dependency_fails():
+    monitor = HealthMonitor(probes={"db": broken, "redis": ok}, required=("db", "redis"))
+
+    await monitor.check_all()
+
+    assert monitor.ready is False
+
+
+@pytest.mark.asyncio
+async def test_background_loop_refreshes_results():
+    calls = []
+
+    async def counting():
+        calls.append(1)
+
+    monitor = HealthMonitor(probes={"db": counting}, interval=0.01)
+    monitor.start()
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+
+    assert len(calls) >= 2
+    assert monitor.ready is True
+
+
+@pytest.mark.asyncio
+async def test_database_probe_checks_every_shard(tmp_path):
+    from src.database.db import DatabaseSessionManager
+    from src.services.health import check_database
+
+    primary = f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}"
+    missing = f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'shard.db'}"
+    healthy = DatabaseSessionManager(primary, sqlite_profile=False, shard_urls=[primary])
+    broken = DatabaseSessionManager(primary, sqlite_profile=False, shard_urls=[primary, missing])
+    try:
+        await check_database(healthy)
+        with pytest.raises(ConnectionError, match="shard 1") as error:
+            await check_database(broken)
+        assert "primary" not in str(error.value)
+    finally:
+        await healthy.close()
+        await broken.close()
@@ -0,0 +1,77 @@
+import asyncio
+from datetime import date, datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.database.db import DatabaseSessionManager
+from src.database.models import Base, Contact, User
+from src.services.maintenance import PeriodicTask, purge_unconfirmed_users
+
+
+@pytest_asyncio.fixture
+async def manager(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'purge.db'}"
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await engine.dispose()
+    manager = DatabaseSessionManager(url)
+    old = datetime.now() - timedelta(days=30)
+    async with manager.session() as db:
+        for index in range(5):
+            db.add(User(username=f"bot{index}", email=f"bot{index}@example.com", confirmed=False, created_at=old))
+        db.add(User(username="fresh", email="fresh@example.com", confirmed=False, created_at=datetime.now()))
+        db.add(User(username="real", email="real@example.com", confirmed=True, created_at=old))
+        db.add(User(username="legacy", email="legacy@example.com", created_at=old))
+        await db.flush()
+        # Акаунти, створені до появи колонки confirmed, мають NULL і не видаляються
+        await db.execute(update(User).where(User.username == "legacy").values(confirmed=None))
+        users = (await db.execute(select(User))).scalars().all()
+        for user in users:
+            db.add(Contact(
+                first_name="A", last_name="B", email="a@example.com", phone_number="1",
+                birthday=date(1990, 1, 1), user_id=user.id,
+            ))
+        await db.commit()
+    yield manager
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_purge_removes_only_stale_unconfirmed_users(manager):
+    report = await purge_unconfirmed_users(older_than_days=7, batch_size=2, pause_seconds=0, manager=manager)
+
+    assert (report.users, report.contacts, report.batches) == (5, 5, 3)
+    async with manager.session() as db:
+        names = set((await db.execute(select(User.username))).scalars())
+        assert names == {"fresh", "real", "legacy"}
+        assert await db.scalar(select(func.count()).select_from(Contact)) == 3
+
+
+@pytest.mark.asyncio
+async def test_purge_respects_max_batches(manager):
+    report = await purge_unconfirmed_users(
+        older_than_days=7, batch_size=2, pause_seconds=0, max_batches=1, manager=manager
+    )
+
+    assert (report.users, report.batches) == (2, 1)
+
+
+@pytest.mark.asyncio
+async def test_periodic_task_runs_until_stopped():
+    calls = []
+
+    async def job():
+        calls.append(1)
+        return len(calls)
+
+    task = PeriodicTask("job", job, interval=0.01)
+    task.start()
+    await asyncio.sleep(0.05)
+    await task.stop()
+
+    assert len(calls) >= 2
+    assert task.last_result == len(calls)
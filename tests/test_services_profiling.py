@@ -0,0 +1,71 @@
+import json
+import time
+
+import pstats
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.services import profiling
+from src.services.profiling import ProfilingMiddleware
+
+
+def make_client(tmp_path, **kwargs):
+    app = FastAPI()
+
+    @app.get("/busy")
+    async def busy():
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            pass
+        return {"items": list(range(100))}
+
+    app.add_middleware(ProfilingMiddleware, output_dir=tmp_path, **kwargs)
+    return TestClient(app)
+
+
+def test_request_without_token_is_not_profiled(tmp_path):
+    client = make_client(tmp_path, token="secret")
+
+    response = client.get("/busy", headers={"X-Profile-Token": "wrong"})
+
+    assert response.status_code == 200
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_speedscope_profile_written_for_authorized_request(tmp_path):
+    client = make_client(tmp_path, token="secret", interval_ms=1)
+
+    response = client.get("/busy", headers={"X-Profile-Token": "secret"})
+
+    assert response.status_code == 200
+    files = list(tmp_path.glob("*.speedscope.json"))
+    assert len(files) == 1
+    data = json.loads(files[0].read_text())
+    profile = data["profiles"][0]
+    assert profile["type"] == "sampled"
+    assert len(profile["samples"]) > 0
+    names = {frame["name"] for frame in data["shared"]["frames"]}
+    assert any(name.endswith("busy") for name in names)
+
+
+def test_pstats_profile_for_sampled_request(tmp_path):
+    client = make_client(tmp_path, sample_rate=1.0, fmt="pstats")
+
+    client.get("/busy")
+
+    files = list(tmp_path.glob("*.pstats"))
+    assert len(files) == 1
+    assert pstats.Stats(str(files[0])).total_calls > 0
+
+
+
+def test_pstats_skipped_while_another_profile_is_active(tmp_path):
+    client = make_client(tmp_path, sample_rate=1.0, fmt="pstats")
+
+    with profiling._pstats_lock:
+        response = client.get("/busy")
+
+    assert response.status_code == 200
+    assert list(tmp_path.glob("*.pstats")) == []
+    client.get("/busy")
+    assert len(list(tmp_path.glob("*.pstats"))) == 1
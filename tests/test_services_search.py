@@ -0,0 +1,161 @@
+import asyncio
+import time
+from datetime import date
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.database.models import Base, Contact
+from src.services.search import (
+    ContactSearchIndex,
+    PrefixIndex,
+    TrigramIndex,
+    UserIndexCache,
+    similarity,
+    trigrams,
+)
+
+
+def test_trigrams_match_pg_trgm():
+    assert trigrams("John") == {"  j", " jo", "joh", "ohn", "hn "}
+    assert trigrams("Jo-Ann") == trigrams("jo ann")
+    assert similarity(trigrams("John"), trigrams("John")) == 1.0
+    assert similarity(trigrams(""), trigrams("John")) == 0.0
+
+
+def test_index_ranks_typos_and_updates_incrementally():
+    index = TrigramIndex()
+    index.add(1, "John Smith")
+    index.add(2, "Joan Smyth")
+    index.add(3, "Olena Melnyk")
+
+    ranked = index.search("Jonh Smith")
+    assert [doc_id for doc_id, _ in ranked][:1] == [1]
+    assert 3 not in {doc_id for doc_id, _ in ranked}
+    assert ranked == sorted(ranked, key=lambda item: -item[1])
+
+    index.add(1, "Taras Shevchenko")
+    assert 1 not in {doc_id for doc_id, _ in index.search("John Smith")}
+    assert index.search("Shevchenko")[0][0] == 1
+
+    index.remove(1)
+    index.remove(42)
+    assert index.search("Shevchenko") == []
+    assert len(index) == 2
+
+
+def test_prefix_index_completes_names_and_emails():
+    index = PrefixIndex()
+    index.extend([
+        (1, "John", "Smith", "js@example.com"),
+        (2, "Joan", "Johnson", "joan@example.com"),
+        (3, "Olena", "Melnyk", "olena@ukr.net"),
+    ])
+
+    assert [doc_id for doc_id, *_ in index.complete("JO")] == [2, 1]
+    assert index.complete("olena@")[0] == (3, "Olena Melnyk", "olena@ukr.net")
+    assert [doc_id for doc_id, *_ in index.complete("john")] == [1, 2]
+    assert len(index.complete("jo", limit=1)) == 1
+    assert index.complete("   ") == []
+
+    index.add(1, "Taras", "Shevchenko", "taras@example.com")
+    assert [doc_id for doc_id, *_ in index.complete("jo")] == [2]
+    index.remove(2)
+    assert index.complete("jo") == []
+    assert [doc_id for doc_id, *_ in index.complete("t")] == [1]
+
+
+@pytest.mark.asyncio
+async def test_registry_builds_lazily_and_evicts(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'search.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_maker() as db:
+        for user_id, name in ((1, "John"), (2, "Mary")):
+            db.add(Contact(
+                first_name=name, last_name="Doe", email="x@example.com", phone_number="1",
+                birthday=date(1990, 1, 1), user_id=user_id,
+            ))
+        await db.commit()
+
+        registry = ContactSearchIndex(max_users=1, ttl=60)
+        registry.upsert(Contact(id=99, user_id=1, first_name="Ignored", last_name="Before build", email=""))
+        first = await registry.get(db, 1)
+        assert len(first) == 1
+        assert await registry.get(db, 1) is first
+
+        registry.upsert(Contact(id=99, user_id=1, first_name="Jonathan", last_name="Doe", email="j@example.com"))
+        assert first.search("Jonathan Doe")[0][0] == 99
+
+        await registry.get(db, 2)
+        assert await registry.get(db, 1) is not first
+
+        registry.ttl = 0
+        stale = await registry.get(db, 1)
+        time.sleep(0.001)
+        assert await registry.get(db, 1) is not stale
+    await engine.dispose()
+
+
+def test_registry_requires_build_and_add():
+    with pytest.raises(TypeError):
+        UserIndexCache()
+
+
+@pytest.mark.asyncio
+async def test_registry_rebuilds_when_contacts_change_during_build(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'search.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    registry = ContactSearchIndex(max_users=10, ttl=60)
+
+    async with session_maker() as db:
+        db.add(Contact(
+            first_name="John", last_name="Doe", email="x@example.com", phone_number="1",
+            birthday=date(1990, 1, 1), user_id=1,
+        ))
+        await db.commit()
+
+        class ChangingSession:
+            async def execute(self, stmt):
+                result = await db.execute(stmt)
+                if registry.builds == 0:
+                    # Контакт створено після вибірки, але до збереження індексу
+                    async with session_maker() as other:
+                        contact = Contact(
+                            first_name="Mary", last_name="Smith", email="m@example.com", phone_number="2",
+                            birthday=date(1990, 1, 1), user_id=1,
+                        )
+                        other.add(contact)
+                        await other.commit()
+                    registry.upsert(contact)
+                return result
+
+        index = await registry.get(ChangingSession(), 1)
+
+        assert registry.builds == 2
+        assert len(index) == 2
+        assert await registry.get(db, 1) is index
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_registry_builds_once_for_concurrent_requests(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'search.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    registry = ContactSearchIndex(max_users=10, ttl=60)
+
+    async def get():
+        async with session_maker() as db:
+            return await registry.get(db, 1)
+
+    indexes = await asyncio.gather(*(get() for _ in range(5)))
+
+    assert registry.builds == 1
+    assert all(index is indexes[0] for index in indexes)
+    assert registry._locks == {}
+    await engine.dispose()
@@ -0,0 +1,134 @@
+import time
+from datetime import date, datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.database.db import DatabaseSessionManager
+from src.database.models import Base, ContactTombstone, User
+from src.schemas.contacts import ContactBase
+from src.services.contacts import ContactService
+from src.services.events import contact_events
+from src.services.maintenance import prune_tombstones
+from src.services.sync import (
+    SyncToken,
+    SyncTokenError,
+    SyncTokenExpired,
+    decode_sync_token,
+    encode_sync_token,
+)
+
+
+def test_token_roundtrip():
+    token = SyncToken(seq=42, issued_at=int(time.time()))
+
+    assert decode_sync_token(encode_sync_token(token)) == token
+
+
+def test_expired_token():
+    value = encode_sync_token(SyncToken(seq=1, issued_at=1000))
+
+    with pytest.raises(SyncTokenExpired):
+        decode_sync_token(value, ttl_days=1, now=1000 + 2 * 86400)
+
+
+@pytest.mark.parametrize("value", ["garbage", "", "djIuMS4y", encode_sync_token(SyncToken(1, 1))[:-3]])
+def test_invalid_token(value):
+    with pytest.raises(SyncTokenError):
+        decode_sync_token(value, ttl_days=10**6)
+
+
+@pytest_asyncio.fixture
+async def manager(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'sync.db'}"
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await engine.dispose()
+    manager = DatabaseSessionManager(url)
+    async with manager.session() as db:
+        db.add(User(username="owner", email="owner@example.com", hashed_password="x", confirmed=True))
+        await db.commit()
+    yield manager
+    await manager.close()
+
+
+def contact(index: int) -> ContactBase:
+    return ContactBase(
+        first_name=f"Name{index}",
+        last_name="Last",
+        email=f"name{index}@example.com",
+        phone_number="12345",
+        birthday=date(1990, 1, 1),
+    )
+
+
+@pytest.mark.asyncio
+async def test_changes_pages_and_tombstones(manager):
+    async with manager.session() as db:
+        user = await db.scalar(select(User))
+        # Як і кешований поточний користувач, об'єкт не прив'язаний до сесії сервісу
+        db.expunge(user)
+        service = ContactService(db)
+        created = [await service.create_contact(contact(index), user) for index in range(5)]
+
+        first = await service.get_changes(user, limit=3)
+        assert [item.id for item in first.changes] == [item.id for item in created[:3]]
+        assert first.has_more
+
+        token = decode_sync_token(first.next_token)
+        second = await service.get_changes(user, token, limit=3)
+        assert [item.id for item in second.changes] == [item.id for item in created[3:]]
+        assert not second.has_more
+
+        await service.update_contact(created[0].id, contact(10), user)
+        await service.remove_contact(created[1].id, user)
+        delta = await service.get_changes(user, decode_sync_token(second.next_token))
+        assert [item.id for item in delta.changes] == [created[0].id]
+        assert delta.deleted == [created[1].id]
+        assert await db.scalar(select(User.change_seq).where(User.id == user.id)) == 7
+
+
+@pytest.mark.asyncio
+async def test_prune_tombstones(manager):
+    async with manager.session() as db:
+        user = await db.scalar(select(User))
+        for index in range(3):
+            db.add(ContactTombstone(user_id=user.id, contact_id=index, change_seq=index + 1))
+        await db.flush()
+        await db.execute(
+            update(ContactTombstone)
+            .where(ContactTombstone.contact_id < 2)
+            .values(deleted_at=datetime.now() - timedelta(days=60))
+        )
+        await db.commit()
+
+    removed = await prune_tombstones(retention_days=30, batch_size=1, pause_seconds=0, manager=manager)
+
+    assert removed == 2
+    async with manager.session() as db:
+        assert await db.scalar(select(func.count()).select_from(ContactTombstone)) == 1
+
+
+@pytest.mark.asyncio
+async def test_mutations_publish_events(manager):
+    async with manager.session() as db:
+        user = await db.scalar(select(User))
+        db.expunge(user)
+        subscription = contact_events.subscribe(user.id)
+        try:
+            service = ContactService(db)
+            created = await service.create_contact(contact(1), user)
+            await service.update_contact(created.id, contact(2), user)
+            await service.remove_contact(created.id, user)
+        finally:
+            contact_events.unsubscribe(subscription)
+
+    frames = [subscription.queue.get_nowait() for _ in range(3)]
+    assert [frame.split("\n")[:2] for frame in frames] == [
+        ["id: 1", "event: created"],
+        ["id: 2", "event: updated"],
+        ["id: 3", "event: deleted"],
+    ]
@@ -25,7 +25,7 @@ async def test_create_user_success():
         response = await user_service.create_user(user_create)
 
     # Перевірка, що метод репозиторію був викликаний правильно
-    mock_repository.create_user.assert_called_once_with(user_create, "http://avatar.url")
+    mock_repository.create_user.assert_called_once_with(user_create, "http://avatar.url", None)
     assert response == {"id": 1, "username": "testuser", "email": "test@example.com"}
 
 @pytest.mark.asyncio
@@ -47,7 +47,7 @@ async def test_create_user_gravatar_error():
         response = await user_service.create_user(user_create)
 
     # Перевірка, що метод репозиторію був викликаний з `None` аватаром
-    mock_repository.create_user.assert_called_once_with(user_create, None)
+    mock_repository.create_user.assert_called_once_with(user_create, None, None)
     assert response == {"id": 1, "username": "testuser", "email": "test@example.com"}
 
 @pytest.mark.asyncio